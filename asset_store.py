@@ -0,0 +1,329 @@
+"""
+Read-only datasets shared zero-copy by every process.
+
+Line tables, opening books and other prebuilt data are published once as
+versioned files and memory-mapped read-only by each process that needs
+them. All processes map the same file, so they share the same page-cache
+pages and memory stays flat as workers are added. NumPy arrays are views
+straight into the mapping. Record lists (stories, puzzles, ...) are stored
+as one JSON blob plus offsets and are decoded one record at a time.
+
+File layout: an 8-byte magic, the manifest length, a JSON manifest (dtype,
+shape and offset of every array), then the arrays at 64-byte aligned
+offsets. A version is written to a temp file and renamed into place, then
+the `<name>.current` pointer is replaced the same way, so readers never
+see a half-written asset. get() re-reads the pointer at most once per
+check_interval and maps a newer version when it finds one (hot swap).
+Arrays taken from the old version stay valid until they are released, and
+only versions older than keep_versions are deleted.
+
+Run directly to build assets:  python asset_store.py build [name ...]
+"""
+
+import glob
+import json
+import logging
+import math
+import mmap
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from bitboard import generate_win_lines
+from config import ASSET_SETTINGS, GAME_CONFIGS
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GASSET01"
+_ALIGN = 64
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+class RecordTable:
+    """Read-only list of JSON records backed by a mapped blob"""
+
+    __slots__ = ("_blob", "_offsets")
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return json.loads(self._blob[start:end].tobytes())
+
+    def __iter__(self) -> Iterator:
+        return (self[index] for index in range(len(self)))
+
+
+class Asset:
+    """One mapped version of an asset"""
+
+    __slots__ = ("name", "version", "path", "meta", "arrays", "_records", "_map")
+
+    def __init__(self, path: str):
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an asset file")
+        length = int.from_bytes(self._map[8:16], "little")
+        manifest = json.loads(self._map[16:16 + length])
+        self.path = path
+        self.name = manifest["name"]
+        self.version = manifest["version"]
+        self.meta = manifest["meta"]
+        self._records = manifest["records"]
+        data = _aligned(16 + length)
+        self.arrays: Dict[str, np.ndarray] = {}
+        for key, spec in manifest["arrays"].items():
+            dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+            count = math.prod(shape)
+            if count:
+                array = np.frombuffer(self._map, dtype, count, data + spec["offset"]).reshape(shape)
+            else:
+                array = np.empty(shape, dtype)
+                array.flags.writeable = False
+            self.arrays[key] = array
+
+    def __repr__(self) -> str:
+        return f"Asset({self.name} v{self.version}, {len(self.arrays)} arrays)"
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._map)
+
+    def array(self, key: str) -> Optional[np.ndarray]:
+        return self.arrays.get(key)
+
+    def records(self, key: str) -> RecordTable:
+        if key not in self._records:
+            raise KeyError(f"{self.name} has no records {key!r}")
+        return RecordTable(self.arrays[f"{key}.blob"], self.arrays[f"{key}.offsets"])
+
+
+def write_asset(path: str, name: str, version: int, arrays: Dict[str, np.ndarray] = None,
+                records: Dict[str, List] = None, meta: dict = None):
+    """Write one asset version to `path` atomically"""
+    arrays = {key: np.ascontiguousarray(value) for key, value in (arrays or {}).items()}
+    for key, items in (records or {}).items():
+        encoded = [json.dumps(item, separators=(",", ":")).encode() for item in items]
+        arrays[f"{key}.offsets"] = np.concatenate(([0], np.cumsum([len(e) for e in encoded]))).astype(np.int64)
+        arrays[f"{key}.blob"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+    # Offsets are relative to the data section, which starts right after the manifest
+    specs, offset = {}, 0
+    for key, value in arrays.items():
+        specs[key] = {"dtype": value.dtype.str, "shape": list(value.shape), "offset": offset}
+        offset = _aligned(offset + value.nbytes)
+    manifest = {"name": name, "version": version, "created": time.time(), "meta": meta or {},
+                "records": sorted(records or {}), "arrays": specs}
+    header = json.dumps(manifest).encode()
+    data = _aligned(16 + len(header))
+
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "wb") as handle:
+        handle.write(MAGIC + len(header).to_bytes(8, "little") + header)
+        for key, value in arrays.items():
+            handle.seek(data + specs[key]["offset"])
+            handle.write(value.tobytes())
+        handle.truncate(data + offset)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temp, path)
+
+
+class AssetStore:
+    """Publishes asset versions and maps the current ones on demand"""
+
+    def __init__(self, directory: str = None, settings: dict = None):
+        self.settings = {**ASSET_SETTINGS, **(settings or {})}
+        self.directory = directory or self.settings["directory"] or \
+            os.path.join(tempfile.gettempdir(), "game_assets")
+        self.check_interval = self.settings["check_interval"]
+        self._assets: Dict[str, Asset] = {}
+        self._checked: Dict[str, float] = {}
+        self.stats = {"mapped": 0, "swapped": 0, "published": 0}
+
+    def _path(self, name: str, version: int) -> str:
+        return os.path.join(self.directory, f"{name}.v{version}.bin")
+
+    def _pointer(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.current")
+
+    def current_version(self, name: str) -> Optional[int]:
+        try:
+            with open(self._pointer(name)) as handle:
+                return int(handle.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def versions(self, name: str) -> List[int]:
+        paths = glob.glob(os.path.join(glob.escape(self.directory), f"{glob.escape(name)}.v*.bin"))
+        return sorted(int(path.rsplit(".v", 1)[1][:-4]) for path in paths)
+
+    # Publishing ---------------------------------------------------------
+
+    def publish(self, name: str, arrays: Dict[str, np.ndarray] = None,
+                records: Dict[str, List] = None, meta: dict = None) -> int:
+        """Write a new version and make it current; returns the version number"""
+        os.makedirs(self.directory, exist_ok=True)
+        version = max(self.versions(name) + [self.current_version(name) or 0]) + 1
+        write_asset(self._path(name, version), name, version, arrays, records, meta)
+        pointer = self._pointer(name)
+        temp = f"{pointer}.{os.getpid()}.tmp"
+        with open(temp, "w") as handle:
+            handle.write(str(version))
+        os.replace(temp, pointer)
+        self._checked.pop(name, None)
+        self.stats["published"] += 1
+        self.prune(name)
+        return version
+
+    def build(self, name: str) -> int:
+        """Run the registered builder for `name` and publish the result"""
+        started = time.perf_counter()
+        version = self.publish(name, **BUILDERS[name](self.settings))
+        logger.info(f"Built asset {name} v{version} in {time.perf_counter() - started:.1f}s")
+        return version
+
+    def ensure(self, names: Iterable[str] = None):
+        """Build assets that have never been published"""
+        for name in self.settings["build_missing"] if names is None else names:
+            if self.current_version(name) is None:
+                self.build(name)
+
+    def prune(self, name: str):
+        """Delete versions older than the newest keep_versions (open mappings stay valid)"""
+        current = self.current_version(name)
+        for version in self.versions(name)[:-self.settings["keep_versions"]]:
+            if version != current:
+                try:
+                    os.remove(self._path(name, version))
+                except OSError:
+                    pass  # Still open on platforms that forbid deleting mapped files
+
+    # Reading ------------------------------------------------------------
+
+    def get(self, name: str) -> Optional[Asset]:
+        """The current version of an asset, or None if it was never published"""
+        asset = self._assets.get(name)
+        now = time.monotonic()
+        if asset is not None and now - self._checked.get(name, -math.inf) < self.check_interval:
+            return asset
+        self._checked[name] = now
+        version = self.current_version(name)
+        if version is None or (asset is not None and asset.version == version):
+            return asset
+        try:
+            fresh = Asset(self._path(name, version))
+        except (FileNotFoundError, ValueError):
+            logger.warning(f"Asset {name} v{version} could not be mapped; keeping the mapped version")
+            return asset
+        self.stats["swapped" if asset is not None else "mapped"] += 1
+        self._assets[name] = fresh
+        return fresh
+
+    def array(self, name: str, key: str) -> Optional[np.ndarray]:
+        asset = self.get(name)
+        return asset.array(key) if asset is not None else None
+
+    def attach(self, directory: str = None, names: Iterable[str] = None):
+        """Point the store at `directory` and map the named assets now"""
+        if directory is not None and directory != self.directory:
+            self.directory = directory
+            self._assets.clear()
+            self._checked.clear()
+        for name in self.settings["worker_assets"] if names is None else names:
+            self.get(name)
+
+    def mapped_bytes(self) -> int:
+        return sum(asset.nbytes for asset in self._assets.values())
+
+
+# Builders: settings -> publish() keyword arguments ----------------------
+
+def build_line_tables(settings: dict) -> dict:
+    """Win lines and cell/line incidence matrices per cube size"""
+    arrays = {}
+    for size in settings["line_table_sizes"]:
+        lines = np.array(generate_win_lines(size), dtype=np.int32)
+        incidence = np.zeros((size ** 3, len(lines)), dtype=np.int8)
+        incidence[lines, np.arange(len(lines))[:, None]] = 1
+        arrays[f"win_lines_{size}"] = lines
+        arrays[f"incidence_{size}"] = incidence
+    return {"arrays": arrays}
+
+
+def build_opening_book(settings: dict) -> dict:
+    """The hard engine's reply to every first move, per cube size"""
+    from engine_workers import _move_job
+
+    hard = GAME_CONFIGS["3D_tic_tac_toe"]["difficulty_levels"]["hard"]
+    search = {**hard, "mistake_probability": 0.0, "opening_book": False}
+    arrays = {}
+    for size in settings["book_sizes"]:
+        positions = [(1 << cell, 0) for cell in range(size ** 3)]
+        replies = [_move_job(p1, p2, 2, search, cell, time.time() + settings["book_move_seconds"], size)
+                   for cell, (p1, p2) in enumerate(positions)]
+        order = sorted(range(len(positions)), key=positions.__getitem__)
+        arrays[f"p1_{size}"] = np.array([positions[i][0] for i in order], dtype=np.uint64)
+        arrays[f"p2_{size}"] = np.array([positions[i][1] for i in order], dtype=np.uint64)
+        arrays[f"reply_{size}"] = np.array([replies[i] for i in order], dtype=np.int16)
+    return {"arrays": arrays, "meta": {"settings": search}}
+
+
+BUILDERS: Dict[str, Callable[[dict], dict]] = {
+    "line_tables": build_line_tables,
+    "opening_book": build_opening_book,
+}
+
+
+# Shared by everything in the process; workers attach at startup
+ASSETS = AssetStore()
+
+
+def attach_worker(directory: str, names: List[str]):
+    """ProcessPoolExecutor initializer: map the shared assets once per worker"""
+    ASSETS.attach(directory, names)
+
+
+def opening_move(p1: int, p2: int, player: int, size: int, gravity: bool = False) -> Optional[int]:
+    """The book reply for this position, if the published book has one"""
+    if gravity or player != 2:
+        return None
+    asset = ASSETS.get("opening_book")
+    if asset is None or f"reply_{size}" not in asset.arrays:
+        return None
+    # Sorted by (p1, p2): find the p1 run, then p2 within it
+    keys, key = asset.arrays[f"p1_{size}"], np.uint64(p1)
+    start, end = int(np.searchsorted(keys, key, "left")), int(np.searchsorted(keys, key, "right"))
+    matches = np.flatnonzero(asset.arrays[f"p2_{size}"][start:end] == np.uint64(p2))
+    if not matches.size:
+        return None
+    cell = int(asset.arrays[f"reply_{size}"][start + matches[0]])
+    return cell if not (p1 | p2) >> cell & 1 else None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    command, names = (sys.argv[1:2] or ["list"])[0], sys.argv[2:] or list(BUILDERS)
+    if command == "build":
+        for asset_name in names:
+            ASSETS.build(asset_name)
+    for asset_name in names:
+        mapped = ASSETS.get(asset_name)
+        print(f"{asset_name}: {mapped!r}, {mapped.nbytes} bytes" if mapped else f"{asset_name}: not published")
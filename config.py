@@ -1,13 +1,17 @@
 """
-Configuration file for the multi-agent game system containing prompts,
+Configuration file for the multi-agent game system containing genres,
 system messages, and game configurations.
-"""
 
-import google.generativeai as genai
+This module is pure data. The Gemini model is built lazily by llm_client so
+that importing the configuration never pulls in the SDK.
+"""
 
-# Configure Gemini API
-genai.configure(api_key='')
-model = genai.GenerativeModel('gemini-1.5-flash')
+# Gemini API settings (consumed by llm_client on first model use)
+LLM_SETTINGS = {
+    "api_key": '',
+    "model_name": 'gemini-1.5-flash',
+    "response_mime_type": "application/json"
+}
 
 # Game Genres Configuration
 GAME_GENRES = {
@@ -31,226 +35,18 @@ GAME_GENRES = {
     }
 }
 
-# Agent Prompt Templates
-STORYTELLER_PROMPTS = {
-    "story_generation": """
-    As a creative storyteller, craft an engaging {genre} story with the following elements:
-    
-    Story Requirements:
-    - Genre: {genre}
-    - Player Preferences: {preferences}
-    - Narrative Style: {style}
-    
-    Create a complete story structure including:
-    1. An overarching narrative that spans three distinct levels
-    2. Unique characters for each level that match the {genre} theme
-    3. Progressive difficulty increase across levels
-    4. Compelling motivations for each character
-    5. Clear victory and defeat conditions
-    
-    The story should incorporate these specific elements:
-    - Opening Setup: Introduce the world and initial challenge
-    - Level Progression: Each level should build upon previous revelations
-    - Character Depth: Each opponent should have clear motivations and personality
-    - Plot Twists: Include surprising but logical story developments
-    - Resolution Paths: Multiple possible endings based on player performance
-    
-    Format the response as a detailed JSON structure with the following keys:
-    - name
-    - opening_narrative
-    - levels (array of 3 levels with characters and challenges)
-    - overall_arc
-    - victory_conditions
-    - defeat_conditions
-    """,
-    
-    "level_transition": """
-    Create a transition narrative for moving from level {current_level} to level {next_level}.
-    
-    Consider:
-    - Previous level outcome: {outcome}
-    - Player's current progress: {progress}
-    - Next challenger's personality: {challenger_profile}
-    
-    The transition should:
-    1. Acknowledge the player's previous victory/defeat
-    2. Foreshadow the next challenge
-    3. Maintain the {genre} atmosphere
-    4. Include character development
-    """,
-    
-    "story_adaptation": """
-    Adapt the current story based on player's performance:
-    
-    Current State:
-    - Story Progress: {progress}
-    - Player Performance: {performance}
-    - Current Narrative Arc: {current_arc}
-    
-    Generate modifications that:
-    1. Adjust difficulty naturally through story elements
-    2. Maintain narrative consistency
-    3. Keep player engagement high
-    4. Provide appropriate challenge level
-    """
-}
-
-CHARACTER_PROMPTS = {
-    "character_creation": """
-    Create a detailed character profile for level {level_number} in a {genre} setting.
-    
-    Character Requirements:
-    - Archetype: {archetype}
-    - Difficulty Level: {difficulty}
-    - Game Type: {game_type}
-    
-    Include:
-    1. Personality traits
-    2. Background story
-    3. Motivation for challenging player
-    4. Unique dialogue style
-    5. Victory and defeat reactions
-    
-    The character should:
-    - Match the {genre} theme
-    - Present appropriate challenge for level {level_number}
-    - Have clear personality traits
-    - Maintain consistent dialogue style
-    """,
-    
-    "dialogue_generation": {
-        "greeting": """
-        Generate a greeting dialogue for {character_name} meeting the player.
-        
-        Context:
-        - Character Type: {character_type}
-        - Game Progress: {progress}
-        - Previous Interaction: {previous_interaction}
-        
-        The greeting should:
-        1. Reflect character personality
-        2. Hint at upcoming challenge
-        3. Match game atmosphere
-        """,
-        
-        "challenge": """
-        Generate a challenge dialogue for {character_name}.
-        
-        Context:
-        - Current Game State: {game_state}
-        - Player Performance: {performance}
-        - Difficulty Level: {difficulty}
-        
-        The challenge should:
-        1. Be appropriate for difficulty level
-        2. Maintain character voice
-        3. Include game-specific elements
-        """,
-        
-        "victory": """
-        Generate victory dialogue for {character_name}.
-        
-        Context:
-        - Match Result: {result}
-        - Player Strategy: {strategy}
-        - Game History: {history}
-        
-        Include:
-        1. Recognition of player's effort
-        2. Character-appropriate reaction
-        3. Hook for next challenge
-        """,
-        
-        "defeat": """
-        Generate defeat dialogue for {character_name}.
-        
-        Context:
-        - Match Result: {result}
-        - Player Strategy: {strategy}
-        - Game History: {history}
-        
-        Include:
-        1. Graceful acknowledgment
-        2. Character development
-        3. Forward progression element
-        """
-    }
-}
+# Play styles offered in game.main()
+PLAY_STYLES = ["strategic", "aggressive", "defensive"]
 
-GAME_MASTER_PROMPTS = {
-    "game_selection": """
-    Select and configure a game challenge based on:
-    
-    Player Information:
-    - Skill Level: {skill_level}
-    - Past Performance: {performance}
-    - Preferred Style: {style}
-    
-    Level Requirements:
-    - Difficulty Target: {difficulty}
-    - Theme Consistency: {theme}
-    - Time Constraints: {time_limit}
-    
-    Choose from available game types as game_type:
-    1. 3D Tic Tac Toe
-    2. Strategic Rock Paper Scissors
-    3. Number Prediction Game
-    
-    
-    Configure:
-    - Specific rules and variations
-    - Difficulty parameters
-    - Victory conditions
-    - Special mechanics
-    """,
-    
-    "difficulty_adjustment": """
-    Analyze current game state and adjust difficulty:
-    
-    Current State:
-    - Player Performance: {performance}
-    - Current Difficulty: {difficulty}
-    - Game Type: {game_type}
-    
-    Consider:
-    1. Recent win/loss ratio
-    2. Play style adaptation
-    3. Learning curve progression
-    4. Engagement maintenance
-    """
+# Background story pre-generation (see story_pool.py)
+STORY_POOL_SETTINGS = {
+    "stories_per_key": 2,  # Stories kept per (genre, play_style)
+    "low_watermark": 1,  # Refill when a pool drops below this
+    "max_concurrent_refills": 2,
+    "borrow_across_styles": True  # Hand out a same-genre story if a pool is empty
 }
 
-ADVISOR_PROMPTS = {
-    "hint_generation": """
-    Generate a helpful hint based on:
-    
-    Game State:
-    - Current Position: {position}
-    - Player History: {history}
-    - Difficulty Level: {difficulty}
-    
-    Requirements:
-    1. Maintain difficulty appropriate clarity
-    2. Avoid direct solutions
-    3. Guide rather than solve
-    4. Consider player skill level
-    """,
-    
-    "strategy_advice": """
-    Provide strategic guidance for:
-    
-    Current Situation:
-    - Game Type: {game_type}
-    - Player Position: {position}
-    - Opponent Style: {opponent_style}
-    
-    Advice should:
-    1. Be level-appropriate
-    2. Encourage learning
-    3. Highlight key concepts
-    4. Build long-term skill
-    """
-}
+# Agent prompt templates live in prompts.py (compiled by prompt_templates.py)
 
 # Game Configurations
 GAME_CONFIGS = {
@@ -258,30 +54,48 @@ GAME_CONFIGS = {
         "grid_size": 4,
         "dimensions": 3,
         "win_length": 4,
+        "ai_engine": "auto",  # "alphabeta", "mcts", or "auto" (MCTS from grid size 4)
+        "gravity_extra_depth": 2,  # Extra alpha-beta plies when gravity narrows the moves
+        "mcts": {
+            "rollout_batch": 32,  # Random playouts per iteration, run as one array batch
+            "exploration": 1.4,  # UCT exploration constant
+            "arena_capacity": 200000  # Preallocated tree nodes
+        },
         "difficulty_levels": {
             "easy": {
                 "ai_depth": 2,
-                "mistake_probability": 0.2
+                "mistake_probability": 0.2,
+                "mcts_iterations": 200,
+                "proof_plies": 3  # Forced wins looked for before searching
             },
             "medium": {
                 "ai_depth": 3,
-                "mistake_probability": 0.1
+                "mistake_probability": 0.1,
+                "mcts_iterations": 800,
+                "proof_plies": 5
             },
             "hard": {
                 "ai_depth": 4,
-                "mistake_probability": 0.05
+                "mistake_probability": 0.05,
+                "mcts_iterations": 2500,
+                "proof_plies": 9,
+                "opening_book": True  # Answer first moves from the published book
             }
         },
         "special_rules": {
             "gravity_enabled": False,
             "power_ups_allowed": True,
-            "time_limited": False
+            "time_limited": False,
+            "move_time_limit": 30.0  # Seconds per move when time_limited
         }
     },
     
     "strategic_rps": {
         "rounds_per_match": 5,
         "power_moves_allowed": True,
+        "rule_set": "classic",  # "classic", "rpsls", "elemental" (needs elemental_powers); "auto" = elemental if on
+        "combo_bonus": 1,  # Extra points for a round won by completing a combo
+        "power_meter": {"per_win": 10, "per_combo": 25, "max": 100},
         "difficulty_levels": {
             "easy": {
                 "pattern_recognition": False,
@@ -307,6 +121,10 @@ GAME_CONFIGS = {
     "number_prediction": {
         "range": (1, 100),
         "rounds_per_match": 7,
+        "predictions_per_round": 3,  # Alternative guesses accepted for one round
+        "numbers_per_round": 2,  # Terms to predict per round with multi_number
+        "win_fraction": 0.6,  # Share of rounds to get right to win the match
+        "shift_every": (2, 3),  # Rounds between pattern shifts with dynamic_patterns
         "difficulty_levels": {
             "easy": {
                 "hint_frequency": 3,
@@ -325,11 +143,70 @@ GAME_CONFIGS = {
         "special_rules": {
             "pattern_based": True,
             "multi_number": False,
-            "time_pressure": True
+            "time_pressure": True,
+            "move_time_limit": 20.0  # Seconds per guess under time_pressure
         }
     }
 }
 
+# Process pool for CPU-bound engine work (see engine_workers.py)
+ENGINE_WORKER_SETTINGS = {
+    "max_workers": None,  # None = one per CPU core
+    "move_deadline": 1.0,  # Seconds an AI move may take
+    "deadline_grace": 0.25,  # Extra wait for the worker before falling back locally
+    "replay_max_nodes": 200_000,  # Alpha-beta node budget replacing the deadline in seeded sessions
+    "simulation_chunk": 50  # Games per worker task in batch simulations
+}
+
+# Token accounting and per-session budgets (see token_accounting.py)
+TOKEN_ACCOUNTING = {
+    "session_token_budget": 250_000,  # Prompt + response tokens; None = unlimited
+    "chars_per_token": 4  # Local estimate when the API reports no usage
+}
+
+# Offline tournament for the RPS AI (see rps_tournament.py)
+RPS_TOURNAMENT = {
+    "sessions": 200,  # Simulated players per (tier, strategy) pairing
+    "matches_per_level": 3,  # Matches against one opponent; the AI's history lasts the level
+    "seed": 7,
+    "calibration_steps": 11,  # counter_probability grid 0.0, 0.1, ... 1.0
+    # Round wins minus losses per round for the AI, averaged over strategies
+    "target_ai_edge": {"easy": 0.0, "medium": 0.1, "hard": 0.2}
+}
+
+# Shared timer wheel for move deadlines (see timer_wheel.py)
+TIMER_SETTINGS = {
+    "tick": 0.05,  # Seconds per level-0 slot
+    "slots_per_level": 64,  # Power of two
+    "levels": 4  # 64^4 ticks: about 9.7 days at 50 ms
+}
+
+# Read-only datasets shared by all processes (see asset_store.py)
+ASSET_SETTINGS = {
+    "directory": None,  # None = <system temp dir>/game_assets
+    "check_interval": 1.0,  # Seconds between checks for a newer published version
+    "keep_versions": 2,  # Older versions are deleted after each publish
+    "build_missing": ["line_tables"],  # Cheap assets built on first use if never published
+    "worker_assets": ["line_tables", "opening_book"],  # Mapped when a worker starts
+    "line_table_sizes": [3, 4],
+    "book_sizes": [3, 4],
+    "book_move_seconds": 0.5  # Search time per opening book position
+}
+
+# Display names used in game state -> GAME_CONFIGS keys
+GAME_TYPE_KEYS = {
+    "3D Tic Tac Toe": "3D_tic_tac_toe",
+    "Strategic Rock Paper Scissors": "strategic_rps",
+    "Number Prediction Game": "number_prediction"
+}
+
+# Named difficulty tiers on the 1-5 numeric difficulty scale
+DIFFICULTY_LEVELS = {
+    "easy": 1,
+    "medium": 3,
+    "hard": 5
+}
+
 # Performance Tracking Configuration
 PERFORMANCE_METRICS = {
     "win_rate_threshold": {
@@ -342,6 +219,8 @@ PERFORMANCE_METRICS = {
         "slow": 0.05
     },
     "performance_window": 5,  # Number of recent games to consider
+    "game_type_window": 10,  # Recent games kept per game type / skill category
+    "ewma_alpha": 0.3,  # Weight of the newest game in the smoothed win rate
     "skill_categories": [
         "novice",
         "intermediate",
@@ -355,6 +234,13 @@ PERFORMANCE_METRICS = {
     }
 }
 
+# When hints are offered during play (see GameManager._should_provide_hint)
+HINT_SETTINGS = {
+    "recent_results": 5,  # Match results kept in game state for the trigger
+    "hint_after_losses": 2,  # Losses among the last 3 results that turn hints on
+    "rephrase_after_losses": 3  # Losses in a row before the advisor model rephrases the hint
+}
+
 # Error Messages and Fallbacks
 ERROR_MESSAGES = {
     "story_generation_failed": "Unable to generate story. Using backup narrative...",
@@ -0,0 +1,122 @@
+"""
+Local, rule-based difficulty control.
+
+After every finished game the numeric difficulty (1-5) is nudged by
+DifficultyAdapter using the win-rate thresholds and adaptation rates from
+PERFORMANCE_METRICS, then mapped straight onto the engine knobs declared in
+GAME_CONFIGS (ai_depth, mistake_probability, counter_probability,
+pattern_complexity, ...). No model call is involved; the game master can
+optionally be asked for a narrative description in the background.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from config import GAME_CONFIGS, GAME_TYPE_KEYS, DIFFICULTY_LEVELS, PERFORMANCE_METRICS
+from llm_agent import DifficultyAdapter
+from performance_tracker import PerformanceTracker
+
+logger = logging.getLogger(__name__)
+
+MIN_DIFFICULTY = min(DIFFICULTY_LEVELS.values())
+MAX_DIFFICULTY = max(DIFFICULTY_LEVELS.values())
+
+
+def interpolate_settings(game_type: str, difficulty: float) -> dict:
+    """Engine settings for a numeric difficulty, blended between named tiers
+
+    Numeric knobs are interpolated linearly between the two surrounding tiers
+    (integers are rounded); flags are taken from the nearest tier.
+    """
+    config = GAME_CONFIGS[GAME_TYPE_KEYS.get(game_type, game_type)]
+    tiers = sorted(
+        (DIFFICULTY_LEVELS[name], levels)
+        for name, levels in config["difficulty_levels"].items()
+    )
+    difficulty = min(max(difficulty, tiers[0][0]), tiers[-1][0])
+    lower = max((t for t in tiers if t[0] <= difficulty), key=lambda t: t[0])
+    upper = min((t for t in tiers if t[0] >= difficulty), key=lambda t: t[0])
+    span = upper[0] - lower[0]
+    weight = (difficulty - lower[0]) / span if span else 0.0
+    nearest = upper if weight >= 0.5 else lower
+
+    keys = set(lower[1]) | set(upper[1])
+    settings = {}
+    for key in keys:
+        low, high = lower[1].get(key), upper[1].get(key)
+        if isinstance(low, bool) or isinstance(high, bool) or low is None or high is None:
+            settings[key] = nearest[1].get(key, False)
+        elif isinstance(low, int) and isinstance(high, int):
+            settings[key] = int(round(low + (high - low) * weight))
+        else:
+            settings[key] = low + (high - low) * weight
+    return settings
+
+
+def difficulty_name(difficulty: float) -> str:
+    """Closest named tier for a numeric difficulty"""
+    return min(DIFFICULTY_LEVELS, key=lambda name: abs(DIFFICULTY_LEVELS[name] - difficulty))
+
+
+class DifficultyController:
+    """Deterministic per-player difficulty with direct engine settings"""
+
+    def __init__(self, tracker: PerformanceTracker, initial: str = "medium",
+                 metrics: dict = None):
+        self.metrics = metrics or PERFORMANCE_METRICS
+        self.tracker = tracker
+        self.adapter = DifficultyAdapter(tracker)
+        self.difficulty = float(DIFFICULTY_LEVELS.get(initial, DIFFICULTY_LEVELS["medium"]))
+        self.last_narration: Optional[dict] = None
+        self._narration_task: Optional[asyncio.Task] = None
+
+    def _adaptation_rate(self) -> float:
+        """Step size on the 1-5 scale: move faster at the extremes"""
+        rates = self.metrics["adaptation_rates"]
+        mastery = self.metrics["progression_thresholds"]["mastery"]
+        win_rate = self.tracker.weighted_win_rate
+        if win_rate >= mastery or win_rate <= 1 - mastery:
+            rate = rates["quick"]
+        elif self.tracker.overall.window.full:
+            rate = rates["normal"]
+        else:
+            rate = rates["slow"]
+        return rate * (MAX_DIFFICULTY - MIN_DIFFICULTY)
+
+    def update(self, game_type: str) -> dict:
+        """Re-evaluate difficulty after a finished game; returns engine settings"""
+        self.adapter.adaptation_rate = self._adaptation_rate()
+        adjustment = self.adapter.step(self.difficulty)
+        self.difficulty = min(MAX_DIFFICULTY, max(MIN_DIFFICULTY, adjustment["new_difficulty"]))
+        return self.settings_for(game_type)
+
+    def settings_for(self, game_type: str) -> dict:
+        """Current engine settings for a game type"""
+        return {
+            **interpolate_settings(game_type, self.difficulty),
+            "difficulty": self.difficulty,
+            "difficulty_name": difficulty_name(self.difficulty)
+        }
+
+    def can_progress(self) -> bool:
+        return self.tracker.win_rate >= self.metrics["progression_thresholds"]["level_completion"]
+
+    def is_mastered(self) -> bool:
+        return self.tracker.win_rate >= self.metrics["progression_thresholds"]["mastery"]
+
+    def request_narration(self, game_master, game_type: str) -> None:
+        """Optionally ask the game master for flavor text, without waiting for it"""
+        if self._narration_task is not None and not self._narration_task.done():
+            return
+        self._narration_task = asyncio.create_task(self._narrate(game_master, game_type))
+
+    async def _narrate(self, game_master, game_type: str):
+        try:
+            self.last_narration = await game_master.narrate_difficulty_change(
+                self.tracker.summary()["overall"],
+                difficulty_name(self.difficulty),
+                game_type
+            )
+        except Exception as e:
+            logger.warning(f"Difficulty narration failed: {e}")
@@ -0,0 +1,127 @@
+"""
+Process pool for CPU-bound engine work.
+
+AI move search and batch simulations run in worker processes so a deep
+search never blocks the asyncio loop that serves every other session.
+Positions travel as bitboard int pairs (see bitboard.py) rather than numpy
+arrays, and every move request carries an absolute deadline: the worker
+returns its best move found so far, and if the reply is still late the
+caller falls back to a cheap local move. Workers map the shared read-only
+assets (line tables, opening book; see asset_store.py) once at startup
+instead of each building a private copy.
+"""
+
+import asyncio
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from asset_store import ASSETS, attach_worker
+from bitboard import legal_cells, cell_masks_for, has_line, full_mask
+from config import ASSET_SETTINGS, ENGINE_WORKER_SETTINGS
+from tictactoe_ai import choose_move, quick_move, engine_for
+from mcts import MCTSPlayer
+from session_rng import RandomBuffer
+
+
+def _move_job(p1: int, p2: int, player: int, settings: dict, seed, deadline: float, size: int) -> int:
+    """Worker entry point: search one move with the engine for this cube size"""
+    if engine_for(size, settings) == "mcts":
+        return MCTSPlayer(size, seed).choose_move(p1, p2, player, settings, deadline)
+    return choose_move(p1, p2, player, settings, seed, deadline, size)
+
+
+def _simulate_job(settings: dict, games: int, seed, size: int) -> dict:
+    """Worker entry point: AI (player 2) against a random player 1"""
+    rng = RandomBuffer(seed)
+    cell_masks = cell_masks_for(size)
+    full = full_mask(size)
+    results = Counter()
+    for _ in range(games):
+        boards = [0, 0, 0]
+        player = 1
+        while True:
+            if player == 1:
+                cell = rng.choice(legal_cells(boards[1], boards[2], size, settings.get("gravity", False)))
+            else:
+                cell = choose_move(boards[1], boards[2], 2, settings, rng, None, size)
+            boards[player] |= 1 << cell
+            if has_line(boards[player], cell_masks[cell]):
+                results["win" if player == 1 else "lose"] += 1
+                break
+            if boards[1] | boards[2] == full:
+                results["draw"] += 1
+                break
+            player = 3 - player
+    return dict(results)
+
+
+class EngineWorkerPool:
+    """Awaitable front end to a process pool running engine searches"""
+
+    def __init__(self, max_workers: Optional[int] = None, settings: dict = None):
+        self.settings = {**ENGINE_WORKER_SETTINGS, **(settings or {})}
+        self.max_workers = max_workers or self.settings["max_workers"]
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats = {"moves": 0, "timeouts": 0, "simulated_games": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created on first use so importing or constructing the pool is free
+        if self._executor is None:
+            ASSETS.ensure()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=attach_worker,
+                initargs=(ASSETS.directory, ASSET_SETTINGS["worker_assets"])
+            )
+        return self._executor
+
+    async def compute_move(self, p1: int, p2: int, player: int = 2, settings: dict = None,
+                           budget: Optional[float] = None, seed=None, size: int = 3,
+                           deterministic: bool = False) -> int:
+        """Search a move in a worker; `budget` is the thinking time in seconds
+
+        With deterministic=True there is no time limit and no local
+        fallback: the engines stop on their node and iteration budgets, so
+        the move depends only on the position, settings and seed.
+        """
+        budget = budget if budget is not None else self.settings["move_deadline"]
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self._get_executor(), _move_job,
+            p1, p2, player, settings or {}, seed,
+            None if deterministic else time.time() + budget, size
+        )
+        self.stats["moves"] += 1
+        if deterministic:
+            return await future
+        try:
+            return await asyncio.wait_for(future, budget + self.settings["deadline_grace"])
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            return quick_move(p1, p2, player, size, (settings or {}).get("gravity", False))
+
+    async def simulate(self, games: int, settings: dict = None, seed=None, size: int = 3) -> dict:
+        """Play many AI vs random games spread across all workers"""
+        chunk = self.settings["simulation_chunk"]
+        rng = random.Random(seed)
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        jobs = []
+        for start in range(0, games, chunk):
+            jobs.append(loop.run_in_executor(
+                executor, _simulate_job,
+                settings or {}, min(chunk, games - start), rng.getrandbits(64), size
+            ))
+        totals = Counter()
+        for partial in await asyncio.gather(*jobs):
+            totals.update(partial)
+        self.stats["simulated_games"] += games
+        return {outcome: totals[outcome] for outcome in ("win", "lose", "draw")}
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
@@ -1,25 +1,98 @@
-import numpy as np
 import json
 from typing import Optional, Dict, Any
 from enum import Enum
 import time
 import asyncio
+import sys
+import threading
 
 from game_manager import EnhancedGameManager
+from engine_workers import EngineWorkerPool
+from llm_agent import StorytellerAgent
+from story_pool import StoryPool
 from config import GAME_GENRES
-from tictactoe import TicTacToe3D
+from rps_rules import get_rule_set
+from response_parser import parse_response
+from speculation import OUTCOME_DIALOGUES, OutcomeDialogueSpeculator
+from renderer import Frame, TYPEWRITER
 import logging
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-async def get_player_move(game_type: str, board=None) -> dict:
+class ConsoleReader:
+    """The only reader of stdin: one daemon thread feeding lines into a queue
+
+    Every console read in the game awaits this queue, so a read that is
+    cancelled (the move clock ran out) leaves no thread blocked on stdin
+    racing the next reader for the following line.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._eof = False
+
+    def _start(self):
+        loop = asyncio.get_running_loop()
+        queue = self._queue = asyncio.Queue()
+
+        def pump():
+            while True:
+                line = sys.stdin.readline()
+                try:
+                    loop.call_soon_threadsafe(queue.put_nowait, line)
+                except RuntimeError:
+                    return  # Event loop closed
+                if not line:
+                    return
+
+        threading.Thread(target=pump, name="console-reader", daemon=True).start()
+
+    async def readline(self, prompt: str = "") -> str:
+        if self._eof:
+            raise EOFError
+        if self._queue is None:
+            self._start()
+        if prompt:
+            sys.stdout.write(prompt)
+            sys.stdout.flush()
+        line = await self._queue.get()
+        if not line:
+            self._eof = True
+            raise EOFError
+        return line.rstrip("\n")
+
+    def discard_pending(self):
+        """Drop lines typed before now (e.g. a late answer after a timeout)"""
+        while self._queue is not None and not self._queue.empty():
+            line = self._queue.get_nowait()
+            if not line:
+                self._eof = True
+
+CONSOLE = ConsoleReader()
+
+async def read_input(prompt: str = "") -> str:
+    """Read a line without blocking the event loop (background tasks keep running)"""
+    return await CONSOLE.readline(prompt)
+
+async def get_player_move(game_type: str, board=None, gravity: bool = False) -> dict:
     """Get and validate player move based on game type"""
-    if game_type == "3D Tic Tac Toe":
+    if game_type == "3D Tic Tac Toe" and gravity:
+        while True:
+            try:
+                print("\nEnter a column (x y), each number from 0-2; your piece drops to the lowest free level:")
+                x, y = map(int, (await read_input("> ")).strip().split())
+                if 0 <= x <= 2 and 0 <= y <= 2:
+                    return {"type": "move", "position": [x, y, 0]}
+                print("Invalid coordinates. Please use numbers 0-2.")
+            except (ValueError, IndexError):
+                print("Invalid input. Please enter two numbers separated by spaces.")
+
+    elif game_type == "3D Tic Tac Toe":
         while True:
             try:
                 print("\nEnter your move (x y z), each number from 0-2:")
-                move = input("> ").strip().split()
+                move = (await read_input("> ")).strip().split()
                 x, y, z = map(int, move)
                 if 0 <= x <= 2 and 0 <= y <= 2 and 0 <= z <= 2:
                     return {"type": "move", "position": [x, y, z]}
@@ -27,12 +100,24 @@ async def get_player_move(game_type: str, board=None) -> dict:
             except (ValueError, IndexError):
                 print("Invalid input. Please enter three numbers separated by spaces.")
                 
+    elif game_type == "Number Prediction Game":
+        while True:
+            try:
+                raw = (await read_input("\nEnter your prediction(s), separated by spaces: ")).split()
+                predictions = [int(value) for value in raw]
+                if predictions:
+                    return {"type": "move", "predictions": predictions}
+            except ValueError:
+                pass
+            print("Invalid input. Please enter whole numbers.")
+            
     elif game_type == "Strategic Rock Paper Scissors":
+        moves = get_rule_set().names
         while True:
-            choice = input("\nEnter your choice (rock/paper/scissors): ").lower().strip()
-            if choice in ["rock", "paper", "scissors"]:
+            choice = (await read_input(f"\nEnter your choice ({'/'.join(moves)}): ")).lower().strip()
+            if choice in moves:
                 return {"type": "move", "choice": choice}
-            print("Invalid choice. Please choose rock, paper, or scissors.")
+            print(f"Invalid choice. Please choose one of: {', '.join(moves)}.")
 
 class DialogueResponse(Enum):
     CONTINUE = "continue"
@@ -46,20 +131,19 @@ class DialogueInteractionHandler:
         self.last_dialogue: Optional[str] = None
     
     async def print_with_typing_effect(self, text: str) -> None:
-        """Print text with a typewriter effect."""
-        for char in text:
-            print(char, end='', flush=True)
-            await asyncio.sleep(self.typing_speed)
-        print()  # New line at the end
+        """Print text with a typewriter effect (chunked writes from a shared timer)."""
+        chars_per_second = 1 / self.typing_speed if self.typing_speed > 0 else 0
+        await TYPEWRITER.type(text, chars_per_second)
     
     def display_options(self) -> None:
         """Display the available interaction options."""
-        print("\nOptions:")
-        print("- Press ENTER to continue")
-        print("- Type 'r' to repeat dialogue")
-        print("- Type 's' to skip typing animation")
-        print("- Type 'q' to quit")
-        print("\nYour choice: ", end='', flush=True)
+        with Frame() as frame:
+            frame.line("\nOptions:")
+            frame.line("- Press ENTER to continue")
+            frame.line("- Type 'r' to repeat dialogue")
+            frame.line("- Type 's' to skip typing animation")
+            frame.line("- Type 'q' to quit")
+            frame.write("\nYour choice: ")
     
     async def handle_response(self, dialogue: Dict[str, Any]) -> DialogueResponse:
         """Handle displaying dialogue and getting user response."""
@@ -79,7 +163,7 @@ class DialogueInteractionHandler:
             
             while True:
                 self.display_options()
-                user_input = input().lower().strip()
+                user_input = (await read_input()).lower().strip()
                 
                 if user_input == "":
                     return DialogueResponse.CONTINUE
@@ -136,6 +220,20 @@ async def process_dialogue_interaction(game_state: Dict[str, Any], dialogue: Dic
 async def main():
     """Enhanced main function with configuration support"""
     print("\n=== Welcome to the Multi-Agent Game System ===")
+    story_pool = StoryPool(StorytellerAgent())
+    # AI search runs in worker processes so it never stalls the event loop
+    engine_pool = EngineWorkerPool()
+    game_manager = EnhancedGameManager(story_pool=story_pool, engine_pool=engine_pool)
+    story_pool.storyteller.usage = game_manager.usage
+    try:
+        return await play(game_manager, story_pool)
+    finally:
+        game_manager.release_resources()
+        await story_pool.close()
+        engine_pool.shutdown(wait=False)
+
+async def play(game_manager: EnhancedGameManager, story_pool: StoryPool):
+    """Console session: preferences, then up to three levels of play"""
     
     # Display available genres
     print("\nAvailable Genres:")
@@ -144,7 +242,7 @@ async def main():
         print(f"   Themes: {', '.join(GAME_GENRES[genre]['themes'])}")
         
     # Get player preferences
-    genre_choice = input("\nChoose a genre (number): ").strip()
+    genre_choice = (await read_input("\nChoose a genre (number): ")).strip()
     genres = list(GAME_GENRES.keys())
     genre = genres[int(genre_choice) - 1] if genre_choice.isdigit() and \
             0 < int(genre_choice) <= len(genres) else "fantasy"
@@ -153,9 +251,11 @@ async def main():
     print("1. Strategic - Careful planning and thoughtful moves")
     print("2. Aggressive - Bold moves and high-risk plays")
     print("3. Defensive - Cautious play and counter-strategies")
-    style_choice = input("> ").strip()
+    style_choice = (await read_input("> ")).strip()
     style_map = {"1": "strategic", "2": "aggressive", "3": "defensive"}
     play_style = style_map.get(style_choice, "strategic")
+    # Only the chosen genre and style: warming every style spent calls on stories nobody takes
+    story_pool.warm([genre], [play_style])
     
     player_preferences = {
         "preferred_genre": genre,
@@ -164,11 +264,11 @@ async def main():
     }
     
     # Initialize enhanced game manager
-    game_manager = EnhancedGameManager()
     await game_manager.initialize_game(genre, player_preferences)
     print(game_manager.game_state.state['story']['opening_narrative'])
-    time.sleep(10)
+    await asyncio.sleep(10)
     # Enhanced game loop with better feedback
+    speculator = OutcomeDialogueSpeculator()
     level = 0
     while level < 3:
         print(f"\n=== Level {level + 1} ===")
@@ -183,11 +283,12 @@ async def main():
         intro_dialogue = await game_manager.current_character.generate_dialogue(
             "greeting",
             {
-                "progress": game_manager.game_state.state,
+                "progress": game_manager.progress_summary(),
                 "previous_interaction": None
             }
         )
-        intro_dialogue=json.loads(intro_dialogue)
+        intro_dialogue = parse_response("character.dialogue_generation.greeting", intro_dialogue,
+                                        fallback={"dialogue_text": intro_dialogue, "tone": "neutral"})
         # print(intro_dialogue)
         should_continue = await process_dialogue_interaction(
             game_manager.game_state.state,
@@ -202,17 +303,45 @@ async def main():
         
 
         
-        # Game-specific loop with enhanced feedback
+        # Game-specific loop with enhanced feedback; the board persists
+        # across turns and is reset (not reallocated) for the next match
+        game_manager.start_match()
         while True:
             if game_type == "3D Tic Tac Toe":
-                game_manager.game_state.state["tictactoe_game"]=TicTacToe3D()
-                game_manager.game_state.state["tictactoe_game"].print_board()
+                game_manager.current_game_engine().print_board()
+            elif game_type == "Number Prediction Game":
+                print(f"\n{game_manager.current_game_engine().get_sequence_display()}")
                 
-            # Get player move
-            player_action = await get_player_move(game_type)
-            
-            # Process turn with enhanced feedback
-            result = await game_manager.process_turn(player_action)
+            # Get player move, racing the move clock when the game is timed
+            engine = game_manager.current_game_engine()
+            timeout = game_manager.wait_for_timeout()
+            move_task = asyncio.ensure_future(
+                get_player_move(game_type, gravity=getattr(engine, "gravity", False))
+            )
+            await asyncio.wait({move_task, timeout}, return_when=asyncio.FIRST_COMPLETED)
+            if move_task.done():
+                timeout.cancel()
+                player_action = move_task.result()
+                
+                # This move may end the match: pre-generate both end-of-game
+                # lines from it while the turn (and the AI search) runs
+                if game_manager.worth_speculating():
+                    speculator.start(game_manager.current_character, player_action)
+                
+                # Process turn with enhanced feedback
+                result = await game_manager.process_turn(player_action)
+            else:
+                # Cancelling only stops waiting on the shared reader; late
+                # input is dropped and the next line is the Enter below
+                move_task.cancel()
+                CONSOLE.discard_pending()
+                print("\nTime's up! Press Enter to continue.")
+                await read_input()
+                player_action = {"type": "timeout"}
+                result = timeout.result()
+            if result['game_result']['status'] not in OUTCOME_DIALOGUES:
+                # Draw or game goes on: the speculated lines are for this move only
+                speculator.cancel()
             # should_continue = await process_dialogue_interaction(
             #     game_manager.game_state.state,
             #     json.loads(result['dialogue'])
@@ -226,6 +355,8 @@ async def main():
             # print(f"\nCharacter: {result['dialogue']}")
             if result['hint']:
                 print(f"Hint: {result['hint']}")
+            if game_type == "Number Prediction Game":
+                print(result['game_result']['message'])
                 
             # Show score updates
             # if 'state_update' in result:
@@ -234,12 +365,14 @@ async def main():
                 
             if result['game_result']['status'] in ['win', 'lose', 'draw']:
                 if result['game_result']['status'] == 'win':
-                    victory_dialogue = await game_manager.current_character.generate_dialogue(
+                    victory_dialogue = await speculator.take(
+                        game_manager.current_character,
                         "victory",
                         {"result": "win", "strategy": player_action}
                     )
                     # print(f"\nCharacter: {victory_dialogue}")
-                    victory_dialogue=json.loads(victory_dialogue)
+                    victory_dialogue = parse_response("character.dialogue_generation.victory", victory_dialogue,
+                                                      fallback={"dialogue_text": victory_dialogue})
                     should_continue = await process_dialogue_interaction(
                         game_manager.game_state.state,
                         {"dialogue":{"text":victory_dialogue['dialogue_text']}}
@@ -252,12 +385,14 @@ async def main():
                         }
                     level += 1
                 elif result['game_result']['status'] == 'lose':
-                    defeat_dialogue = await game_manager.current_character.generate_dialogue(
+                    defeat_dialogue = await speculator.take(
+                        game_manager.current_character,
                         "defeat",
                         {"result": "lose", "strategy": player_action}
                     )
                     # print(f"\nCharacter: {defeat_dialogue}")
-                    defeat_dialogue=json.loads(defeat_dialogue)
+                    defeat_dialogue = parse_response("character.dialogue_generation.defeat", defeat_dialogue,
+                                                     fallback={"dialogue_text": defeat_dialogue})
                     should_continue = await process_dialogue_interaction(
                         game_manager.game_state.state,
                         {"dialogue":{"text":defeat_dialogue['dialogue_text']}}
@@ -273,6 +408,7 @@ async def main():
                 
             await asyncio.sleep(1)
             
+    speculator.cancel()
     print("\n=== Game Complete ===")
     print(f"Final Score: {game_manager.game_state.state['score']}")
     print(f"Games Played: {game_manager.game_state.state['games_played']}")
@@ -1,24 +1,65 @@
-import random
+import asyncio
+import json
+import time
+import uuid
+from typing import Optional, Tuple
 
 from llm_agent import StorytellerAgent, GameMasterAgent, AdvisorAgent, CharacterAgent
 from tictactoe import TicTacToe3D
 from number_pred import NumberPredictionGame
+from story_pool import StoryPool
+from performance_tracker import PerformanceTracker
+from difficulty_controller import DifficultyController
+from engine_workers import EngineWorkerPool
+from tictactoe_ai import choose_move, engine_for
+from mcts import MCTSPlayer
+import bitboard
+from token_accounting import ACCOUNTANT, SessionUsage
+from session_rng import SessionRNG
+from state_delta import DeltaLog
+from session_state import GAME_STATE_TEMPLATE
+from object_pool import GameObjectPool, OBJECT_POOL
+from timer_wheel import TimerWheel, TIMER_WHEEL
+from rps_rules import RuleSet, get_rule_set, OUTCOME_STATUS, WIN, LOSE, DRAW
 
-from config import GAME_GENRES, DEFAULT_GAME_STATE, PERFORMANCE_METRICS
+from config import GAME_GENRES, GAME_CONFIGS, GAME_TYPE_KEYS, PERFORMANCE_METRICS, ENGINE_WORKER_SETTINGS, HINT_SETTINGS
 
 class GameManager:
     """Coordinates all agents and manages game flow"""
     
-    def __init__(self):
+    def __init__(self, story_pool: StoryPool = None, engine_pool: EngineWorkerPool = None,
+                 object_pool: GameObjectPool = None, timers: TimerWheel = None):
         self.storyteller = StorytellerAgent()
         self.game_master = GameMasterAgent()
         self.advisor = AdvisorAgent()
         self.current_character = None
+        self.story_pool = story_pool
+        self.engine_pool = engine_pool
+        self.object_pool = object_pool or OBJECT_POOL
+        self._pooled = {}  # slot -> (pool key, object) borrowed from object_pool
+        self._mcts = None  # In-process MCTS opponent, reused across moves
+        # Move clock: one timer in the shared wheel per session
+        self.timers = timers or TIMER_WHEEL
+        self._move_timer = None
+        self._timeout_waiter: Optional[asyncio.Future] = None
+        self._pending_timeout: Optional[dict] = None
+        self.difficulty_controller = None
+        self.usage = None
+        
+    def bind_usage(self, usage: SessionUsage):
+        """Attach a session's token accounting to every agent"""
+        self.usage = usage
+        for agent in (self.storyteller, self.game_master, self.advisor, self.current_character):
+            if agent is not None:
+                agent.usage = usage
         
     async def initialize_game(self, genre: str, player_preferences: dict):
         """Initialize game with player preferences"""
-        # Generate story structure
-        story = await self.storyteller.generate_story(genre, player_preferences)
+        # Take a pre-generated story if a pool is attached, else generate one
+        if self.story_pool is not None:
+            story = await self.story_pool.take(genre, player_preferences)
+        else:
+            story = await self.storyteller.generate_story(genre, player_preferences)
         self.game_state.state.update({
             "genre":genre,
             "story": story,
@@ -42,10 +83,21 @@ class GameManager:
             "traits": ["challenging", "engaging"],
             "style": "enigmatic"
         }
-        # Create character agent for this level
+        # Reuse a pooled character for this genre/level/archetype; build and
+        # initialize (a model call) only on a miss
         # character_profile = level_info["character"]
-        self.current_character = CharacterAgent(character_profile, level_index, self.game_state.state['genre'])
-        await self.current_character.initialize()
+        genre = self.game_state.state['genre']
+        key = ("character", genre, level_index,
+               json.dumps(character_profile["archetype"], sort_keys=True, default=str))
+        self._release_slot("character")
+        character = self.object_pool.acquire(key)
+        if character is None:
+            character = CharacterAgent(character_profile, level_index, genre)
+            character.usage = self.usage
+            await character.initialize()
+        character.usage = self.usage
+        self.current_character = character
+        self._pooled["character"] = (key, character)
 
         
         # Select appropriate game
@@ -54,9 +106,13 @@ class GameManager:
             level_info
         )
         self.game_state.state["current_game"] = game_config['selected_game']
+        # A new level starts a fresh RPS history (the old one is of another opponent)
+        self.game_state.state.pop("rps_rule_set", None)
         
     async def play_turn(self, player_action: dict) -> dict:
         """Process a single turn of gameplay"""
+        # The move is in: stop its clock before any await (the hint can take a while)
+        self.timers.cancel(self._move_timer)
         # Update game state with player action
         self.game_state.state["player_action"] = player_action
         
@@ -67,43 +123,224 @@ class GameManager:
         if self._should_provide_hint():
             hint = await self.advisor.generate_hint(
                 self.game_state.state,
-                self.game_state.state["current_game"]["difficulty"]
+                self.game_state.state["current_game"]["difficulty"],
+                rephrase=self._should_rephrase_hint()
             )
         else:
             hint = None
             
         # Process game logic and get result
-        game_result = self._process_game_logic(player_action)
-        
-        # Adjust difficulty if needed
-        # if game_result["status"] in ["win", "lose"]:
-        #     difficulty_adjustment = await self.game_master.adjust_difficulty({
-        #         "result": game_result["status"],
-        #         "difficulty": self.game_state.state["current_game"]["difficulty"]
-        #     })
-        #     self.game_state.state["current_game"]["difficulty"] = difficulty_adjustment["new_difficulty"]
+        if self.game_state.state.get("match_status") not in (None, "in_progress"):
+            return {"hint": hint, "game_result": {
+                "status": "invalid", "message": "Match is over - start a new match",
+                "version": self.game_state.deltas.version, "changes": []
+            }}
+        game_result = await self._process_game_logic(player_action)
+        self._record_result(game_result)
+        if self.game_state.state.get("match_status") == "in_progress":
+            self.arm_move_timer()
+        return self._package_result(game_result, player_action, hint)
+
+    def _record_result(self, game_result: dict):
+        """Close the match and update performance and difficulty on a final result"""
+        if game_result["status"] in ["win", "lose", "draw"]:
+            self._finish_match(game_result["status"])
+            recent = self.game_state.state.setdefault("recent_results", [])
+            recent.append(game_result["status"])
+            del recent[:-HINT_SETTINGS["recent_results"]]
+            game_type = self.game_state.state["current_game"]["type"]
+            self.game_state.update_performance(game_result["status"], game_type)
             
-        return {
+            # Adjust difficulty locally; no model call on the critical path
+            if self.difficulty_controller is not None:
+                settings = self.difficulty_controller.update(game_type)
+                self.game_state.state["current_game"]["engine_settings"] = settings
+                self.game_state.state["difficulty"] = settings["difficulty_name"]
+
+    def _package_result(self, game_result: dict, player_action: dict, hint=None) -> dict:
+        """Version the turn and attach the changes (or a snapshot) for the client"""
+        # Version the turn; the result carries only what changed
+        deltas = self.game_state.deltas
+        known_version = player_action.get("known_version")
+        game_result["version"] = deltas.commit(game_result.pop("changes", []))
+        game_result["changes"] = deltas.since(
+            game_result["version"] - 1 if known_version is None else known_version
+        )
+        
+        result = {
             "hint": hint,
-            "game_result": game_result,
-            "game_state": self.game_state.state
+            "game_result": game_result
         }
+        # Full snapshot only on request, or when the client is too far behind
+        if player_action.get("full_state") or game_result["changes"] is None:
+            result["snapshot"] = self.snapshot()
+        return result
+        
+    def snapshot(self) -> dict:
+        """Full state for (re)synchronising a client"""
+        game = self.game_state.state.get("tictactoe_game")
+        return {
+            "version": self.game_state.deltas.version,
+            "board": game.board.tolist() if game is not None else None,
+            "game_state": self.game_state.state.to_dict()
+        }
+
+    def progress_summary(self) -> dict:
+        """Plain progress fields for character prompts"""
+        state = self.game_state.state
+        return {
+            "level": state.get("current_level", 0) + 1,
+            "game": state.get("current_game", {}).get("type"),
+            "difficulty": state.get("difficulty"),
+            "score": state.get("score", 0),
+            "games_played": state.get("games_played", 0),
+            "current_streak": state.get("current_streak", 0),
+            **state.get("progress", {})
+        }
+        
+    def start_match(self):
+        """Begin a match of the current game, reusing engine objects from earlier matches"""
+        state = self.game_state.state
+        game_type = state["current_game"]["type"]
+        if game_type == "3D Tic Tac Toe":
+            game = state.get("tictactoe_game")
+            if game is None:
+                self._create_tictactoe_game()
+            else:
+                game.reset()
+            if self._mcts is not None:
+                self._mcts.reset()
+        elif game_type == "Strategic Rock Paper Scissors":
+            # History and power meter last the whole level; only the match tally restarts
+            rules = get_rule_set()
+            if state.get("rps_rule_set") != rules.name:
+                self._reset_rps_state(rules)
+            self._reset_rps_match()
+        else:
+            game = state.get("number_game")
+            if game is None:
+                self._create_number_game()
+            else:
+                settings = self._engine_settings()
+                game.reset(settings.get("pattern_complexity", game.difficulty),
+                           dynamic=bool(settings.get("dynamic_patterns")))
+        state["match_status"] = "in_progress"
+        self.game_state.deltas.reset()
+        self._pending_timeout = None
+        self.arm_move_timer()
+        
+    def move_time_limit(self) -> Optional[float]:
+        """Seconds per move for the current game, or None when moves are untimed"""
+        current_game = self.game_state.state["current_game"]
+        config = GAME_CONFIGS.get(GAME_TYPE_KEYS.get(current_game["type"], current_game["type"]), {})
+        rules = config.get("special_rules", {})
+        if not (rules.get("time_limited") or rules.get("time_pressure")):
+            return None
+        # The game master may choose its own limit (seconds) when selecting the game
+        limit = current_game.get("configuration", {}).get("time_limits")
+        if isinstance(limit, (int, float)) and not isinstance(limit, bool) and limit > 0:
+            return float(limit)
+        return rules.get("move_time_limit")
+        
+    def arm_move_timer(self):
+        """(Re)start the clock for the player's next move"""
+        self.timers.cancel(self._move_timer)
+        limit = self.move_time_limit()
+        self._move_timer = self.timers.schedule(limit, self._on_move_timeout) if limit else None
+        
+    def _on_move_timeout(self):
+        """Timer callback: running out of time loses the match"""
+        self._move_timer = None
+        if self.game_state.state.get("match_status") != "in_progress":
+            return
+        game_result = {"status": "lose", "message": "Out of time", "reason": "timeout", "changes": []}
+        self._record_result(game_result)
+        result = self._package_result(game_result, {})
+        if self._timeout_waiter is not None and not self._timeout_waiter.done():
+            self._timeout_waiter.set_result(result)
+        else:
+            self._pending_timeout = result
+        
+    def wait_for_timeout(self) -> asyncio.Future:
+        """Future resolved with the turn result if the move clock runs out"""
+        waiter = asyncio.get_running_loop().create_future()
+        if self._pending_timeout is not None:
+            waiter.set_result(self._pending_timeout)
+            self._pending_timeout = None
+        self._timeout_waiter = waiter
+        return waiter
+        
+    def _finish_match(self, status: str):
+        """Mark the current match as over; the engine objects stay for reuse"""
+        self.game_state.state["match_status"] = status
+        
+    def current_game_engine(self):
+        """Engine object for the current match, if one exists"""
+        state = self.game_state.state
+        game_type = state["current_game"]["type"]
+        if game_type == "3D Tic Tac Toe":
+            return state.get("tictactoe_game")
+        elif game_type == "Number Prediction Game":
+            return state.get("number_game")
+        return None
+        
+    def is_near_end(self) -> bool:
+        """Whether the next turn can decide the current game"""
+        game_type = self.game_state.state["current_game"]["type"]
+        if game_type == "3D Tic Tac Toe":
+            game = self.game_state.state.get("tictactoe_game")
+            return game is not None and game.has_forced_result()
+        elif game_type == "Strategic Rock Paper Scissors":
+            # Only the last round of a match decides it
+            match = self.game_state.state.get("rps_match")
+            rounds = GAME_CONFIGS["strategic_rps"]["rounds_per_match"]
+            return match is not None and match["round"] >= rounds - 1
+        else:
+            game = self.game_state.state.get("number_game")
+            return game is not None and game.rounds_left <= 1
+        
+    def worth_speculating(self) -> bool:
+        """Whether the next turn may end the game behind a pooled AI search
+
+        Only a worker-pool search takes long enough to hide the dialogue
+        requests; RPS and number rounds resolve instantly.
+        """
+        game_type = self.game_state.state["current_game"]["type"]
+        return (game_type == "3D Tic Tac Toe" and self.engine_pool is not None
+                and self.is_near_end())
+        
+    def _engine_settings(self) -> dict:
+        """Engine knobs for the current game from the difficulty controller"""
+        current_game = self.game_state.state["current_game"]
+        settings = current_game.get("engine_settings")
+        if settings is None and self.difficulty_controller is not None:
+            settings = self.difficulty_controller.settings_for(current_game["type"])
+            current_game["engine_settings"] = settings
+        return settings or {}
         
     def _should_provide_hint(self) -> bool:
         """Determine if player needs a hint"""
         recent_losses = sum(1 for result in self.game_state.state.get("recent_results", [])[-3:]
                           if result == "lose")
-        return recent_losses >= 2
+        return recent_losses >= HINT_SETTINGS["hint_after_losses"]
         
-    def _process_game_logic(self, player_action: dict) -> dict:
+    def _should_rephrase_hint(self) -> bool:
+        """A player stuck on a losing run gets the hint reworded by the advisor model"""
+        streak = HINT_SETTINGS["rephrase_after_losses"]
+        recent = self.game_state.state.get("recent_results", [])[-streak:]
+        return len(recent) == streak and all(result == "lose" for result in recent)
+        
+    async def _process_game_logic(self, player_action: dict) -> dict:
         """Process game logic and return result"""
         
         game_type = self.game_state.state["current_game"]["type"]
         print(game_type)
         if game_type == "3D Tic Tac Toe":
-            return self._process_tictactoe(player_action)
+            return await self._process_tictactoe(player_action)
         elif game_type == "Strategic Rock Paper Scissors":
             return self._process_rps(player_action)
+        elif game_type == "Number Prediction Game":
+            return self._process_number_prediction(player_action)
         else:
             return self._process_number_prediction(player_action)
             
@@ -152,45 +389,78 @@ class GameManager:
             
     #     return {"status": "continue", "message": "Your turn"}
 
-    def _process_tictactoe(self, action: dict) -> dict:
+    async def _process_tictactoe(self, action: dict) -> dict:
         """Process 3D Tic Tac Toe game logic"""
         game = self.game_state.state.get("tictactoe_game")
         if not game:
-            game = TicTacToe3D()
-            self.game_state.state["tictactoe_game"] = game
+            game = self._create_tictactoe_game()
             
         # Process player move
         x, y, z = action["position"]
         if not game.make_move(x, y, z, 1):
             return {"status": "invalid", "message": "Invalid move"}
+        # Under gravity the piece may land below the requested z
+        changes = [(*game.last_move, 1)]
             
-        # AI move
-        valid_moves = game.get_valid_moves()
-        if valid_moves:
-            ai_move = random.choice(valid_moves)
+        # AI move, unless the player's move already ended the game
+        winner = game.check_win()
+        if not winner and not game.is_full():
+            ai_move = await self._compute_tictactoe_move(game)
             game.make_move(ai_move[0], ai_move[1], ai_move[2], 2)
+            changes.append((*ai_move, 2))
             
-        # Check game state
+        # Check game state; only the changed cells travel with the result
         winner = game.check_win()
         if winner:
             return {
                 "status": "win" if winner == 1 else "lose",
                 "message": "Game Over",
-                "board": game.board.tolist()
+                "changes": changes
             }
         elif game.is_full():
             return {
                 "status": "draw",
                 "message": "Game Draw",
-                "board": game.board.tolist()
+                "changes": changes
             }
         else:
             return {
                 "status": "continue",
                 "message": "Game Continuing",
-                "board": game.board.tolist()
+                "changes": changes
             }
 
+    async def _compute_tictactoe_move(self, game: TicTacToe3D) -> Tuple[int, int, int]:
+        """Search the AI move off the event loop: in the worker pool, or a thread without one"""
+        settings = self._engine_settings()
+        if game.gravity:
+            settings = {**settings, "gravity": True}
+        p1, p2 = bitboard.encode(game.board)
+        # One seed per move from the session stream keeps replays exact
+        seed = self.game_state.rng.stream("tictactoe").getrandbits(64)
+        # Thinking time in seconds; in-process searches take it as an absolute deadline
+        budget = ENGINE_WORKER_SETTINGS["move_deadline"]
+        deadline = time.time() + budget
+        replay = self.game_state.rng.replay
+        if replay:
+            # Wall-clock limits would make the move depend on machine speed:
+            # seeded sessions stop on node and iteration budgets instead (no
+            # deadline, so without a pool the thread below runs to the budget)
+            settings = {**settings, "max_nodes": ENGINE_WORKER_SETTINGS["replay_max_nodes"]}
+            deadline = None
+        if self.engine_pool is not None:
+            cell = await self.engine_pool.compute_move(p1, p2, 2, settings, budget, seed, game.size,
+                                                       deterministic=replay)
+        elif engine_for(game.size, settings) == "mcts":
+            # In-process MCTS keeps its tree between moves of the match; the
+            # search runs in a thread so timers and input stay live meanwhile
+            if self._mcts is None or self._mcts.size != game.size:
+                self._mcts = MCTSPlayer(game.size, seed)
+            cell = await asyncio.to_thread(self._mcts.choose_move, p1, p2, 2, settings, deadline)
+        else:
+            cell = await asyncio.to_thread(choose_move, p1, p2, 2, settings, seed, deadline, game.size)
+        return bitboard.cell_to_coords(cell, game.size)
+
     # def _check_3d_win(self, board, player):
     #     """Check for win in 3D Tic Tac Toe"""
     #     # Check each 2D plane
@@ -276,37 +546,41 @@ class GameManager:
         This version includes a "strategic" element where the AI adapts to player patterns
         """
         
+        rules = get_rule_set()
         # Initialize game state if needed
-        if 'rps_history' not in self.game_state.state:
-            self.game_state.state['rps_history'] = []
-            self.game_state.state['player_patterns'] = {'R': 0, 'P': 0, 'S': 0}
+        if self.game_state.state.get('rps_rule_set') != rules.name:
+            self._reset_rps_state(rules)
+        if 'rps_match' not in self.game_state.state:
+            self._reset_rps_match()
         
-        # Validate player move
+        # Validate player move (a move name or its letter)
         print(action)
-        player_move = action.get('choice', '').upper()[0]
+        try:
+            player_code = rules.encode(action.get('choice', ''))
+        except ValueError:
+            return {"status": "invalid",
+                    "message": f"Invalid move. Use one of: {', '.join(rules.names)}"}
+        player_move = rules.letters[player_code]
         print("test",player_move)
-        if player_move not in ['R', 'P', 'S']:
-            return {"status": "invalid", "message": "Invalid move. Use R, P, or S"}
         
-        # Update player patterns
-        self.game_state.state['player_patterns'][player_move] += 1
-        
-        # AI move selection based on player patterns
+        # AI move selection based on player patterns (before this move is counted)
         print("waiting for ai")
         ai_move = self._get_strategic_rps_move()
+        
+        # Update player patterns
+        self.game_state.state['player_patterns'][player_move] += 1
 
         print("character_played",ai_move)
         
         # Determine winner
-        result = self._determine_rps_winner(player_move, ai_move)
-
-        print(result['message'])
+        result = self._resolve_rps_round(rules, player_code, rules.encode(ai_move))
         
         # Update history
         self.game_state.state['rps_history'].append({
             'player': player_move,
             'ai': ai_move,
-            'result': result['status']
+            'result': result['status'],
+            'combo': result.get('combo')
         })
         
         if result['status'] == 'win':
@@ -314,38 +588,102 @@ class GameManager:
         elif result['status'] == 'lose':
             self.game_state.state["progress"]["losses"] += 1
         
+        result = self._score_rps_match(result)
+        print(result['message'])
+        return result
+
+    def _reset_rps_match(self):
+        self.game_state.state['rps_match'] = {"round": 0, "wins": 0, "losses": 0, "points": 0}
+
+    def _score_rps_match(self, round_result: dict) -> dict:
+        """Add a round to the match tally; the match ends after rounds_per_match rounds
+
+        The match goes to whoever leads on points, so a round won with a
+        combo outweighs a plain loss.
+        """
+        match = self.game_state.state['rps_match']
+        match["round"] += 1
+        match["points"] += round_result["points"]
+        if round_result["status"] == "win":
+            match["wins"] += 1
+        elif round_result["status"] == "lose":
+            match["losses"] += 1
+        rounds_left = GAME_CONFIGS["strategic_rps"]["rounds_per_match"] - match["round"]
+        tally = f"Round {match['round']}: {match['wins']}-{match['losses']} ({match['points']:+d} points)."
+        result = {**round_result, "round_result": round_result["status"], "round": match["round"],
+                  "rounds_left": max(0, rounds_left), "match_points": match["points"],
+                  "message": f"{round_result['message']} {tally}"}
+        if rounds_left > 0:
+            result["status"] = "continue"
+        elif match["points"] != 0:
+            result["status"] = "win" if match["points"] > 0 else "lose"
+        else:
+            result["status"] = "draw"
         return result
 
     def _get_strategic_rps_move(self):
         """Get AI move based on player patterns"""
+        rules = get_rule_set()
         print(self.game_state.state['player_patterns'])
         patterns = self.game_state.state['player_patterns']
         total_moves = sum(patterns.values())
         print(total_moves)
-        if total_moves < 3:
-            # Initial random moves
-            return random.choice(['R', 'P', 'S'])
+        settings = self._engine_settings()
+        rng = self.game_state.rng.stream("rps")
+        if total_moves < 3 or not settings.get("pattern_recognition", True) \
+                or rng.random() >= settings.get("counter_probability", 1.0):
+            # Initial random moves, or deliberately not countering at lower difficulty
+            return rng.choice(rules.letters)
         
         # Predict player's next move based on their most frequent choice
         likely_move = max(patterns, key=patterns.get)
         
         # Choose counter to predicted move
-        counters = {'R': 'P', 'P': 'S', 'S': 'R'}
-        print(counters[likely_move])
-        return counters[likely_move]
+        counter = rules.letters[rules.counters[rules.encode(likely_move)]]
+        print(counter)
+        return counter
+
+    def _reset_rps_state(self, rules: RuleSet):
+        """Clear the move history the AI predicts from (new level or rule set)"""
+        state = self.game_state.state
+        state['rps_rule_set'] = rules.name
+        state['rps_history'] = []
+        state['player_patterns'] = {letter: 0 for letter in rules.letters}
+        state['power_meter'] = 0
 
-    def _determine_rps_winner(self, player_move: str, ai_move: str) -> dict:
-        """Determine winner of RPS round"""
-        if player_move == ai_move:
-            return {"status": "draw", "message": f"Both chose {player_move}. It's a draw!"}
-        
-        winning_moves = {'R': 'S', 'P': 'R', 'S': 'P'}
-        if winning_moves[player_move] == ai_move:
-            return {"status": "win", 
-                    "message": f"You chose {player_move}, AI chose {ai_move}. You win!"}
+    def _resolve_rps_round(self, rules: RuleSet, player_code: int, ai_code: int) -> dict:
+        """Resolve one RPS round with the rule set's payoff matrix, combos and power meter"""
+        special_rules = GAME_CONFIGS["strategic_rps"]["special_rules"]
+        player_name, ai_name = rules.names[player_code], rules.names[ai_code]
+        player_moves, ai_moves = [player_code], [ai_code]
+        if special_rules.get("combo_moves"):
+            history = self.game_state.state['rps_history']
+            player_moves = [rules.encode(entry['player']) for entry in history] + player_moves
+            ai_moves = [rules.encode(entry['ai']) for entry in history] + ai_moves
+        # Same scoring as the batched simulations: combos boost wins and losses alike
+        played = rules.play_one(player_moves, ai_moves)
+        outcome = played["outcome"]
+        result = {"status": OUTCOME_STATUS[outcome], "points": played["points"]}
+        if outcome == DRAW:
+            result["message"] = f"Both chose {player_name}. It's a draw!"
         else:
-            return {"status": "lose", 
-                    "message": f"You chose {player_move}, AI chose {ai_move}. AI wins!"}
+            winner = "You win!" if outcome == WIN else "AI wins!"
+            result["message"] = f"You chose {player_name}, AI chose {ai_name}. {winner}"
+
+        if played["combo"] and outcome == WIN:
+            result["combo"] = rules.combo_names[played["combo"]]
+            result["message"] += f" Combo: {result['combo']}!"
+        elif played["opponent_combo"] and outcome == LOSE:
+            result["ai_combo"] = rules.combo_names[played["opponent_combo"]]
+            result["message"] += f" AI combo: {result['ai_combo']}!"
+
+        if special_rules.get("power_meter") and outcome == WIN:
+            meter = GAME_CONFIGS["strategic_rps"]["power_meter"]
+            gain = meter["per_win"] + (meter["per_combo"] if "combo" in result else 0)
+            state = self.game_state.state
+            state['power_meter'] = min(meter["max"], state.get('power_meter', 0) + gain)
+            result["power_meter"] = state['power_meter']
+        return result
 
     # def _process_number_prediction(self, action: dict) -> dict:
     #     """Process Number Prediction game logic
@@ -419,33 +757,94 @@ class GameManager:
         """Process Number Prediction game logic"""
         game = self.game_state.state.get("number_game")
         if not game:
-            difficulty = 2
-            
-            game = NumberPredictionGame(difficulty)
-            self.game_state.state["number_game"] = game
+            game = self._create_number_game()
             
-        prediction = action["prediction"]
-        success, message = game.check_prediction(prediction)
-        
-        return {
-            "status": "win" if success else 
-                     "lose" if game.attempts >= game.max_attempts else "continue",
+        # Several guesses per round; scoring happens once, at the end of the match
+        predictions = action.get("predictions")
+        if not predictions:
+            if action.get("prediction") is None:
+                return {"status": "invalid", "message": "No prediction given"}
+            predictions = [action["prediction"]]
+        try:
+            round_result = game.submit(predictions)
+        except ValueError as error:
+            return {"status": "invalid", "message": str(error)}
+        
+        answer = ", ".join(map(str, round_result["answer"]))
+        message = f"Round {round_result['round']}: the answer was {answer}."
+        if round_result["pattern_shift"]:
+            message += " The pattern has shifted!"
+        result = {
+            "status": "continue",
             "message": message,
             "sequence": game.get_sequence_display(),
-            "attempts_left": game.max_attempts - game.attempts
+            "rounds_left": round_result["rounds_left"]
         }
+        if "score" in round_result:
+            score = round_result["score"]
+            result.update({
+                "status": "win" if score["won"] else "lose",
+                "message": f"{message} You got {score['hits']} of {score['rounds']} rounds "
+                           f"({score['required']} needed) for {score['points']} points.",
+                "score": score
+            })
+        return result
+
+    def _create_tictactoe_game(self) -> TicTacToe3D:
+        gravity = GAME_CONFIGS["3D_tic_tac_toe"]["special_rules"]["gravity_enabled"]
+        key = ("3D Tic Tac Toe", 3, gravity)
+        game = self.object_pool.acquire(key, lambda: TicTacToe3D(gravity=gravity))
+        self.game_state.state["tictactoe_game"] = game
+        self._pooled["tictactoe_game"] = (key, game)
+        return game
+
+    def _create_number_game(self) -> NumberPredictionGame:
+        settings = self._engine_settings()
+        difficulty = settings.get("pattern_complexity", 2)
+        dynamic = bool(settings.get("dynamic_patterns"))
+        rng = self.game_state.rng.stream("number_prediction")
+        key = ("Number Prediction Game", None)
+        game = self.object_pool.acquire(
+            key, lambda: NumberPredictionGame(difficulty, rng, dynamic),
+            difficulty=difficulty, rng=rng, dynamic=dynamic
+        )
+        self.game_state.state["number_game"] = game
+        self._pooled["number_game"] = (key, game)
+        return game
+        
+    def _release_slot(self, slot: str):
+        borrowed = self._pooled.pop(slot, None)
+        if borrowed is not None:
+            key, obj = borrowed
+            if slot in self.game_state.state:
+                self.game_state.state[slot] = None
+            self.object_pool.release(key, obj)
+            
+    def release_resources(self):
+        """Return pooled engines and characters at the end of a session"""
+        self.timers.cancel(self._move_timer)
+        self._move_timer = None
+        for slot in list(self._pooled):
+            self._release_slot(slot)
+        self.current_character = None
+        # The process-wide accountant would otherwise keep every session ever played
+        if self.usage is not None:
+            self.usage.accountant.end_session(self.usage.session_id)
 
 class GameState:
     """Manages the current state of the game"""
-    def __init__(self):
-        self.state = DEFAULT_GAME_STATE.copy()
-        self.performance_history = []
-        
-    def update_performance(self, result: str):
+    def __init__(self, seed: int = None):
+        self.session_id = uuid.uuid4().hex
+        # Seeded per-session randomness; the seed is recorded for replays
+        self.rng = SessionRNG(seed)
+        # Defaults are shared; containers are copied the first time this session touches them
+        self.state = GAME_STATE_TEMPLATE.new(rng_seed=self.rng.seed)
+        self.deltas = DeltaLog()
+        self.performance = PerformanceTracker(PERFORMANCE_METRICS)
+        
+    def update_performance(self, result: str, game_type: str = None):
         """Update performance metrics"""
-        self.performance_history.append(result)
-        recent_games = self.performance_history[-PERFORMANCE_METRICS['performance_window']:]
-        win_rate = sum(1 for x in recent_games if x == 'win') / len(recent_games)
+        win_rate = self.performance.record(result, game_type, self.performance.skill_category())
         
         # Update state
         self.state['games_played'] += 1
@@ -456,13 +855,23 @@ class GameState:
             self.state['current_streak'] = 0
             
         return win_rate
+        
+    def should_adjust_difficulty(self) -> Tuple[bool, str]:
+        """Check if difficulty should be adjusted (O(1))"""
+        return self.performance.should_adjust_difficulty()
 
 class EnhancedGameManager(GameManager):
     """Enhanced Game Manager with configuration support"""
     
-    def __init__(self):
-        super().__init__()
-        self.game_state = GameState()
+    def __init__(self, story_pool: StoryPool = None, engine_pool: EngineWorkerPool = None,
+                 seed: int = None, object_pool: GameObjectPool = None, timers: TimerWheel = None):
+        super().__init__(story_pool, engine_pool, object_pool, timers)
+        self.game_state = GameState(seed)
+        self.bind_usage(ACCOUNTANT.session(self.game_state.session_id))
+        self.difficulty_controller = DifficultyController(
+            self.game_state.performance,
+            self.game_state.state["difficulty"]
+        )
         
     async def initialize_game(self, genre: str, player_preferences: dict):
         """Initialize game with enhanced configuration"""
@@ -483,15 +892,14 @@ class EnhancedGameManager(GameManager):
         """Process turn with enhanced feedback and state management"""
         result = await super().play_turn(player_action)
         
-        # Update game state and check for difficulty adjustment
-        # should_adjust, adjustment_type = self.game_state.should_adjust_difficulty()
-        # if should_adjust:
-        #     difficulty_adjustment = await self.game_master.adjust_difficulty({
-        #         "result": result["game_result"]["status"],
-        #         "difficulty": self.game_state.state["difficulty"],
-        #         "adjustment_type": adjustment_type
-        #     })
-        #     self.game_state.state["difficulty"] = difficulty_adjustment["new_difficulty"]
+        # Difficulty was already adjusted locally; optionally ask the game
+        # master for narrative flavor in the background
+        should_adjust, _ = self.game_state.should_adjust_difficulty()
+        if should_adjust and result["game_result"]["status"] in ["win", "lose"]:
+            self.difficulty_controller.request_narration(
+                self.game_master,
+                self.game_state.state["current_game"]["type"]
+            )
             
         return {
             **result,
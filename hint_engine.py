@@ -0,0 +1,190 @@
+"""
+Engine-computed hints for all three games.
+
+Hints are derived from the real game objects held in the game state, so
+they cost microseconds instead of a model round trip:
+
+- 3D Tic Tac Toe: immediate wins, blocks, proven forcing sequences
+  (pn_search) and double-threat (forking) moves
+- Strategic RPS: how predictable the player's own move history is
+- Number prediction: the staged reveals of NumberPredictionGame.get_hint,
+  built from the rule sequence_solver finds in the visible numbers
+
+How much a hint gives away depends on difficulty. The advisor agent only
+involves the model when asked to rephrase one of these hints.
+"""
+
+from collections import Counter
+from typing import Optional
+
+import numpy as np
+
+from asset_store import ASSETS
+from config import DIFFICULTY_LEVELS
+from bitboard import cell_to_coords, encode
+from pn_search import forced_win
+from rps_rules import MOVE_NAMES
+from tictactoe import TicTacToe3D
+
+RPS_NAMES = MOVE_NAMES
+
+# Depth of the forced-win check behind tic-tac-toe hints
+HINT_PROOF_PLIES = 7
+
+_CELL_LINES = {}
+
+
+def cell_lines(game: TicTacToe3D) -> np.ndarray:
+    """Incidence matrix: [cell, line] is 1 when the cell lies on the line"""
+    incidence = ASSETS.array("line_tables", f"incidence_{game.size}")
+    if incidence is not None:
+        return incidence
+    incidence = _CELL_LINES.get(game.size)
+    if incidence is None:
+        incidence = np.zeros((game.size ** 3, len(game.lines)), dtype=np.int8)
+        for line_index, line in enumerate(game.lines):
+            incidence[line, line_index] = 1
+        _CELL_LINES[game.size] = incidence
+    return incidence
+
+
+def _specificity(difficulty) -> str:
+    """How much detail a hint may reveal at this difficulty"""
+    if isinstance(difficulty, str):
+        difficulty = DIFFICULTY_LEVELS.get(difficulty, DIFFICULTY_LEVELS["medium"])
+    if difficulty <= 2:
+        return "exact"
+    elif difficulty <= 4:
+        return "partial"
+    return "vague"
+
+
+def _describe_cell(cell: int, specificity: str, size: int = 3) -> str:
+    x, y, z = cell_to_coords(cell, size)
+    if specificity == "exact":
+        return f"at ({x}, {y}, {z})"
+    elif specificity == "partial":
+        return f"on level {z + 1}"
+    return "somewhere on the board"
+
+
+def tictactoe_threats(game: TicTacToe3D, player: int) -> dict:
+    """Cells where `player` wins immediately and cells that create a double threat"""
+    flat = game.board.reshape(-1)
+    cells = flat[game.lines]
+    own = np.count_nonzero(cells == player, axis=1)
+    empty = np.count_nonzero(cells == 0, axis=1)
+
+    playable = flat == 0
+    if game.gravity:
+        # Only the landing cell of each column can be played right now
+        playable = np.zeros_like(playable)
+        playable[[(x * game.size + y) * game.size + z for x, y, z in game.get_valid_moves()]] = True
+
+    winning_lines = (own == game.size - 1) & (empty == 1)
+    winning_cells = sorted({int(c) for line in game.lines[winning_lines] for c in line if playable[c]})
+
+    # A move forks when it lies on two or more lines it would bring to one move from completion
+    open_lines = (own == game.size - 2) & (empty == 2)
+    fork_counts = cell_lines(game) @ open_lines.astype(np.int8)
+    fork_cells = [int(c) for c in np.flatnonzero((fork_counts >= 2) & playable)]
+    return {"wins": winning_cells, "forks": fork_cells}
+
+
+def tictactoe_hint(game: TicTacToe3D, difficulty) -> dict:
+    specificity = _specificity(difficulty)
+    mine = tictactoe_threats(game, 1)
+    theirs = tictactoe_threats(game, 2)
+    p1, p2 = encode(game.board)
+    # Longer forcing sequences than a single fork, proven by search
+    my_line = None if mine["wins"] or theirs["wins"] else forced_win(p1, p2, 1, HINT_PROOF_PLIES, game.size, game.gravity)
+    their_line = None if my_line or mine["wins"] or theirs["wins"] else \
+        forced_win(p1, p2, 2, HINT_PROOF_PLIES, game.size, game.gravity)
+
+    if mine["wins"]:
+        cell, hint_type = mine["wins"][0], "winning_move"
+        text = f"You can complete a line {_describe_cell(cell, specificity, game.size)}!"
+    elif theirs["wins"]:
+        cell, hint_type = theirs["wins"][0], "block"
+        text = f"Your opponent is one move from a line - block it {_describe_cell(cell, specificity, game.size)}."
+    elif my_line:
+        cell, hint_type = my_line[0], "forced_win"
+        moves = (len(my_line) + 1) // 2
+        text = f"A move {_describe_cell(cell, specificity, game.size)} starts a sequence that wins in {moves} moves."
+    elif their_line:
+        cell, hint_type = their_line[0], "prevent_fork"
+        text = f"Your opponent has a forcing sequence starting {_describe_cell(cell, specificity, game.size)} - take that cell first."
+    elif mine["forks"]:
+        cell, hint_type = mine["forks"][0], "forced_win"
+        text = f"A move {_describe_cell(cell, specificity, game.size)} creates two threats at once."
+    elif theirs["forks"]:
+        cell, hint_type = theirs["forks"][0], "prevent_fork"
+        text = f"Your opponent could set up a double threat {_describe_cell(cell, specificity, game.size)}."
+    elif game.size % 2 and not game.gravity and game.board.reshape(-1)[game.size ** 3 // 2] == 0:
+        cell, hint_type = game.size ** 3 // 2, "positional"
+        text = "The center cell lies on more lines than any other."
+    else:
+        cell, hint_type = None, "positional"
+        text = "Corners share many diagonals - build lines through them."
+
+    return {
+        "text": text,
+        "type": hint_type,
+        "specificity": specificity,
+        "cell": cell
+    }
+
+
+def rps_hint(history: list, difficulty) -> Optional[dict]:
+    """Point out the most exploitable pattern in the player's own moves"""
+    moves = [entry['player'] for entry in history]
+    if len(moves) < 3:
+        return None
+    specificity = _specificity(difficulty)
+
+    counts = Counter(moves)
+    favourite, favourite_count = counts.most_common(1)[0]
+    frequency = favourite_count / len(moves)
+
+    # What the player tends to play right after their last move
+    last = moves[-1]
+    followers = Counter(b for a, b in zip(moves, moves[1:]) if a == last)
+    follow_move, follow_count = followers.most_common(1)[0] if followers else (None, 0)
+    follow_total = sum(followers.values())
+    transition = follow_count / follow_total if follow_total >= 2 else 0.0
+
+    if transition >= frequency and transition > 0.5:
+        hint_type = "transition"
+        if specificity == "vague":
+            text = "Your moves follow each other in a predictable way."
+        else:
+            text = (f"After {RPS_NAMES[last]} you played {RPS_NAMES[follow_move]} "
+                    f"{follow_count} of {follow_total} times - your opponent may expect it.")
+    elif frequency > 0.4:
+        hint_type = "frequency"
+        if specificity == "vague":
+            text = "You are leaning on one move; your opponent keeps count."
+        else:
+            text = (f"You have played {RPS_NAMES[favourite]} {frequency:.0%} of the time, "
+                    f"so expect it to be countered.")
+    else:
+        hint_type = "balanced"
+        text = "Your moves are well mixed - stay unpredictable."
+
+    return {"text": text, "type": hint_type, "specificity": specificity}
+
+
+def compute_hint(state: dict, difficulty) -> Optional[dict]:
+    """Hint for whichever game is currently being played"""
+    game_type = state.get("current_game", {}).get("type")
+    if game_type == "3D Tic Tac Toe":
+        game = state.get("tictactoe_game")
+        return tictactoe_hint(game, difficulty) if game is not None else None
+    elif game_type == "Strategic Rock Paper Scissors":
+        return rps_hint(state.get("rps_history", []), difficulty)
+    else:
+        game = state.get("number_game")
+        if game is None:
+            return None
+        return {"text": game.get_hint(), "type": game.pattern_type,
+                "specificity": _specificity(difficulty)}
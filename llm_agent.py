@@ -1,19 +1,22 @@
 from agent_role import AgentRole
 import json
 from typing import Tuple
-import google.generativeai as genai
 import logging
+import time
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-from prompts import (
-    STORYTELLER_PROMPTS, CHARACTER_PROMPTS,
-    GAME_MASTER_PROMPTS, ADVISOR_PROMPTS
-)
+from prompt_templates import render_prompt
+from response_parser import parse_response, ResponseParseError
+from performance_tracker import PerformanceTracker
+from hint_engine import compute_hint
+from token_accounting import usage_from_response
+
+from llm_client import get_model, get_generation_config
 
 from config import(
-    model, GAME_CONFIGS, PERFORMANCE_METRICS, ERROR_MESSAGES,GAME_GENRES
+    GAME_CONFIGS, GAME_TYPE_KEYS, PERFORMANCE_METRICS, ERROR_MESSAGES,GAME_GENRES
 )
 
 class LLMAgent:
@@ -23,37 +26,62 @@ class LLMAgent:
         self.role = role
         self.personality = personality
         self.conversation_history = []
+        self._static_system_prompt = None
+        self.usage = None  # SessionUsage handle, bound by the game manager
         
-    async def generate_response(self, prompt: str, context: dict = None) -> str:
+    async def generate_response(self, prompt: str, context: dict = None, prompt_key: str = None) -> str:
         """Generate response using Gemini"""
-        # Construct the full prompt with personality and context
+        # Stable content goes first (role/personality, then the template) and
+        # the per-call context last, so backends with prefix caching can reuse it
         # logger.debug(f"Generating response for prompt: {prompt[:100]}...")
-        system_prompt = self._construct_system_prompt(context)
-        full_prompt = f"{system_prompt}\n\nUser: {prompt}\n\nAssistant:"
+        full_prompt = (f"{self._get_static_system_prompt()}\n\nUser: {prompt}"
+                       f"{self._construct_context_prompt(context)}\n\nAssistant:")
+        
+        if self.usage is not None and self.usage.over_budget:
+            # Session budget spent: answer locally instead of calling the model
+            text = self._get_fallback_response()
+            self.usage.record(self.role.value, prompt_key,
+                              usage_from_response(None, "", ""), 0.0, fallback=True)
+            return text
         
+        start = time.perf_counter()
         try:
+            # The SDK and model are created lazily on the first call
+            model = get_model()
             response = await model.generate_content_async(full_prompt,
-                                                          generation_config=genai.GenerationConfig(
-                                                                    response_mime_type="application/json",
-                                                        ))
-                                             
-            return response.text
+                                                          generation_config=get_generation_config())
+            text = response.text
+            fallback = False
         except Exception as e:
             print(f"Error generating response: {e}")
-            return self._get_fallback_response()
+            response = None
+            text = self._get_fallback_response()
+            fallback = True
+            
+        if self.usage is not None:
+            self.usage.record(self.role.value, prompt_key,
+                              usage_from_response(response, full_prompt, text),
+                              time.perf_counter() - start, fallback)
+        return text
             
     def _construct_system_prompt(self, context: dict = None) -> str:
         """Construct system prompt based on role and context"""
-        base_prompt = f"You are a {self.role.value} in an interactive game. "
-        personality_prompt = f"Your personality traits are: {', '.join(self.personality['traits'])}. "
-        style_prompt = f"Your communication style is {self.personality['style']}. "
+        return self._get_static_system_prompt() + self._construct_context_prompt(context)
+        
+    def _get_static_system_prompt(self) -> str:
+        """Role and personality prompt, rendered once per agent"""
+        if self._static_system_prompt is None:
+            base_prompt = f"You are a {self.role.value} in an interactive game. "
+            personality_prompt = f"Your personality traits are: {', '.join(self.personality['traits'])}. "
+            style_prompt = f"Your communication style is {self.personality['style']}. "
+            self._static_system_prompt = base_prompt + personality_prompt + style_prompt
+        return self._static_system_prompt
         
+    def _construct_context_prompt(self, context: dict = None) -> str:
+        """Dynamic per-call context block"""
         if context:
-            context_prompt = f"\nCurrent context: {json.dumps(context)}"
-        else:
-            context_prompt = ""
-            
-        return base_prompt + personality_prompt + style_prompt + context_prompt
+            return f"\nCurrent context: {json.dumps(context)}"
+        return ""
         
     def _get_fallback_response(self) -> str:
         """Provide fallback responses if LLM fails"""
@@ -66,19 +94,6 @@ class LLMAgent:
         return fallbacks.get(self.role, "Let's continue...")
 
 
-        
-    def should_adjust_difficulty(self) -> Tuple[bool, str]:
-        """Check if difficulty should be adjusted"""
-        if len(self.performance_history) < PERFORMANCE_METRICS['performance_window']:
-            return False, "not_enough_data"
-            
-        win_rate = self.update_performance('dummy')  # Get current win rate
-        if win_rate > PERFORMANCE_METRICS['win_rate_threshold']['increase_difficulty']:
-            return True, "increase"
-        elif win_rate < PERFORMANCE_METRICS['win_rate_threshold']['decrease_difficulty']:
-            return True, "decrease"
-        return False, "maintain"
-
 class StorytellerAgent(LLMAgent):
     """Agent responsible for generating dynamic story and narrative"""
     
@@ -92,19 +107,18 @@ class StorytellerAgent(LLMAgent):
     async def generate_story(self, genre: str, player_preferences: dict) -> dict:
         """Generate story using configured prompts"""
         genre_config = GAME_GENRES[genre]
-        prompt = STORYTELLER_PROMPTS["story_generation"].format(
+        prompt = render_prompt(
+            "storyteller.story_generation",
             genre=genre,
             preferences=json.dumps(player_preferences),
             style=genre_config["tone"]
         )
         
+        response = await self.generate_response(prompt, prompt_key="storyteller.story_generation")
         try:
-            response = await self.generate_response(prompt)
-            story_structure = json.loads(response)
-            return story_structure
-        except Exception as e:
-            print(e)
-            print(response)
+            return parse_response("storyteller.story_generation", response)
+        except ResponseParseError as e:
+            logger.error(f"story generation: {str(e)}")
             print(ERROR_MESSAGES["story_generation_failed"])
             return self._get_fallback_story(genre)
             
@@ -112,7 +126,9 @@ class StorytellerAgent(LLMAgent):
         """Provide a basic story structure if LLM generation fails"""
         return {
             "genre": genre,
+            "fallback": True,
             "title": f"The {genre.title()} Challenge",
+            "opening_narrative": f"A new {genre} challenge awaits you...",
             "levels": [
                 {"name": "Beginner's Trial", "difficulty": 1},
                 {"name": "Expert's Challenge", "difficulty": 2},
@@ -123,7 +139,8 @@ class StorytellerAgent(LLMAgent):
     async def generate_transition(self, current_level: int, next_level: int, 
                                 outcome: str, progress: dict, challenger_profile: dict) -> str:
         """Generate level transition narrative"""
-        prompt = STORYTELLER_PROMPTS["level_transition"].format(
+        prompt = render_prompt(
+            "storyteller.level_transition",
             current_level=current_level,
             next_level=next_level,
             outcome=outcome,
@@ -131,7 +148,7 @@ class StorytellerAgent(LLMAgent):
             challenger_profile=json.dumps(challenger_profile)
         )
         
-        return await self.generate_response(prompt)
+        return await self.generate_response(prompt, prompt_key="storyteller.level_transition")
 
 class GameMasterAgent(LLMAgent):
     """Agent responsible for managing game mechanics and difficulty"""
@@ -146,7 +163,8 @@ class GameMasterAgent(LLMAgent):
     
     async def select_game(self, player_profile: dict, level_info: dict) -> dict:
         """Select game using configured prompts"""
-        prompt = GAME_MASTER_PROMPTS["game_selection"].format(
+        prompt = render_prompt(
+            "game_master.game_selection",
             skill_level=player_profile.get("skill_level", "beginner"),
             performance=json.dumps(player_profile.get("performance", {})),
             style=player_profile.get("play_style", "balanced"),
@@ -156,11 +174,11 @@ class GameMasterAgent(LLMAgent):
         )
         
         try:
-            response = await self.generate_response(prompt)
-            game_config = json.loads(response)
+            response = await self.generate_response(prompt, prompt_key="game_master.game_selection")
+            game_config = parse_response("game_master.game_selection", response)
             # print(game_config)
             return self._apply_game_config(game_config)
-        except Exception as e:
+        except ResponseParseError as e:
             logger.error(f"game selection: {str(e)}", exc_info=True)
             print(ERROR_MESSAGES["game_selection_failed"])
             return self._get_fallback_game()
@@ -170,14 +188,31 @@ class GameMasterAgent(LLMAgent):
     def _get_fallback_game(self) -> dict:
         """Provide fallback game configuration"""
         return {
+            "selected_game": {
+                "type": "3D Tic Tac Toe",
+                "difficulty": "medium",
+                "configuration": {}
+            },
             "game_type": "3D Tic Tac Toe",
             "difficulty": 2,
             "rules": "standard"
         }
     
+    async def narrate_difficulty_change(self, performance: dict, difficulty: str, game_type: str) -> dict:
+        """Describe a difficulty change in story terms (flavor only, never on the critical path)"""
+        prompt = render_prompt(
+            "game_master.difficulty_adjustment",
+            performance=json.dumps(performance),
+            difficulty=difficulty,
+            game_type=game_type
+        )
+        response = await self.generate_response(prompt, prompt_key="game_master.difficulty_adjustment")
+        return parse_response("game_master.difficulty_adjustment", response, fallback=None)
+    
     def _apply_game_config(self, game_config: dict) -> dict:
         """Apply configuration from GAME_CONFIGS"""
-        game_type = game_config['selected_game']["type"]
+        game_type = GAME_TYPE_KEYS.get(game_config['selected_game']["type"],
+                                       game_config['selected_game']["type"])
         if game_type in GAME_CONFIGS:
             base_config = GAME_CONFIGS[game_type]
             # Merge configurations
@@ -199,6 +234,11 @@ class CharacterAgent(LLMAgent):
         super().__init__(AgentRole.CHARACTER, personality)
         # logger.info(f"Created CharacterAgent for level {level} in {genre} genre")
         
+    def reset(self):
+        """Forget per-session state so the character can serve another session"""
+        self.conversation_history.clear()
+        self.usage = None
+        
     async def initialize(self):
         """Initialize character with detailed profile"""
         # logger.info("Starting character initialization...")
@@ -213,7 +253,8 @@ class CharacterAgent(LLMAgent):
     async def _generate_character_profile(self, base_profile: dict):
         """Generate detailed character profile using prompts"""
         # logger.debug("Generating character profile...")
-        prompt = CHARACTER_PROMPTS["character_creation"].format(
+        prompt = render_prompt(
+            "character.character_creation",
             level_number=self.level,
             genre=self.genre,
             archetype=base_profile["archetype"],
@@ -223,9 +264,9 @@ class CharacterAgent(LLMAgent):
         
         try:
             # logger.debug(f"Using prompt: {prompt[:100]}...")
-            response = await self.generate_response(prompt)
+            response = await self.generate_response(prompt, prompt_key="character.character_creation")
             # logger.debug(f"Received response: {response[:100]}...")
-            self.profile = json.loads(response)
+            self.profile = parse_response("character.character_creation", response)
         except Exception as e:
             logger.error(f"Character generation failed: {str(e)}", exc_info=True)
             print(ERROR_MESSAGES["character_creation_failed"])
@@ -233,17 +274,17 @@ class CharacterAgent(LLMAgent):
         
     async def generate_dialogue(self, dialogue_type: str, context: dict) -> str:
         """Generate dialogue using configured prompts"""
-        prompt_template = CHARACTER_PROMPTS["dialogue_generation"][dialogue_type]
         with open("output.txt","w") as f:
             f.write(str(self.profile))
             f.write(str(context))
-        prompt = prompt_template.format(
+        prompt = render_prompt(
+            f"character.dialogue_generation.{dialogue_type}",
             character_name=self.profile["name"],
             character_type=self.profile["archetype"],
             **context
         )
         
-        return await self.generate_response(prompt)
+        return await self.generate_response(prompt, prompt_key=f"character.dialogue_generation.{dialogue_type}")
 
 class AdvisorAgent(LLMAgent):
     """Agent responsible for providing hints and guidance"""
@@ -255,49 +296,58 @@ class AdvisorAgent(LLMAgent):
         }
         super().__init__(AgentRole.ADVISOR, personality)
         
-    async def generate_hint(self, game_state: dict, difficulty: int) -> str:
-        """Generate hint using configured prompts"""
-        prompt = ADVISOR_PROMPTS["hint_generation"].format(
-            position=json.dumps(game_state.get("current_position", {})),
-            history=json.dumps(game_state.get("history", [])),
+    async def generate_hint(self, game_state: dict, difficulty, rephrase: bool = False) -> str:
+        """Generate hint locally; the model is only used to rephrase it on demand"""
+        hint = compute_hint(game_state, difficulty)
+        if hint is None or not rephrase:
+            return hint["text"] if hint else None
+            
+        prompt = render_prompt(
+            "advisor.hint_generation",
+            position=json.dumps(hint),
             difficulty=difficulty
         )
         
-        try:
-            return await self.generate_response(prompt)
-        except Exception:
+        response = await self.generate_response(prompt, prompt_key="advisor.hint_generation")
+        parsed = parse_response("advisor.hint_generation", response, fallback=None)
+        if parsed is None:
             print(ERROR_MESSAGES["hint_generation_failed"])
-            return None
+            return hint["text"]
+        return parsed["hint"]["text"]
     
     async def provide_strategy(self, game_type: str, position: dict, opponent_style: str) -> str:
         """Provide strategic advice"""
-        prompt = ADVISOR_PROMPTS["strategy_advice"].format(
+        prompt = render_prompt(
+            "advisor.strategy_advice",
             game_type=game_type,
             position=json.dumps(position),
             opponent_style=opponent_style
         )
         
-        return await self.generate_response(prompt)
+        return await self.generate_response(prompt, prompt_key="advisor.strategy_advice")
 
 class DifficultyAdapter:
     """Handles dynamic difficulty adjustment"""
     
-    def __init__(self):
-        self.performance_history = []
-        self.adaptation_rate = 0.1
+    def __init__(self, tracker: PerformanceTracker = None):
+        self.tracker = tracker or PerformanceTracker(PERFORMANCE_METRICS)
+        self.adaptation_rate = PERFORMANCE_METRICS['adaptation_rates']['normal']
+        self.thresholds = PERFORMANCE_METRICS['win_rate_threshold']
         
     def adjust(self, game_result: dict) -> dict:
         """Adjust difficulty based on player performance"""
-        self.performance_history.append(game_result)
+        self.tracker.record(game_result['result'], game_result.get('game_type'))
+        return self.step(game_result['difficulty'])
         
+    def step(self, current_difficulty: float) -> dict:
+        """Adjust difficulty from the results already in the tracker"""
         # Calculate recent performance
         recent_performance = self._calculate_recent_performance()
         
         # Adjust difficulty
-        current_difficulty = game_result['difficulty']
-        if recent_performance > 0.7:  # Player doing very well
+        if recent_performance > self.thresholds['increase_difficulty']:  # Player doing very well
             new_difficulty = min(5, current_difficulty + self.adaptation_rate)
-        elif recent_performance < 0.3:  # Player struggling
+        elif recent_performance < self.thresholds['decrease_difficulty']:  # Player struggling
             new_difficulty = max(1, current_difficulty - self.adaptation_rate)
         else:
             new_difficulty = current_difficulty
@@ -308,18 +358,13 @@ class DifficultyAdapter:
         }
         
     def _calculate_recent_performance(self) -> float:
-        """Calculate performance score from recent games"""
-        if not self.performance_history:
-            return 0.5
-            
-        recent_games = self.performance_history[-5:]  # Look at last 5 games
-        wins = sum(1 for game in recent_games if game['result'] == 'win')
-        return wins / len(recent_games)
+        """Calculate performance score from recent games (O(1) running window)"""
+        return self.tracker.win_rate
         
     def _get_adaptation_reason(self, performance: float) -> str:
         """Provide explanation for difficulty adjustment"""
-        if performance > 0.7:
+        if performance > self.thresholds['increase_difficulty']:
             return "Player showing mastery - increasing challenge"
-        elif performance < 0.3:
+        elif performance < self.thresholds['decrease_difficulty']:
             return "Player needs more practice - adjusting difficulty"
-        return "Player performing well at current level"
\ No newline at end of file
+        return "Player performing well at current level"
@@ -0,0 +1,51 @@
+"""
+Lazy access to the Gemini SDK and model.
+
+Importing google.generativeai and constructing a GenerativeModel is slow, so
+nothing here happens at import time. The SDK is loaded, configured and the
+model built on the first call to get_model(); later calls reuse it.
+"""
+
+import threading
+
+from config import LLM_SETTINGS
+
+_lock = threading.Lock()
+_genai = None
+_model = None
+
+
+def get_genai():
+    """Import and configure the Gemini SDK on first use"""
+    global _genai
+    if _genai is None:
+        with _lock:
+            if _genai is None:
+                import google.generativeai as genai
+                genai.configure(api_key=LLM_SETTINGS["api_key"])
+                _genai = genai
+    return _genai
+
+
+def get_model():
+    """Return the shared GenerativeModel, building it on first use"""
+    global _model
+    if _model is None:
+        genai = get_genai()
+        with _lock:
+            if _model is None:
+                _model = genai.GenerativeModel(LLM_SETTINGS["model_name"])
+    return _model
+
+
+def get_generation_config():
+    """Build the generation config used for every agent call"""
+    genai = get_genai()
+    return genai.GenerationConfig(
+        response_mime_type=LLM_SETTINGS["response_mime_type"],
+    )
+
+
+def is_loaded() -> bool:
+    """Whether the SDK has been imported yet (useful for startup checks)"""
+    return _genai is not None
@@ -0,0 +1,284 @@
+"""
+Monte Carlo Tree Search opponent for 3D tic-tac-toe.
+
+Intended for the larger cubes (grid_size 4 and up) where full-width
+alpha-beta gets expensive. The tree lives in a preallocated NodeArena of
+NumPy arrays (one slot per node, children stored contiguously) instead of
+per-node Python objects, and selection uses UCT computed over a child slice
+in one vectorised expression. Each iteration evaluates the new leaf with a
+batch of random playouts that are resolved together as arrays: every empty
+cell gets a random move time, and the earliest completed line decides the
+playout. Thinking time is bounded by mcts_iterations from the difficulty
+settings and an absolute deadline, and the tree is kept between moves so
+consecutive searches start from the previous statistics. Under gravity
+(settings["gravity"]) nodes only get one child per open column, and
+playout move times are sorted up each column so pieces stack in order.
+"""
+
+import math
+import random
+import time
+from typing import Optional
+
+import numpy as np
+
+from asset_store import opening_move
+from bitboard import cell_masks_for, legal_cells, has_line, full_mask
+from config import GAME_CONFIGS
+from pn_search import forced_win
+from tictactoe import win_lines
+
+MCTS_CONFIG = GAME_CONFIGS["3D_tic_tac_toe"]["mcts"]
+
+UNKNOWN = -1
+OPEN = 0
+DRAW = 3
+
+
+class NodeArena:
+    """Array-backed storage for MCTS nodes"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.parent = np.full(capacity, -1, dtype=np.int32)
+        self.move = np.full(capacity, -1, dtype=np.int16)
+        self.player = np.zeros(capacity, dtype=np.int8)  # Player who made `move`
+        self.visits = np.zeros(capacity, dtype=np.float64)
+        self.wins = np.zeros(capacity, dtype=np.float64)  # From `player`'s point of view
+        self.first_child = np.full(capacity, -1, dtype=np.int32)
+        self.n_children = np.zeros(capacity, dtype=np.int32)
+        self.terminal = np.full(capacity, UNKNOWN, dtype=np.int8)
+        self.size = 0
+
+    def clear(self):
+        self.size = 0
+
+    def _init_slots(self, start: int, end: int):
+        self.first_child[start:end] = -1
+        self.n_children[start:end] = 0
+        self.visits[start:end] = 0
+        self.wins[start:end] = 0
+        self.terminal[start:end] = UNKNOWN
+
+    def new_root(self, player_just_moved: int) -> int:
+        index = self.size
+        self.size += 1
+        self._init_slots(index, index + 1)
+        self.parent[index] = -1
+        self.move[index] = -1
+        self.player[index] = player_just_moved
+        return index
+
+    def add_children(self, parent: int, moves: np.ndarray, player: int) -> bool:
+        """Append one child per move; False when the arena is full"""
+        start, end = self.size, self.size + len(moves)
+        if end > self.capacity:
+            return False
+        self._init_slots(start, end)
+        self.parent[start:end] = parent
+        self.move[start:end] = moves
+        self.player[start:end] = player
+        self.first_child[parent] = start
+        self.n_children[parent] = len(moves)
+        self.size = end
+        return True
+
+
+class MCTSPlayer:
+    """UCT search with batched random playouts and tree reuse between moves"""
+
+    def __init__(self, size: int = 3, seed=None, config: dict = None):
+        config = {**MCTS_CONFIG, **(config or {})}
+        self.size = size
+        self.cells = size ** 3
+        self.lines = win_lines(size)
+        self.cell_masks = cell_masks_for(size)
+        self.full = full_mask(size)
+        self.batch = config["rollout_batch"]
+        self.exploration = config["exploration"]
+        self.arena = NodeArena(config["arena_capacity"])
+        seed = seed.getrandbits(64) if hasattr(seed, "getrandbits") else seed
+        self.rng = np.random.default_rng(seed)
+        self.shuffle = random.Random(seed)
+        self.root = -1
+        self.root_bits = (0, 0)
+        self.gravity = False
+        self.stats = {"iterations": 0, "playouts": 0, "reused_visits": 0.0}
+
+    def reset(self):
+        """Drop the tree (new match)"""
+        self.arena.clear()
+        self.root = -1
+        self.root_bits = (0, 0)
+
+    # Tree reuse ---------------------------------------------------------
+
+    def _find_child(self, node: int, cell: int) -> int:
+        start = self.arena.first_child[node]
+        if start < 0:
+            return -1
+        moves = self.arena.move[start:start + self.arena.n_children[node]]
+        found = np.flatnonzero(moves == cell)
+        return int(start + found[0]) if found.size else -1
+
+    def _root_for(self, p1: int, p2: int, to_move: int) -> int:
+        """Reuse the subtree matching the new position, or start a fresh tree"""
+        if self.root >= 0 and self.arena.size < self.arena.capacity // 2:
+            old1, old2 = self.root_bits
+            if old1 & ~p1 == 0 and old2 & ~p2 == 0:
+                # Follow the moves played since the last search, in turn order
+                added = {1: p1 & ~old1, 2: p2 & ~old2}
+                node = self.root
+                mover = 3 - int(self.arena.player[node])
+                while node >= 0 and added[mover] and not added[mover] & (added[mover] - 1):
+                    node = self._find_child(node, added[mover].bit_length() - 1)
+                    added[mover] = 0
+                    mover = 3 - mover
+                if node >= 0 and not added[1] and not added[2] and mover == to_move:
+                    self.arena.parent[node] = -1
+                    self.root = node
+                    self.root_bits = (p1, p2)
+                    self.stats["reused_visits"] += float(self.arena.visits[node])
+                    return node
+
+        self.arena.clear()
+        self.root = self.arena.new_root(3 - to_move)
+        self.root_bits = (p1, p2)
+        return self.root
+
+    # Search -------------------------------------------------------------
+
+    def _select_child(self, node: int) -> int:
+        arena = self.arena
+        start = arena.first_child[node]
+        end = start + arena.n_children[node]
+        visits = arena.visits[start:end]
+        unvisited = np.flatnonzero(visits == 0)
+        if unvisited.size:
+            return int(start + unvisited[0])
+        log_parent = math.log(arena.visits[node])
+        uct = arena.wins[start:end] / visits + self.exploration * np.sqrt(log_parent / visits)
+        return int(start + np.argmax(uct))
+
+    def _expand(self, node: int, bits: list) -> bool:
+        moves = legal_cells(bits[1], bits[2], self.size, self.gravity)
+        self.shuffle.shuffle(moves)
+        return self.arena.add_children(node, np.array(moves, dtype=np.int16),
+                                       3 - int(self.arena.player[node]))
+
+    def rollout_batch(self, p1: int, p2: int, to_move: int, batch: int) -> np.ndarray:
+        """Winners (0 = draw) of `batch` random playouts from one position"""
+        base = np.array([1 if p1 >> i & 1 else 2 if p2 >> i & 1 else 0
+                         for i in range(self.cells)], dtype=np.int8)
+        empty = np.flatnonzero(base == 0)
+        # Random move order per playout: rank of each empty cell
+        ranks = np.argsort(self.rng.random((batch, empty.size)), axis=1).argsort(axis=1)
+        times = np.full((batch, self.cells), -1, dtype=np.int16)
+        times[:, empty] = ranks
+        if self.gravity:
+            # Filled cells (-1) sit at the bottom of each column; sorting up
+            # the column hands the remaining times out bottom to top
+            size = self.size
+            times = np.sort(times.reshape(batch, size * size, size), axis=2).reshape(batch, self.cells)
+            ranks = times[:, empty]
+        owner = np.tile(base, (batch, 1))
+        owner[:, empty] = np.where(ranks % 2 == 0, to_move, 3 - to_move)
+
+        line_owner = owner[:, self.lines]
+        complete = (line_owner == line_owner[:, :, :1]).all(axis=2) & (line_owner[:, :, 0] != 0)
+        finish = np.where(complete, times[:, self.lines].max(axis=2), np.iinfo(np.int16).max)
+        first = finish.argmin(axis=1)
+        rows = np.arange(batch)
+        decided = finish[rows, first] < np.iinfo(np.int16).max
+        return np.where(decided, line_owner[rows, first, 0], 0)
+
+    def _backpropagate(self, node: int, winners: np.ndarray):
+        arena = self.arena
+        count = len(winners)
+        wins_by_player = {1: float(np.count_nonzero(winners == 1)),
+                          2: float(np.count_nonzero(winners == 2))}
+        draws = count - wins_by_player[1] - wins_by_player[2]
+        while node >= 0:
+            arena.visits[node] += count
+            arena.wins[node] += wins_by_player[int(arena.player[node])] + 0.5 * draws
+            node = int(arena.parent[node])
+
+    def _terminal_result(self, node: int, bits: list) -> int:
+        arena = self.arena
+        if arena.terminal[node] == UNKNOWN:
+            mover = int(arena.player[node])
+            cell = int(arena.move[node])
+            if has_line(bits[mover], self.cell_masks[cell]):
+                arena.terminal[node] = mover
+            elif bits[1] | bits[2] == self.full:
+                arena.terminal[node] = DRAW
+            else:
+                arena.terminal[node] = OPEN
+        return int(arena.terminal[node])
+
+    def choose_move(self, p1: int, p2: int, to_move: int = 2, settings: dict = None,
+                    deadline: Optional[float] = None) -> int:
+        """Search from the position and return the most visited move"""
+        settings = settings or {}
+        gravity = settings.get("gravity", False)
+        if gravity != self.gravity:
+            self.gravity = gravity
+            self.reset()
+        if settings.get("opening_book"):
+            cell = opening_move(p1, p2, to_move, self.size, gravity)
+            if cell is not None:
+                return cell
+        line = forced_win(p1, p2, to_move, settings.get("proof_plies", 0), self.size, gravity)
+        if line:
+            return line[0]
+        iterations = settings.get("mcts_iterations", 800)
+        arena = self.arena
+        root = self._root_for(p1, p2, to_move)
+
+        for iteration in range(iterations):
+            if deadline is not None and iteration % 16 == 0 and time.time() > deadline:
+                break
+            node = root
+            bits = [0, p1, p2]
+            result = OPEN
+
+            # Selection
+            while arena.n_children[node] > 0:
+                node = self._select_child(node)
+                bits[arena.player[node]] |= 1 << int(arena.move[node])
+                result = self._terminal_result(node, bits)
+                if result != OPEN:
+                    break
+
+            # Expansion
+            if result == OPEN and (node == root or arena.visits[node] > 0):
+                if not self._expand(node, bits):
+                    break  # Arena full: stop thinking and answer
+                node = self._select_child(node)
+                bits[arena.player[node]] |= 1 << int(arena.move[node])
+                result = self._terminal_result(node, bits)
+
+            # Evaluation: a terminal leaf counts as a full batch of that result
+            if result == OPEN:
+                winners = self.rollout_batch(bits[1], bits[2], 3 - int(arena.player[node]), self.batch)
+                self.stats["playouts"] += self.batch
+            else:
+                winners = np.full(self.batch, 0 if result == DRAW else result, dtype=np.int8)
+            self._backpropagate(node, winners)
+            self.stats["iterations"] += 1
+
+        start = arena.first_child[root]
+        if start < 0:
+            return legal_cells(p1, p2, self.size, gravity)[0]
+        visits = arena.visits[start:start + arena.n_children[root]]
+        best = int(start + np.argmax(visits))
+        move = int(arena.move[best])
+
+        # Keep the chosen subtree for the next call
+        if to_move == 1:
+            self.root_bits = (p1 | 1 << move, p2)
+        else:
+            self.root_bits = (p1, p2 | 1 << move)
+        arena.parent[best] = -1
+        self.root = best
+        return move
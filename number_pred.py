@@ -1,77 +1,297 @@
+"""
+Round-based number prediction.
+
+A match is `rounds_per_match` rounds over one lazily generated number
+stream. Terms come from generator functions and are revealed a round at a
+time, so only the visible prefix is ever stored. Each round asks for the
+next term (the next `numbers_per_round` terms with multi_number) and
+accepts several predictions at once. With dynamic_patterns the stream
+switches to a fresh pattern every few rounds; the first terms of a new
+pattern are revealed together and the shift is announced.
+
+Predictions are kept in a (rounds, guesses, numbers) array and the whole
+match is scored in one batched NumPy check at the end. A guess counts when
+it matches the stream or the next value of the simplest rule that explains
+the visible numbers (see sequence_solver), so ambiguous prefixes are fair.
+"""
+
+import math
 import random
-from typing import Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import GAME_CONFIGS
+from sequence_solver import solve
+
+NUMBER_CONFIG = GAME_CONFIGS["number_prediction"]
+NO_GUESS = np.iinfo(np.int64).min
+GUESS_MAX = np.iinfo(np.int64).max
+
+
+# Pattern streams -----------------------------------------------------------
+
+def _arithmetic(rng: random.Random) -> Iterator[int]:
+    value, difference = rng.randint(1, 10), rng.randint(2, 5)
+    while True:
+        yield value
+        value += difference
+
+
+def _geometric(rng: random.Random) -> Iterator[int]:
+    value, ratio = rng.randint(1, 5), rng.randint(2, 3)
+    while True:
+        yield value
+        value *= ratio
+
+
+def _fibonacci(rng: random.Random) -> Iterator[int]:
+    a, b = rng.randint(1, 5), rng.randint(6, 10)
+    while True:
+        yield a
+        a, b = b, a + b
+
+
+def _quadratic(rng: random.Random) -> Iterator[int]:
+    a, b, c = rng.randint(1, 3), rng.randint(1, 5), rng.randint(0, 9)
+    n = 0
+    while True:
+        yield a * n * n + b * n + c
+        n += 1
+
+
+def _affine(rng: random.Random) -> Iterator[int]:
+    # Multiply, then add: 3, 7, 15, 31, ...
+    value, ratio, offset = rng.randint(1, 5), rng.randint(2, 3), rng.randint(1, 4)
+    while True:
+        yield value
+        value = value * ratio + offset
+
+
+def _cubic(rng: random.Random) -> Iterator[int]:
+    a, c = rng.randint(1, 2), rng.randint(0, 9)
+    n = 1
+    while True:
+        yield a * n ** 3 + c
+        n += 1
+
+
+# name -> (stream, lowest pattern_complexity that uses it, terms needed to confirm it)
+PATTERNS: Dict[str, Tuple[Callable[[random.Random], Iterator[int]], int, int]] = {
+    "arithmetic": (_arithmetic, 1, 3),
+    "geometric": (_geometric, 1, 3),
+    "fibonacci": (_fibonacci, 2, 5),
+    "quadratic": (_quadratic, 2, 4),
+    "affine": (_affine, 3, 4),
+    "cubic": (_cubic, 3, 5),
+}
+
 
 class NumberPredictionGame:
-    def __init__(self, difficulty: int = 2):
+    def __init__(self, difficulty: int = 2, rng: random.Random = None, dynamic: bool = None,
+                 settings: dict = None):
         self.difficulty = difficulty
+        self.rng = rng or random.Random()
+        self.dynamic = dynamic
+        settings = {**NUMBER_CONFIG, **(settings or {})}
+        self.rounds = settings["rounds_per_match"]
+        self.guesses_per_round = settings["predictions_per_round"]
+        self.numbers_per_round = settings["numbers_per_round"] if settings["special_rules"]["multi_number"] else 1
+        self.win_fraction = settings["win_fraction"]
+        self.shift_every = settings["shift_every"]
+        self.reset_game()
+
+    def reset(self, difficulty: int = None, rng: random.Random = None, dynamic: bool = None):
+        """Reuse this instance for a new game (object pool entry point)"""
+        if difficulty is not None:
+            self.difficulty = difficulty
+        if rng is not None:
+            self.rng = rng
+        if dynamic is not None:
+            self.dynamic = dynamic
         self.reset_game()
-        
+
     def reset_game(self):
-        """Initialize a new number sequence"""
-        # Generate a sequence based on difficulty
-        self.sequence_length = 3 + int(self.difficulty)  # Longer sequences for higher difficulty
-        self.pattern_type = random.choice(['arithmetic', 'geometric', 'fibonacci'])
-        
-        if self.pattern_type == 'arithmetic':
-            # Generate arithmetic sequence: each number differs by a constant
-            start = random.randint(1, 10)
-            difference = random.randint(2, 5)
-            self.sequence = [start + i * difference for i in range(self.sequence_length)]
-            self.next_number = start + self.sequence_length * difference
-            
-        elif self.pattern_type == 'geometric':
-            # Generate geometric sequence: each number is multiplied by a constant
-            start = random.randint(1, 5)
-            ratio = random.randint(2, 3)
-            self.sequence = [start * (ratio ** i) for i in range(self.sequence_length)]
-            self.next_number = start * (ratio ** self.sequence_length)
-            
-        else:  # fibonacci-like
-            # Generate Fibonacci-like sequence: each number is sum of previous two
-            start1 = random.randint(1, 5)
-            start2 = random.randint(6, 10)
-            self.sequence = [start1, start2]
-            for _ in range(self.sequence_length - 2):
-                self.sequence.append(self.sequence[-1] + self.sequence[-2])
-            self.next_number = self.sequence[-1] + self.sequence[-2]
-            
-        self.attempts = 0
-        self.max_attempts = 3
+        """Start a new stream and clear the round arrays"""
+        self._terms = self._stream()
+        self._pending: List[Tuple[int, int, str]] = []  # Pulled from the stream, not yet shown
+        self.sequence: List[int] = []  # Revealed terms of the current pattern
+        self.segment = -1
+        self.pattern_type = None
+        self.shifted = False
+        self.round = 0
         self.hints_given = 0
-        
-    def check_prediction(self, prediction: int) -> Tuple[bool, str]:
-        """Check if the prediction matches the next number"""
-        self.attempts += 1
-        
-        if prediction == self.next_number:
-            return True, "Correct! You've found the next number in the sequence!"
-            
-        difference = abs(prediction - self.next_number)
-        if self.attempts >= self.max_attempts:
-            return False, f"Game Over! The correct number was {self.next_number}"
-            
-        # Provide feedback based on how close the guess was
-        if difference <= 2:
-            return False, "Very close! Try again."
-        elif difference <= 5:
-            return False, "Getting warmer! Try again."
+        shape = (self.rounds, self.numbers_per_round)
+        self.targets = np.zeros(shape, dtype=np.int64)
+        self.alternatives = np.zeros(shape, dtype=np.int64)
+        self.predictions = np.full((self.rounds, self.guesses_per_round, self.numbers_per_round),
+                                   NO_GUESS, dtype=np.int64)
+        self._begin_round()
+
+    # Stream ----------------------------------------------------------------
+
+    def _families(self) -> List[str]:
+        return [name for name, (_, level, _) in PATTERNS.items() if level <= max(1, int(self.difficulty))]
+
+    def _stream(self) -> Iterator[Tuple[int, int, str]]:
+        """(term, segment, pattern) forever; dynamic streams change pattern every few rounds"""
+        segment = 0
+        while True:
+            name = self.rng.choice(self._families())
+            stream, _, confirm = PATTERNS[name]
+            length = None
+            if self.dynamic:
+                length = self._visible_for(confirm) + self.numbers_per_round * self.rng.randint(*self.shift_every)
+            for index, term in enumerate(stream(self.rng)):
+                if length is not None and index >= length:
+                    break
+                yield term, segment, name
+            segment += 1
+
+    def _visible_for(self, confirm: int) -> int:
+        """Terms shown before the first question of a pattern"""
+        return max(confirm, 2 + int(self.difficulty))
+
+    def _pull(self, count: int) -> List[Tuple[int, int, str]]:
+        while len(self._pending) < count:
+            self._pending.append(next(self._terms))
+        return self._pending[:count]
+
+    def _begin_round(self):
+        """Line up this round's targets, revealing a new pattern's opening terms first"""
+        self.hints_given = 0
+        self.shifted = False
+        if self.round >= self.rounds:
+            return
+        upcoming = self._pull(self.numbers_per_round)
+        if any(segment != self.segment for _, segment, _ in upcoming):
+            # Drop what is left of the old pattern and open the next one
+            old = self.segment
+            self._pending = [entry for entry in self._pending if entry[1] != old]
+            term, segment, name = self._pull(1)[0]
+            self.shifted = self.segment >= 0
+            self.segment, self.pattern_type = segment, name
+            opening = self._pull(self._visible_for(PATTERNS[name][2]))
+            self.sequence = [term for term, _, _ in opening]
+            del self._pending[:len(opening)]
+            upcoming = self._pull(self.numbers_per_round)
+
+        self.targets[self.round] = [term for term, _, _ in upcoming]
+        # The simplest rule's continuation of the visible numbers is accepted too
+        visible = list(self.sequence)
+        for slot in range(self.numbers_per_round):
+            rule = solve(visible).rule
+            guess = int(rule.next_value) if rule is not None and rule.integral else int(self.targets[self.round, slot])
+            self.alternatives[self.round, slot] = guess
+            visible.append(guess)
+
+    # Rounds ----------------------------------------------------------------
+
+    @property
+    def rounds_left(self) -> int:
+        return self.rounds - self.round
+
+    @property
+    def finished(self) -> bool:
+        return self.round >= self.rounds
+
+    def submit(self, predictions: Sequence[int]) -> dict:
+        """Record this round's predictions and reveal the answer
+
+        With multi_number the values are one guess for the next
+        numbers_per_round terms; otherwise each value is a separate guess
+        for the next term.
+        """
+        if self.finished:
+            raise ValueError("The match is over")
+        values = [int(value) for value in predictions]
+        if not values:
+            raise ValueError("No prediction given")
+        # NO_GUESS (int64 min) marks an empty slot, so it is out of range too
+        if any(not NO_GUESS < value <= GUESS_MAX for value in values):
+            raise ValueError("Prediction out of range")
+        if self.numbers_per_round > 1:
+            guesses = [values[:self.numbers_per_round]]
+            if len(guesses[0]) < self.numbers_per_round:
+                raise ValueError(f"Predict the next {self.numbers_per_round} numbers")
         else:
-            return False, "Not quite. Try again."
-            
+            guesses = [[value] for value in values[:self.guesses_per_round]]
+        self.predictions[self.round, :len(guesses)] = guesses
+
+        answer = self.targets[self.round].tolist()
+        del self._pending[:self.numbers_per_round]
+        self.sequence.extend(answer)
+        self.round += 1
+        self._begin_round()
+
+        result = {
+            "round": self.round,
+            "answer": answer,
+            "rounds_left": self.rounds_left,
+            "pattern_shift": self.shifted
+        }
+        if self.finished:
+            result["score"] = self.score()
+        return result
+
+    def score(self) -> dict:
+        """Score every played round in one batched check"""
+        played = self.round
+        guesses = self.predictions[:played]
+        targets = self.targets[:played, None, :]
+        alternatives = self.alternatives[:played, None, :]
+        made = guesses[:, :, 0] != NO_GUESS
+        correct = made & ((guesses == targets).all(axis=2) | (guesses == alternatives).all(axis=2))
+        hits = correct.any(axis=1)
+
+        # Fewer guesses for a hit score more; a near miss earns a little
+        used = np.maximum(made.sum(axis=1), 1)
+        # In float64: int64 differences of extreme guesses would wrap around
+        distance = np.where(made, np.abs(guesses[:, :, 0].astype(np.float64) - targets[:, :, 0]), np.inf)
+        near = ~hits & (distance.min(axis=1) <= 2)
+        points = np.where(hits, 100 // used, np.where(near, 10, 0))
+
+        required = math.ceil(self.rounds * self.win_fraction)
+        return {
+            "hits": int(hits.sum()),
+            "rounds": played,
+            "required": required,
+            "points": int(points.sum()),
+            "per_round": hits.tolist(),
+            "won": int(hits.sum()) >= required
+        }
+
+    # Display and hints -----------------------------------------------------
+
     def get_hint(self) -> str:
-        """Generate a hint based on the pattern type and current sequence"""
+        """Generate a hint from the simplest rule behind the visible numbers
+
+        Falls back to the generator's pattern type when the visible prefix
+        is too short for the solver to confirm any rule.
+        """
         self.hints_given += 1
-        
+
         if self.hints_given == 1:
             return f"Look at the first {min(3, len(self.sequence))} numbers: {self.sequence[:3]}"
-            
-        if self.pattern_type == 'arithmetic':
-            return "Try finding the constant difference between consecutive numbers."
-        elif self.pattern_type == 'geometric':
-            return "Try finding the constant ratio between consecutive numbers."
-        else:
-            return "Each number is related to the two numbers before it."
-            
+
+        rule = solve(self.sequence).rule
+        if rule is not None:
+            if self.hints_given == 2:
+                return rule.family()
+            if self.hints_given == 3:
+                return rule.detail(self.sequence)
+            return rule.formula(self.sequence)
+
+        if self.hints_given == 2:
+            if self.pattern_type == 'arithmetic':
+                return "Try finding the constant difference between consecutive numbers."
+            elif self.pattern_type == 'geometric':
+                return "Try finding the constant ratio between consecutive numbers."
+            else:
+                return "Each number is related to the numbers before it."
+        return f"The next number is {self.targets[min(self.round, self.rounds - 1), 0]}."
+
     def get_sequence_display(self) -> str:
         """Return the current sequence for display"""
-        return " → ".join(map(str, self.sequence)) + " → ?"
\ No newline at end of file
+        shown = " → ".join(map(str, self.sequence))
+        return shown + " → ?" * self.numbers_per_round
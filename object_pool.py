@@ -0,0 +1,72 @@
+"""
+Pools of resettable game objects shared across matches and sessions.
+
+Engines (TicTacToe3D boards, NumberPredictionGame instances) and level
+characters are returned to the pool when a session is done with them and
+handed out again, after reset(), to the next match that needs the same
+kind of object. Pools are keyed by game type and size (or genre/level for
+characters), bounded per key, and report their hit rates.
+"""
+
+from collections import defaultdict, deque
+from typing import Any, Callable, Deque, Dict, Hashable, Optional
+
+
+class GameObjectPool:
+    """Keyed pools of objects that implement reset()"""
+
+    def __init__(self, max_per_key: int = 32):
+        self.max_per_key = max_per_key
+        self._pools: Dict[Hashable, Deque[Any]] = defaultdict(deque)
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "releases": 0, "discarded": 0}
+        )
+
+    @staticmethod
+    def _kind(key: Hashable) -> str:
+        """Stats bucket: the first element of a tuple key (the game type)"""
+        return str(key[0] if isinstance(key, tuple) else key)
+
+    def acquire(self, key: Hashable, factory: Callable[[], Any] = None, **reset_args) -> Optional[Any]:
+        """Reuse a pooled object (reset with reset_args) or build one with factory
+
+        Returns None on a miss without a factory, so callers can build
+        objects that need async setup themselves.
+        """
+        stats = self.stats[self._kind(key)]
+        pool = self._pools.get(key)
+        if pool:
+            obj = pool.pop()
+            obj.reset(**reset_args)
+            stats["hits"] += 1
+            return obj
+        stats["misses"] += 1
+        return factory() if factory is not None else None
+
+    def release(self, key: Hashable, obj: Any):
+        """Return an object for reuse (dropped if the pool for key is full)"""
+        stats = self.stats[self._kind(key)]
+        pool = self._pools[key]
+        if len(pool) >= self.max_per_key:
+            stats["discarded"] += 1
+            return
+        pool.append(obj)
+        stats["releases"] += 1
+
+    def hit_rates(self) -> Dict[str, float]:
+        rates = {}
+        for kind, stats in self.stats.items():
+            requests = stats["hits"] + stats["misses"]
+            rates[kind] = stats["hits"] / requests if requests else 0.0
+        return rates
+
+    def report(self) -> dict:
+        return {
+            "pooled": {str(key): len(pool) for key, pool in self._pools.items()},
+            "stats": {kind: dict(stats) for kind, stats in self.stats.items()},
+            "hit_rates": self.hit_rates()
+        }
+
+
+# Process-wide pool shared by all game managers
+OBJECT_POOL = GameObjectPool()
@@ -0,0 +1,146 @@
+"""
+Incremental player performance tracking.
+
+Results are kept in fixed-size ring buffers with running sums, so recording a
+game and reading a win rate are both O(1) and memory stays bounded per
+player no matter how many games are played. Alongside the windowed win rate
+an exponentially weighted win rate is maintained, and the same statistics
+are kept per game type and per skill category.
+"""
+
+from typing import Dict, Optional, Tuple
+
+from config import PERFORMANCE_METRICS
+
+
+class RollingWindow:
+    """Fixed-size ring buffer of numbers with a running sum"""
+
+    __slots__ = ("size", "_values", "_index", "count", "total")
+
+    def __init__(self, size: int):
+        self.size = size
+        self._values = [0.0] * size
+        self._index = 0
+        self.count = 0
+        self.total = 0.0
+
+    def push(self, value: float):
+        if self.count == self.size:
+            self.total -= self._values[self._index]
+        else:
+            self.count += 1
+        self._values[self._index] = value
+        self.total += value
+        self._index = (self._index + 1) % self.size
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.size
+
+    def mean(self, default: float = 0.5) -> float:
+        return self.total / self.count if self.count else default
+
+
+class ResultStats:
+    """Windowed and exponentially weighted win rate for one stream of results"""
+
+    __slots__ = ("window", "ewma", "alpha", "games", "wins", "losses", "draws")
+
+    def __init__(self, window: int, alpha: float):
+        self.window = RollingWindow(window)
+        self.alpha = alpha
+        self.ewma: Optional[float] = None
+        self.games = self.wins = self.losses = self.draws = 0
+
+    def record(self, result: str):
+        score = 1.0 if result == "win" else 0.0
+        self.window.push(score)
+        self.ewma = score if self.ewma is None else self.ewma + self.alpha * (score - self.ewma)
+        self.games += 1
+        if result == "win":
+            self.wins += 1
+        elif result == "lose":
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    @property
+    def win_rate(self) -> float:
+        return self.window.mean()
+
+    @property
+    def weighted_win_rate(self) -> float:
+        return 0.5 if self.ewma is None else self.ewma
+
+    def to_dict(self) -> dict:
+        return {
+            "games": self.games,
+            "wins": self.wins,
+            "losses": self.losses,
+            "draws": self.draws,
+            "win_rate": self.win_rate,
+            "weighted_win_rate": self.weighted_win_rate
+        }
+
+
+class PerformanceTracker:
+    """Tracks one player's results overall, per game type and per skill category"""
+
+    def __init__(self, metrics: dict = None):
+        self.metrics = metrics or PERFORMANCE_METRICS
+        self.alpha = self.metrics["ewma_alpha"]
+        self.group_window = self.metrics["game_type_window"]
+        self.overall = ResultStats(self.metrics["performance_window"], self.alpha)
+        self.by_game_type: Dict[str, ResultStats] = {}
+        self.by_skill_category: Dict[str, ResultStats] = {}
+
+    def record(self, result: str, game_type: str = None, skill_category: str = None) -> float:
+        """Record a finished game and return the current windowed win rate"""
+        self.overall.record(result)
+        if game_type is not None:
+            self._group(self.by_game_type, game_type).record(result)
+        if skill_category is not None:
+            self._group(self.by_skill_category, skill_category).record(result)
+        return self.overall.win_rate
+
+    def _group(self, groups: Dict[str, ResultStats], key: str) -> ResultStats:
+        stats = groups.get(key)
+        if stats is None:
+            stats = groups[key] = ResultStats(self.group_window, self.alpha)
+        return stats
+
+    @property
+    def win_rate(self) -> float:
+        return self.overall.win_rate
+
+    @property
+    def weighted_win_rate(self) -> float:
+        return self.overall.weighted_win_rate
+
+    def should_adjust_difficulty(self) -> Tuple[bool, str]:
+        """Check if difficulty should be adjusted"""
+        if not self.overall.window.full:
+            return False, "not_enough_data"
+
+        thresholds = self.metrics["win_rate_threshold"]
+        win_rate = self.overall.win_rate
+        if win_rate > thresholds["increase_difficulty"]:
+            return True, "increase"
+        elif win_rate < thresholds["decrease_difficulty"]:
+            return True, "decrease"
+        return False, "maintain"
+
+    def skill_category(self) -> str:
+        """Map the weighted win rate onto PERFORMANCE_METRICS skill categories"""
+        categories = self.metrics["skill_categories"]
+        index = int(self.weighted_win_rate * len(categories))
+        return categories[min(index, len(categories) - 1)]
+
+    def summary(self) -> dict:
+        return {
+            "overall": self.overall.to_dict(),
+            "skill_category": self.skill_category(),
+            "by_game_type": {key: stats.to_dict() for key, stats in self.by_game_type.items()},
+            "by_skill_category": {key: stats.to_dict() for key, stats in self.by_skill_category.items()}
+        }
@@ -0,0 +1,264 @@
+"""
+Proof-number search for forced wins in 3D tic-tac-toe.
+
+Answers "can the side to move force a win within k plies?" on bitboard
+positions. The search is restricted to threat space: the attacker only
+plays moves that create an immediate threat (or the single forced block),
+and the defender's replies are then forced, which keeps the tree narrow
+enough for sub-millisecond answers in typical mid-game positions. Wins
+found this way are real; quiet-move wins beyond the threat space are not
+looked for. Proven and disproven positions are remembered in a bounded
+table shared between calls.
+"""
+
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from bitboard import cell_masks_for, legal_cells, full_mask
+
+INF = 10 ** 9
+
+WIN = "win"
+LOSS = "loss"
+UNKNOWN = "unknown"
+
+
+class ProofTable:
+    """Bounded LRU table of solved positions"""
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[bool, List[int]]]" = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[Tuple[bool, List[int]]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple, proven: bool, line: List[int]):
+        self._entries[key] = (proven, line)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared by all callers in the process
+PROOF_TABLE = ProofTable()
+
+
+def winning_cells(bits: int, other: int, size: int, gravity: bool = False) -> List[int]:
+    """Playable cells that complete a line for `bits`"""
+    cell_masks = cell_masks_for(size)
+    cells = []
+    for cell in legal_cells(bits, other, size, gravity):
+        for mask in cell_masks[cell]:
+            if (bits | 1 << cell) & mask == mask:
+                cells.append(cell)
+                break
+    return cells
+
+
+def _creates_threat(bits: int, other: int, cell: int, size: int) -> bool:
+    """Does playing `cell` leave a line one move from completion?"""
+    placed = bits | 1 << cell
+    for mask in cell_masks_for(size)[cell]:
+        if not other & mask and (placed & mask).bit_count() == size - 1:
+            return True
+    return False
+
+
+class _Node:
+    __slots__ = ("attacker", "defender", "is_or", "plies", "move", "parent",
+                 "children", "pn", "dn", "tail")
+
+    def __init__(self, attacker: int, defender: int, is_or: bool, plies: int,
+                 move: int = -1, parent: "_Node" = None):
+        self.attacker = attacker
+        self.defender = defender
+        self.is_or = is_or  # Attacker to move
+        self.plies = plies  # Plies left within which the attacker must win
+        self.move = move
+        self.parent = parent
+        self.children: Optional[List["_Node"]] = None
+        self.pn = 1
+        self.dn = 1
+        self.tail: Optional[List[int]] = None  # Rest of the winning line once solved here
+
+
+class ProofNumberSearch:
+    """Depth-limited proof-number search in threat space"""
+
+    def __init__(self, size: int = 3, max_nodes: int = 20_000, table: ProofTable = None,
+                 gravity: bool = False):
+        self.size = size
+        self.gravity = gravity
+        self.full = full_mask(size)
+        self.max_nodes = max_nodes
+        self.table = table if table is not None else PROOF_TABLE
+        self.nodes = 0
+
+    def _key(self, node: _Node) -> tuple:
+        return self.size, self.gravity, node.attacker, node.defender, node.is_or, node.plies
+
+    def _set(self, node: _Node, proven: bool):
+        node.pn, node.dn = (0, INF) if proven else (INF, 0)
+
+    def _evaluate(self, node: _Node) -> bool:
+        """Settle trivial nodes; returns True when the node is solved"""
+        cached = self.table.get(self._key(node))
+        if cached is not None:
+            self._set(node, cached[0])
+            if cached[0]:
+                node.tail = cached[1]
+            return True
+
+        size = self.size
+        if node.attacker | node.defender == self.full:
+            self._set(node, False)
+            return True
+
+        if node.is_or:
+            if node.plies >= 1:
+                wins = winning_cells(node.attacker, node.defender, size, self.gravity)
+                if wins:
+                    node.tail = wins[:1]
+                    self._set(node, True)
+                    return True
+            if node.plies < 3:
+                # Need a threat (1 ply), the forced block (1) and the win (1)
+                self._set(node, False)
+                return True
+        else:
+            if winning_cells(node.defender, node.attacker, size, self.gravity):
+                self._set(node, False)  # Defender simply wins
+                return True
+            threats = winning_cells(node.attacker, node.defender, size, self.gravity)
+            if len(threats) >= 2 and node.plies >= 2:
+                node.tail = threats[:2]
+                self._set(node, True)  # Only one can be blocked
+                return True
+            if not threats or node.plies < 2:
+                self._set(node, False)
+                return True
+        return False
+
+    def _expand(self, node: _Node):
+        size = self.size
+        children = []
+        if node.is_or:
+            blocks = winning_cells(node.defender, node.attacker, size, self.gravity)
+            if len(blocks) >= 2:
+                moves = []
+            elif blocks:
+                moves = [c for c in blocks if _creates_threat(node.attacker, node.defender, c, size)]
+            else:
+                moves = [c for c in legal_cells(node.attacker, node.defender, size, self.gravity)
+                         if _creates_threat(node.attacker, node.defender, c, size)]
+            for cell in moves:
+                children.append(_Node(node.attacker | 1 << cell, node.defender, False,
+                                      node.plies - 1, cell, node))
+        else:
+            # Forced block of the single threat
+            for cell in winning_cells(node.attacker, node.defender, size, self.gravity):
+                children.append(_Node(node.attacker, node.defender | 1 << cell, True,
+                                      node.plies - 1, cell, node))
+        node.children = children
+        for child in children:
+            self.nodes += 1
+            self._evaluate(child)
+        self._update(node)
+
+    @staticmethod
+    def _update(node: _Node):
+        if not node.children:
+            if node.pn != 0:
+                node.pn, node.dn = INF, 0
+            return
+        if node.is_or:
+            node.pn = min(child.pn for child in node.children)
+            node.dn = min(INF, sum(child.dn for child in node.children))
+        else:
+            node.pn = min(INF, sum(child.pn for child in node.children))
+            node.dn = min(child.dn for child in node.children)
+
+    def _most_proving(self, node: _Node) -> _Node:
+        while node.children:
+            if node.is_or:
+                node = min(node.children, key=lambda child: child.pn)
+            else:
+                node = min(node.children, key=lambda child: child.dn)
+        return node
+
+    def _principal_line(self, node: _Node) -> List[int]:
+        line = []
+        while node is not None:
+            if node.tail is not None:
+                line.extend(node.tail)
+                break
+            if not node.children:
+                break
+            node = next((child for child in node.children if child.pn == 0), None)
+            if node is None:
+                break
+            line.append(node.move)
+        return line
+
+    def prove(self, attacker: int, defender: int, max_plies: int) -> Tuple[Optional[bool], List[int]]:
+        """(True, line) if the attacker, to move, wins within max_plies;
+        (False, []) if not in threat space; (None, []) if the node budget ran out"""
+        root = _Node(attacker, defender, True, max_plies)
+        self.nodes = 1
+        if not self._evaluate(root):
+            while root.pn != 0 and root.dn != 0 and self.nodes < self.max_nodes:
+                leaf = self._most_proving(root)
+                self._expand(leaf)
+                node = leaf.parent
+                while node is not None:
+                    self._update(node)
+                    node = node.parent
+        if root.pn == 0:
+            line = self._principal_line(root)
+            self.table.put(self._key(root), True, line)
+            return True, line
+        if root.dn == 0:
+            self.table.put(self._key(root), False, [])
+            return False, []
+        return None, []
+
+
+def solve(p1: int, p2: int, to_move: int, max_plies: int = 7, size: int = 3,
+          max_nodes: int = 20_000, gravity: bool = False) -> dict:
+    """Proof status of a position for the side to move
+
+    status is WIN (forced win within max_plies, `line` is the winning line of
+    play starting with the side to move), LOSS (the opponent's win cannot be
+    stopped; `line` is the opponent's plan after our best reply) or UNKNOWN.
+    """
+    me, opp = (p1, p2) if to_move == 1 else (p2, p1)
+    search = ProofNumberSearch(size, max_nodes, gravity=gravity)
+
+    proven, line = search.prove(me, opp, max_plies)
+    if proven:
+        return {"status": WIN, "line": line, "nodes": search.nodes}
+
+    # Loss: every reply leaves the opponent a forced win
+    threats = winning_cells(opp, me, size, gravity)
+    if len(threats) >= 2 and not winning_cells(me, opp, size, gravity):
+        return {"status": LOSS, "line": threats[:2], "nodes": search.nodes}
+    if len(threats) == 1 and not winning_cells(me, opp, size, gravity) and max_plies > 1:
+        block = threats[0]
+        proven, line = search.prove(opp, me | 1 << block, max_plies - 1)
+        if proven:
+            return {"status": LOSS, "line": [block] + line, "nodes": search.nodes}
+    return {"status": UNKNOWN, "line": [], "nodes": search.nodes}
+
+
+def forced_win(p1: int, p2: int, to_move: int, max_plies: int, size: int = 3,
+               gravity: bool = False) -> Optional[List[int]]:
+    """Winning line for the side to move within max_plies, or None"""
+    result = solve(p1, p2, to_move, max_plies, size, gravity=gravity)
+    return result["line"] if result["status"] == WIN else None
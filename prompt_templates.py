@@ -0,0 +1,108 @@
+"""
+Precompiled prompt templates.
+
+Every template in prompts.py is parsed once at import time into literal and
+placeholder segments, so rendering is a single join instead of a str.format
+pass over the whole text. Placeholders are validated while loading: a
+malformed template fails on import rather than on the first agent call.
+
+Templates are addressed by dotted keys, e.g. "storyteller.story_generation"
+or "character.dialogue_generation.victory".
+"""
+
+from string import Formatter
+from typing import Dict, Tuple
+
+from prompts import (
+    STORYTELLER_PROMPTS, CHARACTER_PROMPTS,
+    GAME_MASTER_PROMPTS, ADVISOR_PROMPTS
+)
+
+PROMPT_GROUPS = {
+    "storyteller": STORYTELLER_PROMPTS,
+    "character": CHARACTER_PROMPTS,
+    "game_master": GAME_MASTER_PROMPTS,
+    "advisor": ADVISOR_PROMPTS
+}
+
+
+class PromptTemplateError(ValueError):
+    """Raised when a template is malformed or rendered with missing values"""
+
+
+class PromptTemplate:
+    """A prompt template split into static and dynamic segments"""
+
+    __slots__ = ("key", "fields", "_parts")
+
+    def __init__(self, key: str, text: str):
+        self.key = key
+        parts = []
+        fields = []
+        try:
+            parsed = list(Formatter().parse(text))
+        except ValueError as e:
+            raise PromptTemplateError(f"{key}: {e}") from e
+
+        for literal, field, spec, conversion in parsed:
+            if literal:
+                # Merge adjacent literals (escaped braces split them)
+                if parts and parts[-1][0]:
+                    parts[-1] = (True, parts[-1][1] + literal)
+                else:
+                    parts.append((True, literal))
+            if field is None:
+                continue
+            if not field.isidentifier():
+                raise PromptTemplateError(f"{key}: invalid placeholder {{{field}}}")
+            if spec or conversion:
+                raise PromptTemplateError(f"{key}: format specs are not supported in {{{field}}}")
+            parts.append((False, field))
+            fields.append(field)
+
+        self._parts: Tuple[Tuple[bool, str], ...] = tuple(parts)
+        self.fields = frozenset(fields)
+
+    def render(self, **values) -> str:
+        """Fill in the placeholders; extra values are ignored like str.format"""
+        missing = self.fields.difference(values)
+        if missing:
+            raise PromptTemplateError(f"{self.key}: missing values for {sorted(missing)}")
+        return "".join(
+            value if is_literal else str(values[value])
+            for is_literal, value in self._parts
+        )
+
+
+def _compile_group(prefix: str, prompts: dict, registry: Dict[str, PromptTemplate]):
+    """Compile a (possibly nested) prompt dict into the registry"""
+    for name, text in prompts.items():
+        key = f"{prefix}.{name}"
+        if isinstance(text, dict):
+            _compile_group(key, text, registry)
+        else:
+            registry[key] = PromptTemplate(key, text)
+
+
+def compile_templates(groups: dict) -> Dict[str, PromptTemplate]:
+    """Compile every prompt group into a flat key -> template mapping"""
+    registry: Dict[str, PromptTemplate] = {}
+    for group, prompts in groups.items():
+        _compile_group(group, prompts, registry)
+    return registry
+
+
+PROMPT_TEMPLATES = compile_templates(PROMPT_GROUPS)
+
+
+def get_template(key: str) -> PromptTemplate:
+    """Look up a compiled template by dotted key"""
+    try:
+        return PROMPT_TEMPLATES[key]
+    except KeyError:
+        raise PromptTemplateError(f"Unknown prompt template: {key}") from None
+
+
+def render_prompt(key: str, **values) -> str:
+    """Render a compiled template by dotted key"""
+    return get_template(key).render(**values)
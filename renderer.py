@@ -0,0 +1,120 @@
+"""
+Frame-buffered terminal output.
+
+Output is assembled into whole frames and written with a single write and
+flush, instead of one print per cell or per character. Typing animations
+for every session are driven by one shared ticker task: each tick writes
+whatever characters have become due for each animation as one chunk.
+"""
+
+import asyncio
+import io
+import sys
+import time
+from typing import List, Optional, TextIO
+
+BOARD_SYMBOLS = {0: ".", 1: "X", 2: "O"}
+
+
+class Frame:
+    """Accumulates text and writes it to a stream in one call"""
+
+    def __init__(self, stream: TextIO = None):
+        self.stream = stream or sys.stdout
+        self._buffer = io.StringIO()
+
+    def write(self, text: str) -> "Frame":
+        self._buffer.write(text)
+        return self
+
+    def line(self, text: str = "") -> "Frame":
+        self._buffer.write(text)
+        self._buffer.write("\n")
+        return self
+
+    def flush(self):
+        text = self._buffer.getvalue()
+        if text:
+            self.stream.write(text)
+            self.stream.flush()
+        self._buffer = io.StringIO()
+
+    def __enter__(self) -> "Frame":
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+
+def render_board(board, title: str = "3D Tic Tac Toe Board:") -> str:
+    """Whole board as one string, one block per z level"""
+    size = len(board)
+    lines = ["", title]
+    for z in range(size):
+        lines.append("")
+        lines.append(f"Level {z + 1}")
+        for x in range(size):
+            lines.append(" ".join(BOARD_SYMBOLS[int(board[x][y][z])] for y in range(size)) + " ")
+    return "\n".join(lines) + "\n"
+
+
+class _Animation:
+    __slots__ = ("stream", "text", "chars_per_second", "start", "written", "done")
+
+    def __init__(self, stream: TextIO, text: str, chars_per_second: float, done: asyncio.Future):
+        self.stream = stream
+        self.text = text
+        self.chars_per_second = chars_per_second
+        self.start = time.monotonic()
+        self.written = 0
+        self.done = done
+
+
+class Typewriter:
+    """Runs every typing animation from a single timer task"""
+
+    def __init__(self, frame_interval: float = 0.05):
+        self.frame_interval = frame_interval
+        self._animations: List[_Animation] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def type(self, text: str, chars_per_second: float, stream: TextIO = None,
+                   end: str = "\n") -> None:
+        """Write text with a typing effect; resolves once it is fully written"""
+        stream = stream or sys.stdout
+        if chars_per_second <= 0 or not text:
+            stream.write(text + end)
+            stream.flush()
+            return
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        self._animations.append(_Animation(stream, text + end, chars_per_second, done))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        await done
+
+    async def _run(self):
+        while self._animations:
+            await asyncio.sleep(self.frame_interval)
+            now = time.monotonic()
+            touched = set()
+            remaining = []
+            for animation in self._animations:
+                if animation.done.cancelled():
+                    continue
+                due = min(len(animation.text), int((now - animation.start) * animation.chars_per_second))
+                if due > animation.written:
+                    animation.stream.write(animation.text[animation.written:due])
+                    animation.written = due
+                    touched.add(animation.stream)
+                if animation.written >= len(animation.text):
+                    animation.done.set_result(None)
+                else:
+                    remaining.append(animation)
+            for stream in touched:
+                stream.flush()
+            self._animations = remaining
+
+
+# One ticker shared by all sessions in the process
+TYPEWRITER = Typewriter()
@@ -0,0 +1,270 @@
+"""
+Schema-validated parsing of model responses.
+
+Model output is decoded with the fastest available JSON decoder. When that
+fails, cheap local repairs are tried (code fences, trailing prose, trailing
+commas, truncated objects) before giving up, so a slightly malformed answer
+does not cost another round trip. Decoded data is checked against a small
+compiled schema per prompt key, and missing optional fields are filled with
+defaults. PARSE_METRICS records how often each path was needed.
+"""
+
+import json
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib decoder is the fallback
+    _loads = json.loads
+
+REQUIRED = object()
+_NO_FALLBACK = object()
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)\s*(?:```|$)", re.S)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class ResponseParseError(ValueError):
+    """Raised when a response cannot be decoded or fails its schema"""
+
+
+class ResponseSchema:
+    """Required/optional fields of one prompt's JSON response
+
+    Fields are given as {"dotted.path": (type, default)}; use REQUIRED as the
+    default for fields that must be present. wrap_field names the field that
+    receives the raw text when the response is plain prose instead of JSON.
+    """
+
+    __slots__ = ("key", "wrap_field", "_fields")
+
+    def __init__(self, key: str, fields: Dict[str, Tuple[type, Any]], wrap_field: str = None):
+        self.key = key
+        self.wrap_field = tuple(wrap_field.split(".")) if wrap_field else None
+        self._fields = tuple(
+            (tuple(path.split(".")), expected, default)
+            for path, (expected, default) in fields.items()
+        )
+
+    def validate(self, data: Any) -> Tuple[dict, bool]:
+        """Check data in place; returns (data, whether defaults were filled)"""
+        if not isinstance(data, dict):
+            raise ResponseParseError(f"{self.key}: expected an object, got {type(data).__name__}")
+        defaulted = False
+        for path, expected, default in self._fields:
+            parent = data
+            for part in path[:-1]:
+                child = parent.get(part)
+                if not isinstance(child, dict):
+                    if default is REQUIRED:
+                        raise ResponseParseError(f"{self.key}: missing {'.'.join(path)}")
+                    child = parent[part] = {}
+                parent = child
+            value = parent.get(path[-1])
+            if isinstance(value, expected):
+                continue
+            if default is REQUIRED:
+                raise ResponseParseError(f"{self.key}: missing or invalid {'.'.join(path)}")
+            # Copy mutable defaults so responses never share containers
+            parent[path[-1]] = default.copy() if isinstance(default, (dict, list)) else default
+            defaulted = True
+        return data, defaulted
+
+    def wrap(self, text: str) -> dict:
+        """Build a response object around plain-text output"""
+        data: Dict[str, Any] = {}
+        parent = data
+        for part in self.wrap_field[:-1]:
+            parent = parent.setdefault(part, {})
+        parent[self.wrap_field[-1]] = text
+        return data
+
+
+_DIALOGUE_FIELDS = {"dialogue_text": (str, REQUIRED)}
+
+RESPONSE_SCHEMAS = {
+    key: ResponseSchema(key, fields, wrap_field)
+    for key, fields, wrap_field in (
+        ("storyteller.story_generation", {
+            "name": (str, "Untitled Adventure"),
+            "opening_narrative": (str, ""),
+            "levels": (list, REQUIRED),
+        }, None),
+        ("storyteller.level_transition", {
+            "transition_text": (str, REQUIRED),
+        }, "transition_text"),
+        ("character.character_creation", {
+            "name": (str, REQUIRED),
+            "archetype": (str, REQUIRED),
+            "personality": (dict, {}),
+            "dialogue_examples": (dict, {}),
+        }, None),
+        ("character.dialogue_generation.greeting", {
+            **_DIALOGUE_FIELDS,
+            "tone": (str, "neutral"),
+        }, "dialogue_text"),
+        ("character.dialogue_generation.challenge", _DIALOGUE_FIELDS, "dialogue_text"),
+        ("character.dialogue_generation.victory", _DIALOGUE_FIELDS, "dialogue_text"),
+        ("character.dialogue_generation.defeat", _DIALOGUE_FIELDS, "dialogue_text"),
+        ("character.dialogue_generation.action_response", {
+            "dialogue.text": (str, REQUIRED),
+            "dialogue.tone": (str, "neutral"),
+        }, "dialogue.text"),
+        ("game_master.game_selection", {
+            "selected_game.type": (str, REQUIRED),
+            "selected_game.difficulty": (str, "medium"),
+            "selected_game.configuration": (dict, {}),
+        }, None),
+        ("game_master.difficulty_adjustment", {
+            "difficulty_changes.new_level": (str, REQUIRED),
+        }, None),
+        ("advisor.hint_generation", {
+            "hint.text": (str, REQUIRED),
+        }, "hint.text"),
+        ("advisor.strategy_advice", {
+            "strategy.general_approach": (str, REQUIRED),
+        }, "strategy.general_approach"),
+    )
+}
+
+
+class ParseMetrics:
+    """Counts parse outcomes per prompt key"""
+
+    OUTCOMES = ("clean", "repaired", "wrapped", "defaulted", "fallback")
+
+    def __init__(self):
+        self.counts: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, key: str, outcome: str):
+        self.counts[key][outcome] += 1
+        self.counts[key]["total"] += 1
+
+    def summary(self) -> dict:
+        """Per-key outcome counts plus repair and fallback rates"""
+        report = {}
+        for key, counts in self.counts.items():
+            total = counts["total"]
+            report[key] = {
+                **{outcome: counts[outcome] for outcome in self.OUTCOMES},
+                "total": total,
+                "repair_rate": (counts["repaired"] + counts["wrapped"]) / total,
+                "fallback_rate": counts["fallback"] / total
+            }
+        return report
+
+    def reset(self):
+        self.counts.clear()
+
+
+PARSE_METRICS = ParseMetrics()
+
+
+def _close_truncated(text: str, stack: list, in_string: bool) -> str:
+    """Append whatever is needed to close a truncated JSON document"""
+    if in_string:
+        text += '"'
+    text = text.rstrip().rstrip(",:")
+    return text + "".join(_CLOSERS[opener] for opener in reversed(stack))
+
+
+def repair_json(text: str) -> Optional[Any]:
+    """Try cheap fixes for common model output defects; None if hopeless"""
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return None
+    start = min(starts)
+
+    # Single pass: find the end of the first complete value and remember the
+    # last comma so a value cut off mid-key can be dropped
+    stack = []
+    in_string = escaped = False
+    last_comma = None
+    end = None
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(char)
+        elif char in "}]":
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                end = i + 1
+                break
+        elif char == ",":
+            last_comma = (i, list(stack))
+
+    candidates = []
+    if end is not None:
+        # Complete value followed by trailing prose
+        candidates.append(text[start:end])
+    else:
+        candidates.append(_close_truncated(text[start:], stack, in_string))
+        if last_comma is not None:
+            cut, cut_stack = last_comma
+            candidates.append(_close_truncated(text[start:cut], cut_stack, False))
+
+    for candidate in candidates:
+        for attempt in (candidate, _TRAILING_COMMA_RE.sub(r"\1", candidate)):
+            try:
+                return _loads(attempt)
+            except ValueError:
+                continue
+    return None
+
+
+def parse_response(key: str, text: str, fallback: Any = _NO_FALLBACK) -> Any:
+    """Decode, repair if needed and validate a model response
+
+    Returns fallback (and records it) when the response is unusable; without
+    a fallback a ResponseParseError is raised instead.
+    """
+    schema = RESPONSE_SCHEMAS.get(key)
+    outcome = "clean"
+    try:
+        data = _loads(text)
+    except (ValueError, TypeError):
+        data = repair_json(text) if isinstance(text, str) else None
+        outcome = "repaired"
+        if data is None:
+            if schema is not None and schema.wrap_field and isinstance(text, str) and text.strip():
+                data = schema.wrap(text.strip())
+                outcome = "wrapped"
+            else:
+                return _fail(key, f"{key}: response is not valid JSON", fallback)
+
+    if schema is not None:
+        try:
+            data, defaulted = schema.validate(data)
+        except ResponseParseError as e:
+            return _fail(key, str(e), fallback)
+        if defaulted and outcome == "clean":
+            outcome = "defaulted"
+
+    PARSE_METRICS.record(key, outcome)
+    return data
+
+
+def _fail(key: str, message: str, fallback: Any) -> Any:
+    PARSE_METRICS.record(key, "fallback")
+    if fallback is _NO_FALLBACK:
+        raise ResponseParseError(message)
+    return fallback
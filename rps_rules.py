@@ -0,0 +1,169 @@
+"""
+Rules engine for Strategic Rock Paper Scissors and its variants.
+
+A RuleSet turns a "who beats whom" table into integer move codes and a
+precomputed NumPy payoff matrix (+1 row wins, -1 row loses, 0 draw), so a
+round is one array lookup and a whole batch of rounds (for simulation) is
+one fancy-indexing call. Variants with any odd number of moves work the
+same way: classic, RPSLS and the five-element set are built in.
+
+Combo moves are fixed-length move sequences. Each sequence is packed into
+a base-N integer so the combo completed by a player's latest moves is a
+single table lookup, and sliding windows over move arrays find the combos
+of many rounds at once. A round won by completing a combo scores extra.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config import GAME_CONFIGS
+
+RPS_CONFIG = GAME_CONFIGS["strategic_rps"]
+
+DRAW, WIN, LOSE = 0, 1, -1
+OUTCOME_STATUS = {WIN: "win", LOSE: "lose", DRAW: "draw"}
+
+
+class RuleSet:
+    """Moves, payoff matrix and combos of one RPS variant"""
+
+    def __init__(self, name: str, moves: Sequence[Tuple[str, str]], beats: Dict[str, Sequence[str]],
+                 combos: Dict[str, Sequence[str]] = None):
+        self.name = name
+        self.letters = [letter for letter, _ in moves]
+        self.names = [move for _, move in moves]
+        self.size = len(self.names)
+        self._codes = {}
+        for code, (letter, move) in enumerate(moves):
+            self._codes[letter.upper()] = self._codes[move.lower()] = code
+
+        payoff = np.zeros((self.size, self.size), dtype=np.int8)
+        for winner, losers in beats.items():
+            for loser in losers:
+                a, b = self._codes[winner], self._codes[loser]
+                if payoff[a, b] or a == b:
+                    raise ValueError(f"{name}: conflicting rule {winner} vs {loser}")
+                payoff[a, b], payoff[b, a] = WIN, LOSE
+        undecided = (payoff == 0) & ~np.eye(self.size, dtype=bool)
+        if undecided.any():
+            raise ValueError(f"{name}: {int(undecided.sum()) // 2} move pairs have no rule")
+        self.payoff = payoff
+        # The (first) move that beats each move
+        self.counters = np.argmax(payoff.T == WIN, axis=1)
+
+        # Combos: sequences of equal length, packed base-N into a lookup table
+        combos = combos or {}
+        self.combo_names: List[Optional[str]] = [None] + list(combos)
+        self.combo_length = len(next(iter(combos.values()))) if combos else 0
+        self._weights = self.size ** np.arange(self.combo_length)[::-1]
+        self.combo_table = np.zeros(self.size ** self.combo_length if combos else 1, dtype=np.int16)
+        for combo_id, sequence in enumerate(combos.values(), 1):
+            if len(sequence) != self.combo_length:
+                raise ValueError(f"{name}: combos must all be {self.combo_length} moves long")
+            self.combo_table[self._pack([self._codes[move] for move in sequence])] = combo_id
+
+    def _pack(self, codes) -> int:
+        return int(np.dot(codes, self._weights))
+
+    def encode(self, move: str) -> int:
+        """Move code from a letter or a move name (case-insensitive)"""
+        code = self._codes.get(move.upper() if len(move) == 1 else move.lower())
+        if code is None:
+            raise ValueError(f"Unknown move for {self.name}: {move!r}")
+        return code
+
+    def resolve(self, a: int, b: int) -> int:
+        """WIN, LOSE or DRAW for player a"""
+        return int(self.payoff[a, b])
+
+    def resolve_many(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Outcomes for player a over whole arrays of rounds"""
+        return self.payoff[a, b]
+
+    def combo_completed(self, recent: Sequence[int]) -> int:
+        """Combo id (0 = none) completed by the last moves of `recent`"""
+        if not self.combo_length or len(recent) < self.combo_length:
+            return 0
+        return int(self.combo_table[self._pack(recent[-self.combo_length:])])
+
+    def combos_many(self, moves: np.ndarray) -> np.ndarray:
+        """Combo id completed at each round of move arrays shaped (..., rounds)"""
+        combos = np.zeros(moves.shape, dtype=np.int16)
+        if self.combo_length and moves.shape[-1] >= self.combo_length:
+            keys = sliding_window_view(moves, self.combo_length, axis=-1) @ self._weights
+            combos[..., self.combo_length - 1:] = self.combo_table[keys]
+        return combos
+
+    def play_many(self, a: np.ndarray, b: np.ndarray, combo_bonus: int = None) -> dict:
+        """Resolve move arrays shaped (..., rounds): outcomes, combos and points for a
+
+        A round won by completing a combo is worth 1 + combo_bonus points
+        (negative for losses to the opponent's combo).
+        """
+        combo_bonus = RPS_CONFIG["combo_bonus"] if combo_bonus is None else combo_bonus
+        outcomes = self.resolve_many(a, b)
+        combos_a, combos_b = self.combos_many(a), self.combos_many(b)
+        boosted = ((outcomes == WIN) & (combos_a > 0)) | ((outcomes == LOSE) & (combos_b > 0))
+        points = outcomes * (1 + combo_bonus * boosted)
+        return {"outcomes": outcomes, "combos": combos_a, "opponent_combos": combos_b, "points": points}
+
+    def play_one(self, a: Sequence[int], b: Sequence[int], combo_bonus: int = None) -> dict:
+        """The last round of move sequences a and b, scored exactly as play_many scores it"""
+        window = max(self.combo_length, 1)
+        played = self.play_many(np.asarray(a[-window:]), np.asarray(b[-window:]), combo_bonus)
+        return {"outcome": int(played["outcomes"][-1]), "combo": int(played["combos"][-1]),
+                "opponent_combo": int(played["opponent_combos"][-1]), "points": int(played["points"][-1])}
+
+
+RULE_SETS = {
+    "classic": RuleSet(
+        "classic",
+        [("R", "rock"), ("P", "paper"), ("S", "scissors")],
+        {"rock": ["scissors"], "paper": ["rock"], "scissors": ["paper"]},
+        {"avalanche": ["rock", "rock", "rock"],
+         "crossfire": ["rock", "paper", "scissors"],
+         "paper_storm": ["paper", "paper", "scissors"]}
+    ),
+    "rpsls": RuleSet(
+        "rpsls",
+        [("R", "rock"), ("P", "paper"), ("S", "scissors"), ("L", "lizard"), ("K", "spock")],
+        {"rock": ["scissors", "lizard"], "paper": ["rock", "spock"],
+         "scissors": ["paper", "lizard"], "lizard": ["paper", "spock"],
+         "spock": ["rock", "scissors"]},
+        {"bazinga": ["spock", "lizard", "spock"],
+         "avalanche": ["rock", "rock", "rock"],
+         "crossfire": ["rock", "paper", "scissors"]}
+    ),
+    "elemental": RuleSet(
+        "elemental",
+        [("W", "water"), ("F", "fire"), ("E", "earth"), ("A", "air"), ("T", "lightning")],
+        {"water": ["fire", "earth"], "fire": ["earth", "lightning"],
+         "earth": ["air", "lightning"], "air": ["water", "fire"],
+         "lightning": ["water", "air"]},
+        {"storm": ["air", "water", "lightning"],
+         "wildfire": ["fire", "air", "fire"],
+         "quake": ["earth", "earth", "earth"]}
+    )
+}
+
+# Letter -> move name across every variant (shared letters such as R/P/S name
+# the same move in each set that uses them)
+MOVE_NAMES = {letter: name for rules in RULE_SETS.values()
+              for letter, name in zip(rules.letters, rules.names)}
+
+
+def get_rule_set(name: str = None) -> RuleSet:
+    """Rule set by name (default from config)
+
+    The elemental set is only played with the elemental_powers special
+    rule on; "auto" picks it whenever that rule is on.
+    """
+    name = name or RPS_CONFIG["rule_set"]
+    elemental = RPS_CONFIG["special_rules"]["elemental_powers"]
+    if name == "auto":
+        name = "elemental" if elemental else "classic"
+    if name == "elemental" and not elemental:
+        raise ValueError("The elemental rule set needs special_rules.elemental_powers")
+    return RULE_SETS[name]
@@ -0,0 +1,239 @@
+"""
+Tournament harness for the Strategic RPS opponent.
+
+Plays the game's RPS AI against a library of synthetic players: uniform,
+biased, cyclic, win-stay/lose-shift and first-order Markov. Both sides move
+for all simulated sessions at once as integer arrays. predictor_moves() is
+the vectorised form of GameManager._get_strategic_rps_move: each session
+plays one level of matches_per_level matches of rounds_per_match rounds,
+with the move counts the AI predicts from kept for the whole level, and
+rounds and matches are scored with RuleSet.play_many like the game scores
+them. Every (difficulty tier, strategy) pairing reports AI round
+win/draw/loss rates, match wins and the predictor's cost per round.
+calibrate() sweeps counter_probability per tier and suggests the value
+that lands closest to the tier's target AI edge (round win rate minus loss
+rate, 0 for random play in any rule set).
+
+Run directly for a report:  python rps_tournament.py [--sessions N] [--matches M]
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from config import GAME_CONFIGS, RPS_TOURNAMENT
+from rps_rules import RuleSet, get_rule_set, WIN, LOSE
+
+
+# Synthetic players -------------------------------------------------------
+
+class Strategy:
+    """A population of synthetic players, one per parallel match"""
+
+    name = "uniform"
+
+    def __init__(self, rules: RuleSet, matches: int, rng: np.random.Generator):
+        self.rules = rules
+        self.matches = matches
+        self.rng = rng
+
+    def _random(self) -> np.ndarray:
+        return self.rng.integers(0, self.rules.size, self.matches)
+
+    def moves(self, round_index: int, own: np.ndarray, opponent: np.ndarray,
+              outcome: np.ndarray) -> np.ndarray:
+        """Next move per match given last round's moves and outcome (ours)"""
+        return self._random()
+
+
+class Biased(Strategy):
+    """Favours one move (chosen per match) with probability `bias`"""
+
+    name = "biased"
+
+    def __init__(self, rules, matches, rng, bias: float = 0.6):
+        super().__init__(rules, matches, rng)
+        self.bias = bias
+        self.favourite = self._random()
+
+    def moves(self, round_index, own, opponent, outcome):
+        return np.where(self.rng.random(self.matches) < self.bias, self.favourite, self._random())
+
+
+class Cyclic(Strategy):
+    """Steps through the moves with a fixed stride, with a little noise"""
+
+    name = "cyclic"
+
+    def __init__(self, rules, matches, rng, noise: float = 0.1):
+        super().__init__(rules, matches, rng)
+        self.noise = noise
+        self.start = self._random()
+        self.stride = rng.integers(1, rules.size, matches)
+
+    def moves(self, round_index, own, opponent, outcome):
+        planned = (self.start + self.stride * round_index) % self.rules.size
+        return np.where(self.rng.random(self.matches) < self.noise, self._random(), planned)
+
+
+class WinStayLoseShift(Strategy):
+    """Repeats a winning move; after a loss plays what beat it"""
+
+    name = "win_stay_lose_shift"
+
+    def moves(self, round_index, own, opponent, outcome):
+        if round_index == 0:
+            return self._random()
+        moves = self._random()
+        moves = np.where(outcome == WIN, own, moves)
+        return np.where(outcome == LOSE, self.rules.counters[opponent], moves)
+
+
+class Markov(Strategy):
+    """First-order Markov player with a random transition matrix per match"""
+
+    name = "markov"
+
+    def __init__(self, rules, matches, rng, concentration: float = 0.5):
+        super().__init__(rules, matches, rng)
+        transitions = rng.dirichlet(np.full(rules.size, concentration), (matches, rules.size))
+        self.cumulative = transitions.cumsum(axis=2)
+
+    def moves(self, round_index, own, opponent, outcome):
+        if round_index == 0:
+            return self._random()
+        rows = self.cumulative[np.arange(self.matches), own]
+        draws = self.rng.random((self.matches, 1))
+        return np.minimum((draws > rows).sum(axis=1), self.rules.size - 1)
+
+
+STRATEGIES = [Strategy, Biased, Cyclic, WinStayLoseShift, Markov]
+
+
+# The game's AI ------------------------------------------------------------
+
+def predictor_moves(counts: np.ndarray, settings: dict, rules: RuleSet,
+                    rng: np.random.Generator) -> np.ndarray:
+    """AI move per session from the player's move counts, shaped (sessions, moves)
+
+    Same policy as GameManager._get_strategic_rps_move: random until three
+    moves are known or when not countering, otherwise the counter to the
+    most frequent move (ties go to the first move in rule-set order).
+    """
+    sessions = counts.shape[0]
+    random_moves = rng.integers(0, rules.size, sessions)
+    if not settings.get("pattern_recognition", True):
+        return random_moves
+    countering = (counts.sum(axis=1) >= 3) & \
+        (rng.random(sessions) < settings.get("counter_probability", 1.0))
+    return np.where(countering, rules.counters[counts.argmax(axis=1)], random_moves)
+
+
+def play(settings: dict, strategy_cls, sessions: int, matches: int, seed: int = None) -> dict:
+    """One level of `matches` matches per simulated player; rates are from the AI's side"""
+    rules = get_rule_set()
+    rng = np.random.default_rng(seed)
+    player = strategy_cls(rules, sessions, rng)
+    rounds_per_match = GAME_CONFIGS["strategic_rps"]["rounds_per_match"]
+    rounds = matches * rounds_per_match
+    counts = np.zeros((sessions, rules.size), dtype=np.int64)
+    player_moves = np.zeros((sessions, rounds), dtype=np.int64)
+    ai_moves = np.zeros((sessions, rounds), dtype=np.int64)
+    own = opponent = np.zeros(sessions, dtype=np.int64)
+    outcome = np.zeros(sessions, dtype=np.int8)
+    sessions_index = np.arange(sessions)
+    ai_time = 0.0
+
+    for round_index in range(rounds):
+        moves = player.moves(round_index, own, opponent, outcome)
+        started = time.perf_counter()
+        ai = predictor_moves(counts, settings, rules, rng)
+        # The player's move is counted only after the AI has picked
+        counts[sessions_index, moves] += 1
+        ai_time += time.perf_counter() - started
+        player_moves[:, round_index], ai_moves[:, round_index] = moves, ai
+        own, opponent, outcome = moves, ai, rules.resolve_many(moves, ai)
+
+    # Score from the player's side as _resolve_rps_round does; combos only
+    # count when the game tracks them across the level's history
+    combo_bonus = None if GAME_CONFIGS["strategic_rps"]["special_rules"].get("combo_moves") else 0
+    played = rules.play_many(player_moves, ai_moves, combo_bonus)
+    ai_outcomes = -played["outcomes"]
+    match_points = played["points"].reshape(sessions, matches, rounds_per_match).sum(axis=2)
+
+    total = sessions * rounds
+    return {
+        "strategy": strategy_cls.name,
+        "ai_win_rate": float(np.count_nonzero(ai_outcomes == WIN)) / total,
+        "draw_rate": float(np.count_nonzero(ai_outcomes == 0)) / total,
+        "ai_loss_rate": float(np.count_nonzero(ai_outcomes == LOSE)) / total,
+        "ai_edge": float(ai_outcomes.sum()) / total,
+        # Share of matches the AI won (the player ended behind on points)
+        "match_win_rate": float(np.count_nonzero(match_points < 0)) / (sessions * matches),
+        "ai_us_per_round": ai_time / total * 1e6
+    }
+
+
+def run_tournament(sessions: int = None, matches: int = None, seed: int = None) -> Dict[str, List[dict]]:
+    """Every difficulty tier of strategic_rps against every strategy"""
+    sessions = sessions or RPS_TOURNAMENT["sessions"]
+    matches = matches or RPS_TOURNAMENT["matches_per_level"]
+    seed = RPS_TOURNAMENT["seed"] if seed is None else seed
+    return {
+        tier: [play(settings, strategy, sessions, matches, seed + index)
+               for index, strategy in enumerate(STRATEGIES)]
+        for tier, settings in GAME_CONFIGS["strategic_rps"]["difficulty_levels"].items()
+    }
+
+
+def calibrate(sessions: int = None, matches: int = None, seed: int = None) -> Dict[str, dict]:
+    """Suggested counter_probability per tier: mean AI edge closest to the target"""
+    sessions = sessions or RPS_TOURNAMENT["sessions"]
+    matches = matches or RPS_TOURNAMENT["matches_per_level"]
+    seed = RPS_TOURNAMENT["seed"] if seed is None else seed
+    grid = np.linspace(0.0, 1.0, RPS_TOURNAMENT["calibration_steps"])
+    suggestions = {}
+    for tier, settings in GAME_CONFIGS["strategic_rps"]["difficulty_levels"].items():
+        target = RPS_TOURNAMENT["target_ai_edge"][tier]
+        curve = []
+        for probability in grid:
+            trial = {**settings, "counter_probability": float(probability)}
+            rates = [play(trial, strategy, sessions, matches, seed + index)["ai_edge"]
+                     for index, strategy in enumerate(STRATEGIES)]
+            curve.append(float(np.mean(rates)))
+        best = int(np.argmin(np.abs(np.array(curve) - target)))
+        suggestions[tier] = {
+            "current": settings.get("counter_probability"),
+            "suggested": round(float(grid[best]), 2),
+            "target_ai_edge": target,
+            "ai_edge": round(curve[best], 3)
+        }
+    return suggestions
+
+
+def format_report(results: Dict[str, List[dict]], suggestions: Dict[str, dict] = None) -> str:
+    lines = [f"{'tier':<8}{'strategy':<22}{'AI win':>8}{'draw':>8}{'AI loss':>9}"
+             f"{'edge':>8}{'matches':>9}{'us/round':>10}"]
+    for tier, rows in results.items():
+        for row in rows:
+            lines.append(f"{tier:<8}{row['strategy']:<22}{row['ai_win_rate']:>8.1%}"
+                         f"{row['draw_rate']:>8.1%}{row['ai_loss_rate']:>9.1%}{row['ai_edge']:>+8.2f}"
+                         f"{row['match_win_rate']:>9.1%}{row['ai_us_per_round']:>10.1f}")
+    for tier, suggestion in (suggestions or {}).items():
+        lines.append(f"{tier}: counter_probability {suggestion['current']} -> {suggestion['suggested']} "
+                     f"(edge {suggestion['ai_edge']:+.2f}, target {suggestion['target_ai_edge']:+.2f})")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Strategic RPS predictor tournament")
+    parser.add_argument("--sessions", type=int, default=RPS_TOURNAMENT["sessions"])
+    parser.add_argument("--matches", type=int, default=RPS_TOURNAMENT["matches_per_level"])
+    parser.add_argument("--seed", type=int, default=RPS_TOURNAMENT["seed"])
+    parser.add_argument("--calibrate", action="store_true")
+    args = parser.parse_args()
+    report = run_tournament(args.sessions, args.matches, args.seed)
+    suggested = calibrate(args.sessions, args.matches, args.seed) if args.calibrate else None
+    print(format_report(report, suggested))
@@ -0,0 +1,226 @@
+"""
+Exact rule finder for integer sequences.
+
+Given the visible prefix of a number puzzle, find every simple rule that
+reproduces it and predict the next term with each. Three detectors run over
+exact integers and fractions (no floating point):
+
+- finite differences: polynomials (constant, arithmetic, quadratic, ...)
+- ratio tests: geometric sequences with a rational ratio
+- Berlekamp-Massey: the shortest linear recurrence (Fibonacci-like sums,
+  "times r plus c" steps, and anything else with constant coefficients)
+
+A rule only counts when the prefix has at least one term beyond what its
+parameters were fitted from. Rules are ranked by their number of free
+parameters, so solve() reports the simplest explanation first, together
+with the set of integer next values that any plausible rule predicts.
+Results are cached per prefix, which makes checking each guess and
+building hints effectively free after the first call.
+"""
+
+from fractions import Fraction
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+# Order in which equally complex rules are preferred
+_KIND_ORDER = {"constant": 0, "polynomial": 1, "geometric": 2, "affine": 3, "recurrence": 4}
+_ORDINALS = {2: "second", 3: "third", 4: "fourth", 5: "fifth"}
+
+
+def _fmt(value: Fraction) -> str:
+    return str(value.numerator) if value.denominator == 1 else f"{value.numerator}/{value.denominator}"
+
+
+def _sum_text(terms: List[Tuple[Fraction, str]]) -> str:
+    """"a × x + b × y - ..." with signs folded in and unit factors dropped"""
+    text = ""
+    for factor, operand in terms:
+        sign = "-" if factor < 0 else "+"
+        magnitude = abs(factor)
+        part = operand if magnitude == 1 else f"{_fmt(magnitude)} × {operand}"
+        text = (f"-{part}" if sign == "-" else part) if not text else f"{text} {sign} {part}"
+    return text
+
+
+def differences(terms: Sequence[int], order: int = 1) -> List[int]:
+    """order-th finite differences"""
+    row = list(terms)
+    for _ in range(order):
+        row = [b - a for a, b in zip(row, row[1:])]
+    return row
+
+
+def berlekamp_massey(terms: Sequence[int]) -> Tuple[int, List[Fraction]]:
+    """Shortest linear recurrence over the rationals
+
+    Returns (L, coefficients) with terms[n] = sum(coefficients[i] * terms[n-1-i]).
+    """
+    connection = [Fraction(1)]
+    previous = [Fraction(1)]
+    length, shift, last_discrepancy = 0, 1, Fraction(1)
+    for n, term in enumerate(terms):
+        discrepancy = Fraction(term) + sum(connection[i] * terms[n - i]
+                                           for i in range(1, length + 1))
+        if discrepancy == 0:
+            shift += 1
+            continue
+        factor = discrepancy / last_discrepancy
+        updated = connection + [Fraction(0)] * max(0, len(previous) + shift - len(connection))
+        for i, value in enumerate(previous):
+            updated[i + shift] -= factor * value
+        if 2 * length <= n:
+            previous, last_discrepancy = connection, discrepancy
+            length, shift = n + 1 - length, 1
+        else:
+            shift += 1
+        connection = updated
+    coefficients = [-c for c in connection[1:length + 1]]
+    coefficients += [Fraction(0)] * (length - len(coefficients))
+    return length, coefficients
+
+
+class Rule:
+    """One explanation of a sequence prefix"""
+
+    __slots__ = ("kind", "params", "complexity", "next_value")
+
+    def __init__(self, kind: str, params: tuple, complexity: int, next_value: Fraction):
+        self.kind = kind
+        self.params = params
+        self.complexity = complexity
+        self.next_value = next_value
+
+    def __repr__(self) -> str:
+        return f"Rule({self.kind}, {self.params}, next={_fmt(self.next_value)})"
+
+    @property
+    def integral(self) -> bool:
+        return self.next_value.denominator == 1
+
+    def family(self) -> str:
+        """What kind of pattern to look for"""
+        if self.kind == "constant":
+            return "Look closely - does the number change at all?"
+        if self.kind == "polynomial" and self.params[0] == 1:
+            return "Try finding the constant difference between consecutive numbers."
+        if self.kind == "polynomial":
+            return "Look at the differences between consecutive numbers, then at how those change."
+        if self.kind == "geometric":
+            return "Try finding the constant ratio between consecutive numbers."
+        if self.kind == "affine":
+            return "Each number comes from the one before it: multiply, then add."
+        return f"Each number is related to the {self.params[0]} numbers before it."
+
+    def detail(self, terms: Sequence[int]) -> str:
+        """The rule's parameters"""
+        if self.kind == "constant":
+            return f"Every number is {terms[-1]}."
+        if self.kind == "polynomial":
+            degree, step = self.params
+            if degree == 1:
+                return f"The numbers grow by {step} each step."
+            return f"The {_ORDINALS.get(degree, f'{degree}th')} differences are always {step}."
+        if self.kind == "geometric":
+            return f"Each number is {_fmt(self.params[0])} times the one before it."
+        if self.kind == "affine":
+            ratio, offset = self.params
+            return f"Each number is {_fmt(ratio)} times the one before it, {'plus' if offset > 0 else 'minus'} {_fmt(abs(offset))}."
+        coefficients = self.params[1]
+        if all(c == 1 for c in coefficients):
+            return f"Each number is the sum of the {len(coefficients)} before it."
+        names = ["the previous number"] + [f"the number {i + 1} back" for i in range(1, len(coefficients))]
+        return "Each number is " + _sum_text([(c, names[i]) for i, c in enumerate(coefficients) if c]) + "."
+
+    def formula(self, terms: Sequence[int]) -> str:
+        """How the next number follows from the visible ones"""
+        last = terms[-1]
+        if self.kind == "constant":
+            return f"The next number is {last}."
+        if self.kind == "polynomial":
+            return f"The next number is {last} + {_fmt(self.next_value - last)}."
+        if self.kind == "geometric":
+            return f"The next number is {last} × {_fmt(self.params[0])}."
+        if self.kind == "affine":
+            ratio, offset = self.params
+            return f"The next number is {_sum_text([(ratio, str(last)), (offset, '1')])}.".replace(" × 1.", ".")
+        coefficients = self.params[1]
+        return "The next number is " + _sum_text(
+            [(c, str(terms[-1 - i])) for i, c in enumerate(coefficients) if c]) + "."
+
+
+class Solution:
+    """All plausible rules for a prefix, simplest first"""
+
+    __slots__ = ("terms", "rules")
+
+    def __init__(self, terms: Tuple[int, ...], rules: List[Rule]):
+        self.terms = terms
+        self.rules = rules
+
+    @property
+    def rule(self) -> Optional[Rule]:
+        """The simplest rule, or None when nothing is supported by the prefix"""
+        return self.rules[0] if self.rules else None
+
+    @property
+    def plausible_next(self) -> List[int]:
+        """Integer next values predicted by any plausible rule, simplest rule first"""
+        values = []
+        for rule in self.rules:
+            if rule.integral and int(rule.next_value) not in values:
+                values.append(int(rule.next_value))
+        return values
+
+    def is_plausible(self, guess: int) -> bool:
+        return guess in self.plausible_next
+
+
+def _polynomial(terms: Tuple[int, ...]) -> Optional[Rule]:
+    # Degree d needs d + 1 terms to fit and one more to confirm
+    for degree in range(len(terms) - 1):
+        row = differences(terms, degree)
+        if len(row) >= 2 and all(value == row[0] for value in row):
+            if degree == 0:
+                return Rule("constant", (), 1, Fraction(terms[-1]))
+            # Extend the difference table by one column
+            next_value = sum(differences(terms, order)[-1] for order in range(degree + 1))
+            return Rule("polynomial", (degree, row[0]), degree + 1, Fraction(next_value))
+    return None
+
+
+def _geometric(terms: Tuple[int, ...]) -> Optional[Rule]:
+    if len(terms) < 3 or terms[0] == 0:
+        return None
+    ratio = Fraction(terms[1], terms[0])
+    if ratio in (0, 1):
+        return None
+    if all(Fraction(b) == a * ratio for a, b in zip(terms, terms[1:])):
+        return Rule("geometric", (ratio,), 2, terms[-1] * ratio)
+    return None
+
+
+def _recurrence(terms: Tuple[int, ...]) -> Optional[Rule]:
+    order, coefficients = berlekamp_massey(terms)
+    if order == 2 and coefficients[0] + coefficients[1] == 1 and coefficients[1] not in (0, -1) \
+            and len(terms) >= 4:
+        # a(n) = r * a(n-1) + c: characteristic roots r and 1, three parameters
+        ratio = -coefficients[1]
+        offset = terms[1] - ratio * terms[0]
+        return Rule("affine", (ratio, offset), 3, ratio * terms[-1] + offset)
+    # L coefficients plus L initial terms, confirmed by at least one more term
+    if order < 2 or len(terms) < 2 * order + 1:
+        return None
+    next_value = sum(c * terms[-1 - i] for i, c in enumerate(coefficients))
+    return Rule("recurrence", (order, tuple(coefficients)), 2 * order, next_value)
+
+
+@lru_cache(maxsize=4096)
+def _solve(terms: Tuple[int, ...]) -> Solution:
+    rules = [rule for rule in (_polynomial(terms), _geometric(terms), _recurrence(terms)) if rule]
+    rules.sort(key=lambda rule: (rule.complexity, _KIND_ORDER[rule.kind]))
+    return Solution(terms, rules)
+
+
+def solve(terms: Sequence[int]) -> Solution:
+    """Plausible rules for a visible prefix (cached)"""
+    return _solve(tuple(int(term) for term in terms))
@@ -0,0 +1,159 @@
+"""
+Copy-on-write session state.
+
+Every session starts from the same defaults (DEFAULT_GAME_STATE). A
+StateTemplate splits them once: immutable values (numbers, strings, tuples,
+...) are shared by every session, and mutable containers (the inventory
+list, the unlocked_features set) are kept as prototypes. A SessionState
+only stores what the session itself owns. Reading an immutable default
+falls through to the template, and a mutable default gets the session's
+own copy the first time it is touched. A container handed out can be
+changed in place, so first access is the first possible write. A fresh
+session therefore costs one small object and an empty dict, and no two
+sessions ever share a container.
+"""
+
+import copy
+from collections.abc import Mapping, MutableMapping
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator
+
+from config import DEFAULT_GAME_STATE
+
+# Values that are safe to share between sessions
+_IMMUTABLE = (type(None), bool, int, float, complex, str, bytes, tuple, frozenset)
+
+_DELETED = object()  # Marks a default the session has deleted
+
+_JSON_SCALARS = (type(None), bool, int, float, str)
+_SKIP = object()  # A value with no JSON form (engine objects, ...)
+
+
+def _json_safe(value):
+    """`value` as JSON-ready data (sets become lists), or _SKIP"""
+    if isinstance(value, _JSON_SCALARS):
+        return value
+    if isinstance(value, Mapping):
+        items = ((str(key), _json_safe(item)) for key, item in value.items())
+        return {key: item for key, item in items if item is not _SKIP}
+    if isinstance(value, (set, frozenset)):
+        value = sorted(value, key=repr)
+    elif not isinstance(value, (list, tuple)):
+        return _SKIP
+    return [item for item in map(_json_safe, value) if item is not _SKIP]
+
+
+class StateTemplate:
+    """Shared defaults for many SessionStates"""
+
+    __slots__ = ("shared", "_factories", "_order")
+
+    def __init__(self, defaults: Dict[str, Any]):
+        shared, factories = {}, {}
+        for key, value in defaults.items():
+            if isinstance(value, _IMMUTABLE):
+                shared[key] = value
+            else:
+                prototype = copy.deepcopy(value)
+                factories[key] = lambda prototype=prototype: copy.deepcopy(prototype)
+        self.shared = MappingProxyType(shared)
+        self._factories: Dict[str, Callable[[], Any]] = factories
+        self._order = tuple(defaults)
+
+    def __contains__(self, key) -> bool:
+        return key in self.shared or key in self._factories
+
+    def new(self, **values) -> "SessionState":
+        """A fresh session state, optionally with some keys set"""
+        return SessionState(self, values)
+
+
+class SessionState(MutableMapping):
+    """Dict-like session state that copies template containers on first touch"""
+
+    __slots__ = ("_template", "_own")
+
+    def __init__(self, template: StateTemplate, own: Dict[str, Any] = None):
+        self._template = template
+        self._own: Dict[str, Any] = own if own is not None else {}
+
+    def __getitem__(self, key):
+        value = self._own.get(key, _DELETED)
+        if value is not _DELETED:
+            return value
+        if key in self._own:
+            raise KeyError(key)  # Default deleted by this session
+        template = self._template
+        if key in template.shared:
+            return template.shared[key]
+        factory = template._factories.get(key)
+        if factory is None:
+            raise KeyError(key)
+        value = self._own[key] = factory()
+        return value
+
+    def __setitem__(self, key, value):
+        self._own[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if key in self._template:
+            self._own[key] = _DELETED
+        else:
+            del self._own[key]
+
+    def __contains__(self, key) -> bool:
+        value = self._own.get(key)
+        if value is _DELETED:
+            return False
+        return key in self._own or key in self._template
+
+    def __iter__(self) -> Iterator[str]:
+        own = self._own
+        for key in self._template._order:
+            if own.get(key) is not _DELETED:
+                yield key
+        for key, value in own.items():
+            if value is not _DELETED and key not in self._template:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        # Only what the session owns: showing the defaults would copy every container
+        return f"SessionState({self.owned()!r})"
+
+    def copy(self) -> "SessionState":
+        """Shallow copy, like dict.copy()"""
+        return SessionState(self._template, dict(self._own))
+
+    def owned(self) -> Dict[str, Any]:
+        """What this session stores itself (overrides and touched containers)"""
+        return {key: value for key, value in self._own.items() if value is not _DELETED}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready copy of the whole state
+
+        Sets become lists and values with no JSON form (game engines and
+        other objects) are left out. Untouched container defaults are read
+        from a fresh copy, so the session itself does not take them over.
+        """
+        own, template = self._own, self._template
+        result = {}
+        for key in self:
+            if key in own:
+                value = own[key]
+            elif key in template.shared:
+                value = template.shared[key]
+            else:
+                value = template._factories[key]()
+            value = _json_safe(value)
+            if value is not _SKIP:
+                result[key] = value
+        return result
+
+
+# Every GameState starts from this template
+GAME_STATE_TEMPLATE = StateTemplate(DEFAULT_GAME_STATE)
@@ -0,0 +1,72 @@
+"""
+Speculative generation of end-of-game dialogue.
+
+When the player's move may end the game, both the victory and the defeat
+lines are requested from the character in the background, built from that
+move, while the turn and the AI search are processed. Once the result is
+known the matching line is awaited, usually already finished, and the
+other request is cancelled.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Game result -> character dialogue type used in game.main()
+OUTCOME_DIALOGUES = {
+    "win": "victory",
+    "lose": "defeat"
+}
+
+
+class OutcomeDialogueSpeculator:
+    """Pre-generates victory and defeat dialogue for the current character"""
+
+    def __init__(self):
+        self._character = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.stats = {"started": 0, "hits": 0, "misses": 0, "cancelled": 0}
+
+    @property
+    def active(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self, character, strategy) -> None:
+        """Begin generating both outcome dialogues for this move"""
+        # Lines speculated for an earlier move (or character) are stale
+        self.cancel()
+        self._character = character
+        for result, dialogue_type in OUTCOME_DIALOGUES.items():
+            self._tasks[dialogue_type] = asyncio.create_task(
+                character.generate_dialogue(dialogue_type, {"result": result, "strategy": strategy})
+            )
+            self.stats["started"] += 1
+
+    async def take(self, character, dialogue_type: str, context: dict) -> str:
+        """Return the dialogue for the final outcome, speculated if possible"""
+        task: Optional[asyncio.Task] = None
+        if character is self._character:
+            task = self._tasks.pop(dialogue_type, None)
+        self.cancel()
+
+        if task is not None:
+            try:
+                text = await task
+                self.stats["hits"] += 1
+                return text
+            except Exception as e:
+                logger.warning(f"Speculative {dialogue_type} dialogue failed: {e}")
+
+        self.stats["misses"] += 1
+        return await character.generate_dialogue(dialogue_type, context)
+
+    def cancel(self) -> None:
+        """Drop all outstanding speculative requests"""
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+                self.stats["cancelled"] += 1
+        self._tasks.clear()
+        self._character = None
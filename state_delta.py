@@ -0,0 +1,49 @@
+"""
+Versioned deltas for turn results.
+
+Each turn commits the cells it changed to a DeltaLog and gets a new state
+version. Turn results carry only those changes plus the version; a client
+that missed some turns can catch up from the bounded log, and one that fell
+further behind asks for a full snapshot instead.
+"""
+
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+# (x, y, z, player) for board games
+Change = Tuple[int, int, int, int]
+
+
+class DeltaLog:
+    """Monotonic state version with a bounded history of changes"""
+
+    def __init__(self, max_entries: int = 64):
+        self.version = 0
+        self._reset_version = 0  # Version of the last reset; older clients need a snapshot
+        self._entries: Deque[Tuple[int, List[Change]]] = deque(maxlen=max_entries)
+
+    def commit(self, changes: List[Change]) -> int:
+        """Record one turn's changes and return the new version"""
+        self.version += 1
+        self._entries.append((self.version, changes))
+        return self.version
+
+    def reset(self) -> int:
+        """Start a new board; older deltas no longer apply"""
+        self._entries.clear()
+        self._reset_version = self.commit([])
+        return self._reset_version
+
+    def since(self, version: int) -> Optional[List[Change]]:
+        """All changes after `version`, or None if a snapshot is needed"""
+        if version >= self.version:
+            return []
+        if version < self._reset_version:
+            return None  # Deltas cannot express the cleared board
+        if not self._entries or version < self._entries[0][0] - 1:
+            return None
+        changes: List[Change] = []
+        for entry_version, entry_changes in self._entries:
+            if entry_version > version:
+                changes.extend(entry_changes)
+        return changes
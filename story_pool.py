@@ -0,0 +1,148 @@
+"""
+Background pool of pre-generated stories.
+
+Story generation is the largest and slowest prompt, and it sits in front of
+every new game. StoryPool keeps a few ready stories per (genre, play_style)
+and refills them with background tasks when a pool drops below its low
+watermark, so GameManager.initialize_game can hand one out immediately.
+When a pool is empty but a refill is already running, take() waits for
+that story instead of starting a second model call.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Tuple
+
+from config import GAME_GENRES, PLAY_STYLES, STORY_POOL_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, str]
+
+
+class StoryPool:
+    """Keeps pre-generated stories per (genre, play_style)"""
+
+    def __init__(self, storyteller, settings: dict = None):
+        settings = {**STORY_POOL_SETTINGS, **(settings or {})}
+        self.storyteller = storyteller
+        self.stories_per_key = settings["stories_per_key"]
+        self.low_watermark = settings["low_watermark"]
+        self.borrow_across_styles = settings["borrow_across_styles"]
+        self._refill_limit = asyncio.Semaphore(settings["max_concurrent_refills"])
+        self._pools: Dict[PoolKey, Deque[dict]] = {}
+        self._preferences: Dict[PoolKey, dict] = {}
+        self._refills: Dict[PoolKey, asyncio.Task] = {}
+        self._arrivals: Dict[str, asyncio.Event] = {}  # genre -> set when a story lands
+        self.stats = {"hits": 0, "borrowed": 0, "waited": 0, "misses": 0, "generated": 0}
+
+    @staticmethod
+    def key_for(genre: str, player_preferences: dict) -> PoolKey:
+        return genre, player_preferences.get("play_style", PLAY_STYLES[0])
+
+    def warm(self, genres: Iterable[str] = None, play_styles: Iterable[str] = None):
+        """Start filling pools in the background (call from a running loop)"""
+        for genre in genres or GAME_GENRES:
+            for style in play_styles or PLAY_STYLES:
+                self._schedule_refill((genre, style))
+
+    async def take(self, genre: str, player_preferences: dict) -> dict:
+        """Return a story for the player, generating one only if no pool has any"""
+        key = self.key_for(genre, player_preferences)
+        self._preferences[key] = player_preferences
+        story = self._pop(key)
+        if story is not None:
+            self.stats["hits"] += 1
+        elif self.borrow_across_styles:
+            story = self._borrow(genre)
+            if story is not None:
+                self.stats["borrowed"] += 1
+        if story is None:
+            story = await self._wait_for_refill(key)
+            if story is not None:
+                self.stats["waited"] += 1
+
+        if story is None:
+            self.stats["misses"] += 1
+            story = await self.storyteller.generate_story(genre, player_preferences)
+        self._schedule_refill(key)
+        return story
+
+    def available(self, genre: str, play_style: str) -> int:
+        return len(self._pools.get((genre, play_style), ()))
+
+    async def close(self):
+        """Cancel outstanding refills"""
+        tasks = list(self._refills.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refills.clear()
+
+    def _pop(self, key: PoolKey) -> Optional[dict]:
+        pool = self._pools.get(key)
+        return pool.popleft() if pool else None
+
+    def _borrow(self, genre: str) -> Optional[dict]:
+        """Take a story from another play style of the same genre"""
+        for (pool_genre, _), pool in self._pools.items():
+            if pool_genre == genre and pool:
+                return pool.popleft()
+        return None
+
+    async def _wait_for_refill(self, key: PoolKey) -> Optional[dict]:
+        """A story from a refill already in flight for this key (or genre when borrowing)"""
+        genre = key[0]
+        pending = [task for pool_key, task in self._refills.items() if not task.done() and
+                   (pool_key == key or (self.borrow_across_styles and pool_key[0] == genre))]
+        while pending:
+            arrival = asyncio.ensure_future(self._arrivals.setdefault(genre, asyncio.Event()).wait())
+            await asyncio.wait([arrival, *pending], return_when=asyncio.FIRST_COMPLETED)
+            arrival.cancel()
+            story = self._pop(key)
+            if story is None and self.borrow_across_styles:
+                story = self._borrow(genre)
+            if story is not None:
+                return story
+            pending = [task for task in pending if not task.done()]
+        return None
+
+    def _schedule_refill(self, key: PoolKey):
+        if len(self._pools.get(key, ())) >= self.low_watermark:
+            return
+        task = self._refills.get(key)
+        if task is not None and not task.done():
+            return
+        self._refills[key] = asyncio.create_task(self._refill(key))
+
+    def _seed_preferences(self, key: PoolKey) -> dict:
+        """Preferences for a new story, steered away from the pooled ones"""
+        genre, style = key
+        preferences = dict(self._preferences.get(key) or {
+            "preferred_genre": genre,
+            "play_style": style,
+            "difficulty_preference": "adaptive",
+            "genre_elements": GAME_GENRES[genre]["themes"],
+            "character_preferences": GAME_GENRES[genre]["character_archetypes"]
+        })
+        existing = [story.get("name") for story in self._pools.get(key, ()) if story.get("name")]
+        if existing:
+            preferences["avoid_repeating_stories"] = existing
+        return preferences
+
+    async def _refill(self, key: PoolKey):
+        pool = self._pools.setdefault(key, deque())
+        genre = key[0]
+        while len(pool) < self.stories_per_key:
+            async with self._refill_limit:
+                story = await self.storyteller.generate_story(genre, self._seed_preferences(key))
+            if story.get("fallback"):
+                # Don't hand out canned stories later; let a real call retry
+                logger.warning(f"Story pool refill for {key} fell back; stopping refill")
+                return
+            pool.append(story)
+            self.stats["generated"] += 1
+            arrival = self._arrivals.pop(genre, None)
+            if arrival is not None:
+                arrival.set()
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from asset_store import Asset, AssetStore, write_asset
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AssetStore(str(tmp_path), {"check_interval": 0.0})
+
+
+def test_round_trip_arrays_records_and_meta(tmp_path):
+    path = str(tmp_path / "sample.bin")
+    grid = np.arange(12, dtype=np.int16).reshape(3, 4)
+    write_asset(path, "sample", 1, {"grid": grid, "empty": np.zeros((0, 2))},
+                {"stories": [{"title": "a"}, ["b", 2], "c"]}, {"source": "test"})
+    asset = Asset(path)
+    assert (asset.name, asset.version, asset.meta) == ("sample", 1, {"source": "test"})
+    np.testing.assert_array_equal(asset.array("grid"), grid)
+    assert asset.array("grid").ctypes.data % 64 == 0
+    assert asset.array("empty").shape == (0, 2)
+    assert not asset.array("grid").flags.writeable
+    stories = asset.records("stories")
+    assert len(stories) == 3
+    assert stories[-1] == "c"
+    assert list(stories) == [{"title": "a"}, ["b", 2], "c"]
+    with pytest.raises(IndexError):
+        stories[3]
+    with pytest.raises(KeyError):
+        asset.records("missing")
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "junk.bin"
+    path.write_bytes(b"not an asset at all")
+    with pytest.raises(ValueError):
+        Asset(str(path))
+
+
+def test_unpublished_asset_is_none(store):
+    assert store.get("missing") is None
+    assert store.array("missing", "x") is None
+
+
+def test_hot_swap_keeps_old_arrays_valid(store):
+    store.publish("table", {"values": np.array([1, 2, 3])})
+    old = store.array("table", "values")
+    assert store.publish("table", {"values": np.array([4, 5, 6])}) == 2
+    new = store.array("table", "values")
+    np.testing.assert_array_equal(new, [4, 5, 6])
+    np.testing.assert_array_equal(old, [1, 2, 3])
+    assert store.stats["mapped"] == 1
+    assert store.stats["swapped"] == 1
+
+
+def test_check_interval_delays_the_swap(tmp_path):
+    store = AssetStore(str(tmp_path), {"check_interval": 3600.0})
+    store.publish("table", {"values": np.array([1])})
+    first = store.get("table")
+    # Another process publishes; this store does not look again yet
+    AssetStore(str(tmp_path)).publish("table", {"values": np.array([2])})
+    assert store.get("table") is first
+
+
+def test_prune_keeps_the_newest_versions(store):
+    for value in range(4):
+        store.publish("table", {"values": np.array([value])})
+    assert store.versions("table") == [3, 4]
+    assert store.current_version("table") == 4
+
+
+def test_mapped_version_survives_pruning(tmp_path):
+    settings = {"check_interval": 0.0, "keep_versions": 1}
+    store = AssetStore(str(tmp_path), settings)
+    store.publish("table", {"values": np.array([7])})
+    held = store.array("table", "values")
+    AssetStore(str(tmp_path), settings).publish("table", {"values": np.array([8])})
+    assert store.versions("table") == [2]
+    assert held[0] == 7
+
+
+def test_ensure_builds_missing_assets_once(tmp_path):
+    store = AssetStore(str(tmp_path), {"line_table_sizes": [3]})
+    store.ensure(["line_tables"])
+    store.ensure(["line_tables"])
+    assert store.versions("line_tables") == [1]
+    assert store.array("line_tables", "win_lines_3").shape == (49, 3)
+    assert store.array("line_tables", "incidence_3").sum(axis=0).tolist() == [3] * 49
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+
+import pytest
+
+import game_manager
+from config import GAME_CONFIGS
+from game_manager import EnhancedGameManager
+from object_pool import GameObjectPool
+from rps_rules import get_rule_set
+from tictactoe import TicTacToe3D
+from token_accounting import ACCOUNTANT
+
+RPS = "Strategic Rock Paper Scissors"
+
+
+@pytest.fixture
+def manager():
+    manager = EnhancedGameManager(seed=11)
+    manager.game_state.state.update({
+        "current_game": {"type": RPS, "engine_settings": {}},
+        "progress": {"wins": 0, "losses": 0}
+    })
+    manager.start_match()
+    yield manager
+    manager.release_resources()
+
+
+def test_loss_to_an_ai_combo_costs_the_bonus(manager):
+    rules = get_rule_set()
+    state = manager.game_state.state
+    state["rps_history"] = [{"player": "P", "ai": "R", "result": "win", "combo": None}] * 2
+    result = manager._resolve_rps_round(rules, rules.encode("S"), rules.encode("R"))
+    assert result["status"] == "lose"
+    assert result["ai_combo"] == "avalanche"
+    assert result["points"] == -(1 + GAME_CONFIGS["strategic_rps"]["combo_bonus"])
+
+
+def test_rps_rounds_are_not_speculated(manager):
+    rounds = GAME_CONFIGS["strategic_rps"]["rounds_per_match"]
+    manager.game_state.state["rps_match"]["round"] = rounds - 1
+    assert manager.is_near_end()
+    assert not manager.worth_speculating()
+
+
+def test_move_clock_stops_before_the_hint_is_generated(manager):
+    state = manager.game_state.state
+    state["recent_results"] = ["lose"] * 3
+    state["current_game"]["difficulty"] = "medium"
+    timer = manager.timers.schedule(60, lambda: None)
+    manager._move_timer = timer
+    seen = []
+
+    async def generate_hint(*args, **kwargs):
+        seen.append(timer.active)
+        return "hint"
+
+    manager.advisor.generate_hint = generate_hint
+    result = asyncio.run(manager.play_turn({"choice": "R"}))
+    assert result["hint"] == "hint"
+    assert seen == [False]
+
+
+def test_in_process_search_runs_off_the_event_loop(manager, monkeypatch):
+    threads = []
+
+    def choose_move(*args):
+        threads.append(threading.current_thread())
+        return 0
+
+    monkeypatch.setattr(game_manager, "choose_move", choose_move)
+    manager.game_state.state["current_game"]["engine_settings"] = {"ai_engine": "alphabeta"}
+    move = asyncio.run(manager._compute_tictactoe_move(TicTacToe3D()))
+    assert move == (0, 0, 0)
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_replay_search_in_a_thread_is_reproducible():
+    moves = []
+    for _ in range(2):
+        manager = EnhancedGameManager(seed=5)
+        manager.game_state.state["current_game"] = {
+            "type": "3D Tic Tac Toe", "engine_settings": {"ai_engine": "mcts"}
+        }
+        game = TicTacToe3D()
+        game.board[1, 1, 1] = 1
+        try:
+            moves.append(asyncio.run(manager._compute_tictactoe_move(game)))
+        finally:
+            manager.release_resources()
+    assert manager.game_state.rng.replay
+    assert moves[0] == moves[1]
+
+
+def test_released_sessions_leave_the_accountant():
+    before = set(ACCOUNTANT.sessions)
+    managers = [EnhancedGameManager() for _ in range(3)]
+    assert len(set(ACCOUNTANT.sessions) - before) == 3
+    for manager in managers:
+        manager.release_resources()
+    assert set(ACCOUNTANT.sessions) == before
+
+
+def test_board_built_mid_turn_goes_back_to_the_pool(monkeypatch):
+    pool = GameObjectPool()
+    manager = EnhancedGameManager(seed=2, object_pool=pool)
+    manager.game_state.state["current_game"] = {"type": "3D Tic Tac Toe", "engine_settings": {}}
+    monkeypatch.setattr(game_manager, "choose_move", lambda *args: 26)
+    asyncio.run(manager._process_tictactoe({"position": (0, 0, 0)}))
+    board = manager.game_state.state["tictactoe_game"]
+    manager.release_resources()
+    assert manager.game_state.state["tictactoe_game"] is None
+    assert pool.stats["3D Tic Tac Toe"]["releases"] == 1
+    other = EnhancedGameManager(seed=3, object_pool=pool)
+    other.game_state.state["current_game"] = {"type": "3D Tic Tac Toe", "engine_settings": {}}
+    other.start_match()
+    assert other.game_state.state["tictactoe_game"] is board
+    other.release_resources()
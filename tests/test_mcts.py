@@ -0,0 +1,79 @@
+import numpy as np
+
+from bitboard import legal_cells
+from mcts import MCTSPlayer, NodeArena
+
+
+def bits(*cells):
+    return sum(1 << cell for cell in cells)
+
+
+SEARCH = {"mcts_iterations": 400, "proof_plies": 0}
+
+
+def test_takes_an_immediate_win():
+    player = MCTSPlayer(3, seed=1)
+    assert player.choose_move(bits(9, 13), bits(0, 8), 2, SEARCH) == 4
+
+
+def test_blocks_an_immediate_threat():
+    player = MCTSPlayer(3, seed=1)
+    assert player.choose_move(bits(0, 1, 22), bits(13, 26), 2, {**SEARCH, "mcts_iterations": 1500}) == 2
+
+
+def test_proof_search_answers_without_iterations():
+    player = MCTSPlayer(3, seed=1)
+    move = player.choose_move(bits(9, 13), bits(0, 8), 2, {"mcts_iterations": 0, "proof_plies": 1})
+    assert move == 4
+    assert player.stats["iterations"] == 0
+
+
+def test_same_seed_same_move():
+    position = (bits(0, 13), bits(26))
+    moves = {MCTSPlayer(3, seed=7).choose_move(*position, 2, SEARCH) for _ in range(3)}
+    assert len(moves) == 1
+
+
+def test_tree_is_reused_after_the_reply():
+    player = MCTSPlayer(3, seed=2)
+    p1, p2 = bits(13), 0
+    move = player.choose_move(p1, p2, 2, SEARCH)
+    p2 |= 1 << move
+    reply = next(cell for cell in legal_cells(p1, p2, 3) if cell != move)
+    player.choose_move(p1 | 1 << reply, p2, 2, SEARCH)
+    assert player.stats["reused_visits"] > 0
+
+
+def test_unrelated_position_starts_a_fresh_tree():
+    player = MCTSPlayer(3, seed=2)
+    player.choose_move(bits(13), 0, 2, SEARCH)
+    player.choose_move(bits(0), 0, 2, SEARCH)
+    assert player.stats["reused_visits"] == 0
+
+
+def test_full_arena_still_answers():
+    player = MCTSPlayer(3, seed=3, config={"arena_capacity": 30})
+    move = player.choose_move(bits(13), 0, 2, SEARCH)
+    assert move in legal_cells(bits(13), 0, 3)
+
+
+def test_gravity_moves_are_legal():
+    player = MCTSPlayer(4, seed=4)
+    p1, p2 = bits(0), 0
+    settings = {**SEARCH, "gravity": True, "mcts_iterations": 200}
+    assert player.choose_move(p1, p2, 2, settings) in legal_cells(p1, p2, 4, True)
+
+
+def test_rollout_batch_winners():
+    player = MCTSPlayer(3, seed=5)
+    winners = player.rollout_batch(bits(0, 1), bits(13, 26), 1, 64)
+    assert winners.shape == (64,)
+    assert set(np.unique(winners)) <= {0, 1, 2}
+
+
+def test_arena_rejects_overflow():
+    arena = NodeArena(3)
+    root = arena.new_root(1)
+    assert arena.add_children(root, np.array([0, 1], dtype=np.int16), 2)
+    assert not arena.add_children(1, np.array([2], dtype=np.int16), 1)
+    assert arena.size == 3
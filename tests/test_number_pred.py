@@ -0,0 +1,71 @@
+import random
+
+import numpy as np
+import pytest
+
+from number_pred import NO_GUESS, NumberPredictionGame
+
+
+@pytest.fixture
+def game():
+    return NumberPredictionGame(difficulty=2, rng=random.Random(5))
+
+
+def test_perfect_match_wins(game):
+    while not game.finished:
+        result = game.submit([int(game.targets[game.round, 0])])
+    assert result["rounds_left"] == 0
+    score = result["score"]
+    assert score["hits"] == score["rounds"] == game.rounds
+    assert score["won"]
+    assert score["points"] == 100 * game.rounds
+
+
+def test_extra_guesses_are_capped_and_cost_points(game):
+    target = int(game.targets[0, 0])
+    game.submit([target + 50, target] + [0] * 10)
+    assert (game.predictions[0, :, 0] != NO_GUESS).sum() == game.guesses_per_round
+    assert game.score()["points"] == 100 // game.guesses_per_round
+
+
+def test_near_miss_earns_a_little(game):
+    game.submit([int(game.targets[0, 0]) + 2])
+    assert game.score()["points"] == 10
+
+
+@pytest.mark.parametrize("guess", [2 ** 63, -2 ** 63, 10 ** 30, -10 ** 30])
+def test_guess_outside_int64_is_rejected(guess, game):
+    with pytest.raises(ValueError):
+        game.submit([guess])
+    assert game.round == 0
+
+
+def test_extreme_guesses_do_not_wrap_around(game):
+    game.submit([np.iinfo(np.int64).max, -np.iinfo(np.int64).max])
+    assert game.score()["points"] == 0
+
+
+def test_no_prediction_and_finished_match(game):
+    with pytest.raises(ValueError):
+        game.submit([])
+    while not game.finished:
+        game.submit([0])
+    with pytest.raises(ValueError):
+        game.submit([0])
+
+
+def test_dynamic_patterns_announce_shifts():
+    game = NumberPredictionGame(difficulty=3, rng=random.Random(1), dynamic=True,
+                                settings={"rounds_per_match": 12})
+    shifts = 0
+    while not game.finished:
+        shifts += game.submit([0])["pattern_shift"]
+    assert shifts > 0
+
+
+def test_reset_reuses_the_instance(game):
+    game.submit([0])
+    game.reset(difficulty=1)
+    assert game.round == 0
+    assert game.difficulty == 1
+    assert (game.predictions == NO_GUESS).all()
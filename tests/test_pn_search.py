@@ -0,0 +1,66 @@
+from bitboard import cell_masks_for, has_line
+from pn_search import LOSS, UNKNOWN, WIN, ProofNumberSearch, ProofTable, forced_win, solve, winning_cells
+
+
+def bits(*cells):
+    return sum(1 << cell for cell in cells)
+
+
+def test_win_in_one():
+    result = solve(bits(0, 8), bits(13), 1, 5)
+    assert result["status"] == WIN
+    assert result["line"] == [4]
+
+
+def test_win_by_double_threat():
+    p1, p2 = bits(7, 18, 17), bits(4, 11, 19)
+    result = solve(p1, p2, 1, 5)
+    assert result["status"] == WIN
+    assert len(result["line"]) == 3
+    # The first move makes a double threat; either block leaves the other
+    attack, *threats = result["line"]
+    p1 |= 1 << attack
+    assert set(threats) <= set(winning_cells(p1, p2, 3))
+    for block in threats:
+        finish = next(cell for cell in threats if cell != block)
+        assert has_line(p1 | 1 << finish, cell_masks_for(3)[finish])
+
+
+def test_double_threat_is_a_loss():
+    result = solve(bits(0, 1, 3), bits(13, 26), 2, 5)
+    assert result["status"] == LOSS
+    assert sorted(result["line"]) == [2, 6]
+
+
+def test_quiet_position_is_unknown():
+    assert solve(0, 0, 1, 3)["status"] == UNKNOWN
+    assert forced_win(0, 0, 1, 3) is None
+
+
+def test_forced_win_returns_the_line():
+    assert forced_win(bits(0, 8), bits(13), 1, 5) == [4]
+
+
+def test_search_stops_on_node_budget():
+    search = ProofNumberSearch(3, max_nodes=1, table=ProofTable())
+    assert search.prove(bits(7, 18, 17), bits(4, 11, 19), 5) == (None, [])
+
+
+def test_solved_positions_are_remembered():
+    table = ProofTable()
+    search = ProofNumberSearch(3, table=table)
+    p1, p2 = bits(7, 18, 17), bits(4, 11, 19)
+    first = search.prove(p1, p2, 5)
+    assert len(table) == 1
+    assert search.prove(p1, p2, 5) == first
+
+
+def test_proof_table_evicts_least_recently_used():
+    table = ProofTable(max_entries=2)
+    table.put(("a",), True, [1])
+    table.put(("b",), False, [])
+    table.get(("a",))
+    table.put(("c",), True, [2])
+    assert table.get(("b",)) is None
+    assert table.get(("a",)) == (True, [1])
+    assert len(table) == 2
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from rps_rules import DRAW, LOSE, MOVE_NAMES, RPS_CONFIG, RULE_SETS, WIN, RuleSet, get_rule_set
+
+
+@pytest.mark.parametrize("name", sorted(RULE_SETS))
+def test_payoff_is_antisymmetric_and_balanced(name):
+    rules = RULE_SETS[name]
+    assert (rules.payoff == -rules.payoff.T).all()
+    assert (np.diag(rules.payoff) == DRAW).all()
+    # Every move beats and loses to the same number of moves
+    assert ((rules.payoff == WIN).sum(axis=1) == (rules.size - 1) // 2).all()
+    for move in range(rules.size):
+        assert rules.resolve(int(rules.counters[move]), move) == WIN
+
+
+def test_classic_is_the_default():
+    assert get_rule_set().name == "classic"
+    assert get_rule_set("auto").name in ("classic", "elemental")
+    assert get_rule_set("rpsls").size == 5
+
+
+def test_encode_letters_and_names():
+    rules = RULE_SETS["rpsls"]
+    assert rules.encode("k") == rules.encode("Spock") == 4
+    with pytest.raises(ValueError):
+        rules.encode("fire")
+
+
+def test_shared_letters_name_the_same_move():
+    for rules in RULE_SETS.values():
+        for letter, name in zip(rules.letters, rules.names):
+            assert MOVE_NAMES[letter] == name
+
+
+def test_incomplete_or_conflicting_rules_are_rejected():
+    moves = [("R", "rock"), ("P", "paper"), ("S", "scissors")]
+    with pytest.raises(ValueError):
+        RuleSet("partial", moves, {"rock": ["scissors"]})
+    with pytest.raises(ValueError):
+        RuleSet("conflict", moves, {"rock": ["scissors", "paper"], "paper": ["rock"],
+                                    "scissors": ["paper"]})
+
+
+def test_combo_completed():
+    rules = RULE_SETS["classic"]
+    rock, paper, scissors = (rules.encode(move) for move in "RPS")
+    assert rules.combo_names[rules.combo_completed([rock, paper, scissors])] == "crossfire"
+    assert rules.combo_completed([rock, paper, scissors, paper]) == 0
+    assert rules.combo_completed([rock, rock]) == 0
+
+
+def test_play_many_matches_round_by_round_scoring():
+    rules = RULE_SETS["classic"]
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, rules.size, (20, 12))
+    b = rng.integers(0, rules.size, (20, 12))
+    played = rules.play_many(a, b, combo_bonus=2)
+    for match in range(20):
+        for round_index in range(12):
+            outcome = rules.resolve(a[match, round_index], b[match, round_index])
+            assert played["outcomes"][match, round_index] == outcome
+            combo = rules.combo_completed(a[match, :round_index + 1])
+            opponent_combo = rules.combo_completed(b[match, :round_index + 1])
+            assert played["combos"][match, round_index] == combo
+            boosted = (outcome == WIN and combo) or (outcome == LOSE and opponent_combo)
+            assert played["points"][match, round_index] == outcome * (3 if boosted else 1)
+
+
+def test_play_one_scores_like_play_many():
+    rules = RULE_SETS["rpsls"]
+    rng = np.random.default_rng(1)
+    a = rng.integers(0, rules.size, (50, 8))
+    b = rng.integers(0, rules.size, (50, 8))
+    played = rules.play_many(a, b)
+    for match in range(50):
+        for rounds in range(1, 9):
+            one = rules.play_one(list(a[match, :rounds]), list(b[match, :rounds]))
+            assert one == {"outcome": played["outcomes"][match, rounds - 1],
+                           "combo": played["combos"][match, rounds - 1],
+                           "opponent_combo": played["opponent_combos"][match, rounds - 1],
+                           "points": played["points"][match, rounds - 1]}
+
+
+def test_elemental_needs_elemental_powers(monkeypatch):
+    monkeypatch.setitem(RPS_CONFIG["special_rules"], "elemental_powers", False)
+    assert get_rule_set("auto").name == "classic"
+    with pytest.raises(ValueError):
+        get_rule_set("elemental")
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from config import GAME_CONFIGS
+from game_manager import EnhancedGameManager
+from rps_rules import get_rule_set
+from rps_tournament import STRATEGIES, play, predictor_moves
+
+SETTINGS = {"pattern_recognition": True, "counter_probability": 1.0}
+
+
+@pytest.fixture
+def manager():
+    manager = EnhancedGameManager(seed=3)
+    manager.game_state.state.update({
+        "current_game": {"type": "Strategic Rock Paper Scissors", "engine_settings": dict(SETTINGS)},
+        "progress": {"wins": 0, "losses": 0}
+    })
+    manager.start_match()
+    yield manager
+    manager.release_resources()
+
+
+def play_level(manager, moves):
+    """AI moves and final match points from the game for a player's moves"""
+    rules = get_rule_set()
+    ai_moves, match_points = [], []
+    for move in moves:
+        result = manager._process_rps({"choice": rules.letters[move]})
+        ai_moves.append(rules.encode(manager.game_state.state["rps_history"][-1]["ai"]))
+        if result["status"] != "continue":
+            match_points.append(result["match_points"])
+            manager.start_match()
+    return ai_moves, match_points
+
+
+def test_predictor_matches_the_game_ai(manager):
+    rules = get_rule_set()
+    moves = np.random.default_rng(1).integers(0, rules.size, 30)
+    ai_moves, _ = play_level(manager, moves)
+    counts = np.zeros((1, rules.size), dtype=np.int64)
+    rng = np.random.default_rng(0)
+    for round_index, move in enumerate(moves):
+        predicted = predictor_moves(counts, SETTINGS, rules, rng)[0]
+        if round_index >= 3:
+            # From the fourth round on both sides counter deterministically
+            assert predicted == ai_moves[round_index]
+        counts[0, move] += 1
+
+
+def test_match_scoring_matches_the_game(manager):
+    rules = get_rule_set()
+    rounds_per_match = GAME_CONFIGS["strategic_rps"]["rounds_per_match"]
+    moves = np.random.default_rng(2).integers(0, rules.size, 3 * rounds_per_match)
+    ai_moves, match_points = play_level(manager, moves)
+    combo_bonus = None if GAME_CONFIGS["strategic_rps"]["special_rules"].get("combo_moves") else 0
+    played = rules.play_many(moves, np.array(ai_moves), combo_bonus)
+    assert played["points"].reshape(3, rounds_per_match).sum(axis=1).tolist() == match_points
+
+
+def test_play_reports_rates_for_every_strategy():
+    for strategy in STRATEGIES:
+        row = play(SETTINGS, strategy, sessions=20, matches=2, seed=4)
+        assert row["ai_win_rate"] + row["draw_rate"] + row["ai_loss_rate"] == pytest.approx(1.0)
+        assert 0.0 <= row["match_win_rate"] <= 1.0
+        assert row["ai_us_per_round"] > 0
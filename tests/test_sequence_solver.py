@@ -0,0 +1,57 @@
+from fractions import Fraction
+
+import pytest
+
+from sequence_solver import berlekamp_massey, differences, solve
+
+
+@pytest.mark.parametrize("terms, kind, next_value", [
+    ([5, 5, 5], "constant", 5),
+    ([2, 4, 6, 8], "polynomial", 10),
+    ([1, 4, 9, 16, 25], "polynomial", 36),
+    ([3, 6, 12, 24], "geometric", 48),
+    ([16, 8, 4, 2], "geometric", 1),
+    ([2, 5, 11, 23], "affine", 47),
+    ([1, 1, 2, 3, 5, 8], "recurrence", 13),
+])
+def test_simplest_rule(terms, kind, next_value):
+    solution = solve(terms)
+    assert solution.rule.kind == kind
+    assert solution.rule.next_value == next_value
+    assert solution.plausible_next[0] == next_value
+    assert solution.is_plausible(next_value)
+
+
+def test_prefix_too_short_to_confirm_a_rule():
+    assert solve([1, 2]).rule is None
+    assert solve([7, 3, 9, 1]).plausible_next == []
+
+
+def test_non_integral_next_value_is_not_plausible():
+    solution = solve([4, 6, 9])
+    assert solution.rule.kind == "geometric"
+    assert solution.rule.next_value == Fraction(27, 2)
+    assert not solution.rule.integral
+    assert solution.plausible_next == []
+
+
+def test_solutions_are_cached_per_prefix():
+    assert solve([2, 4, 6, 8]) is solve((2, 4, 6, 8))
+
+
+def test_differences():
+    assert differences([1, 4, 9, 16], 1) == [3, 5, 7]
+    assert differences([1, 4, 9, 16], 2) == [2, 2]
+
+
+def test_berlekamp_massey_finds_fibonacci():
+    assert berlekamp_massey([1, 1, 2, 3, 5, 8, 13]) == (2, [1, 1])
+
+
+def test_hint_texts():
+    terms = [2, 5, 11, 23]
+    rule = solve(terms).rule
+    assert rule.detail(terms) == "Each number is 2 times the one before it, plus 1."
+    assert rule.formula(terms) == "The next number is 2 × 23 + 1."
+    fibonacci = [1, 1, 2, 3, 5, 8]
+    assert solve(fibonacci).rule.detail(fibonacci) == "Each number is the sum of the 2 before it."
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from session_state import GAME_STATE_TEMPLATE, StateTemplate
+
+
+@pytest.fixture
+def template():
+    return StateTemplate({"level": 0, "name": "hero", "inventory": [], "features": {"dark"}})
+
+
+def test_reads_fall_through_to_shared_defaults(template):
+    state = template.new()
+    assert state["level"] == 0
+    assert state.owned() == {}
+
+
+def test_containers_are_copied_on_first_touch(template):
+    first, second = template.new(), template.new()
+    first["inventory"].append("sword")
+    assert second["inventory"] == []
+    assert first.owned() == {"inventory": ["sword"]}
+    assert "features" not in first.owned()
+
+
+def test_set_delete_and_iterate_in_default_order(template):
+    state = template.new(extra=1)
+    state["level"] = 3
+    del state["name"]
+    assert "name" not in state
+    with pytest.raises(KeyError):
+        state["name"]
+    with pytest.raises(KeyError):
+        del state["name"]
+    assert list(state) == ["level", "inventory", "features", "extra"]
+    assert len(state) == 4
+    del state["extra"]
+    assert "extra" not in state
+
+
+def test_copy_is_shallow(template):
+    state = template.new()
+    state["inventory"].append("map")
+    clone = state.copy()
+    clone["level"] = 9
+    assert state["level"] == 0
+    assert clone["inventory"] is state["inventory"]
+
+
+def test_repr_does_not_copy_containers(template):
+    state = template.new(level=2)
+    assert repr(state) == "SessionState({'level': 2})"
+    assert state.owned() == {"level": 2}
+
+
+def test_to_dict_is_json_ready_and_leaves_defaults_untouched(template):
+    state = template.new()
+    state["features"].add("light")
+    state["engine"] = object()
+    state["history"] = [{"move": ("a", 1), "board": object()}]
+    data = state.to_dict()
+    assert json.loads(json.dumps(data)) == {
+        "level": 0, "name": "hero", "inventory": [], "features": ["dark", "light"],
+        "history": [{"move": ["a", 1]}]
+    }
+    assert "inventory" not in state.owned()
+
+
+def test_game_state_starts_empty():
+    state = GAME_STATE_TEMPLATE.new()
+    assert state["unlocked_features"] == set()
+    assert list(state.owned()) == ["unlocked_features"]
+
+
+def test_game_state_defaults_serialise():
+    state = GAME_STATE_TEMPLATE.new()
+    assert json.dumps(state.to_dict())
+    assert state.owned() == {}
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from speculation import OutcomeDialogueSpeculator
+
+
+class FakeCharacter:
+    """Records dialogue requests; each one finishes when released"""
+
+    def __init__(self):
+        self.requests = []
+        self.release = None
+
+    async def generate_dialogue(self, dialogue_type, context):
+        self.requests.append((dialogue_type, context.get("strategy")))
+        await self.release.wait()
+        return f"{dialogue_type}:{context.get('strategy')}"
+
+
+@pytest.fixture
+def character():
+    return FakeCharacter()
+
+
+def test_take_returns_the_line_speculated_for_the_last_move(character):
+    async def run():
+        character.release = asyncio.Event()
+        speculator = OutcomeDialogueSpeculator()
+        speculator.start(character, "first")
+        await asyncio.sleep(0)
+        speculator.start(character, "second")
+        character.release.set()
+        text = await speculator.take(character, "victory", {"strategy": "second"})
+        return speculator, text
+
+    speculator, text = asyncio.run(run())
+    assert text == "victory:second"
+    assert not speculator.active
+    assert speculator.stats == {"started": 4, "hits": 1, "misses": 0, "cancelled": 3}
+
+
+def test_cancelled_speculation_is_not_reused(character):
+    async def run():
+        character.release = asyncio.Event()
+        speculator = OutcomeDialogueSpeculator()
+        speculator.start(character, "draw-move")
+        # The turn did not end the game
+        speculator.cancel()
+        character.release.set()
+        text = await speculator.take(character, "defeat", {"strategy": "later"})
+        return speculator, text
+
+    speculator, text = asyncio.run(run())
+    assert text == "defeat:later"
+    assert speculator.stats["misses"] == 1
+    assert speculator.stats["hits"] == 0
@@ -0,0 +1,32 @@
+import pytest
+
+from state_delta import DeltaLog
+
+
+@pytest.fixture
+def log():
+    return DeltaLog(max_entries=4)
+
+
+def test_client_catches_up_from_the_log(log):
+    log.commit([(0, 0, 0, 1)])
+    log.commit([(1, 1, 1, 2)])
+    log.commit([(2, 2, 2, 1)])
+    assert log.since(1) == [(1, 1, 1, 2), (2, 2, 2, 1)]
+    assert log.since(3) == []
+
+
+def test_client_too_far_behind_needs_a_snapshot(log):
+    for cell in range(6):
+        log.commit([(cell, 0, 0, 1)])
+    assert log.since(0) is None
+    assert log.since(2) == [(cell, 0, 0, 1) for cell in range(2, 6)]
+
+
+def test_reset_forces_a_snapshot_for_older_clients(log):
+    for cell in range(3):
+        log.commit([(cell, 0, 0, 1)])
+    reset_version = log.reset()
+    log.commit([(1, 1, 1, 1)])
+    assert log.since(3) is None
+    assert log.since(reset_version) == [(1, 1, 1, 1)]
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from timer_wheel import TimerWheel
+
+
+@pytest.fixture
+def wheel():
+    # Small wheel so cascades happen within a few dozen ticks
+    return TimerWheel({"tick": 1.0, "slots_per_level": 8, "levels": 3})
+
+
+def test_fires_on_its_tick(wheel):
+    fired = []
+    wheel.schedule(3, fired.append, "a")
+    assert wheel.advance(2) == 0
+    assert wheel.advance(1) == 1
+    assert fired == ["a"]
+    assert len(wheel) == 0
+
+
+def test_fractional_delay_rounds_up(wheel):
+    fired = []
+    wheel.schedule(1.5, fired.append, "a")
+    wheel.advance(1)
+    assert fired == []
+    wheel.advance(1)
+    assert fired == ["a"]
+
+
+def test_cascades_from_higher_levels(wheel):
+    delays = (7, 8, 9, 63, 64, 100)
+    fired = {}
+    tick = 0
+    for delay in delays:
+        wheel.schedule(delay, lambda delay: fired.setdefault(delay, tick), delay)
+    for tick in range(1, 101):
+        wheel.advance(1)
+    assert fired == {delay: delay for delay in delays}
+    assert wheel.stats["cascaded"] > 0
+
+
+def test_delay_is_clamped_to_wheel_range(wheel):
+    fired = []
+    wheel.schedule(10 ** 6, fired.append, "late")
+    wheel.advance(wheel.max_ticks)
+    assert fired == ["late"]
+
+
+def test_cancel(wheel):
+    fired = []
+    keep = wheel.schedule(2, fired.append, "keep")
+    drop = wheel.schedule(2, fired.append, "drop")
+    assert drop.cancel()
+    assert not drop.cancel()
+    assert not TimerWheel.cancel(None)
+    assert len(wheel) == 1
+    wheel.advance(2)
+    assert fired == ["keep"]
+    assert not keep.active
+    assert not keep.cancel()
+
+
+def test_cancel_inside_slot_from_callback(wheel):
+    fired = []
+    timers = {}
+
+    def first():
+        fired.append("first")
+        assert timers["second"].cancel()
+
+    timers["first"] = wheel.schedule(2, first)
+    timers["second"] = wheel.schedule(2, fired.append, "second")
+    assert wheel.advance(2) == 1
+    assert fired == ["first"]
+    assert len(wheel) == 0
+    assert wheel.stats == {"scheduled": 2, "cancelled": 1, "fired": 1, "cascaded": 0}
+
+
+def test_failing_callback_does_not_stop_the_slot(wheel):
+    fired = []
+    wheel.schedule(1, lambda: 1 / 0)
+    wheel.schedule(1, fired.append, "ok")
+    assert wheel.advance(1) == 2
+    assert fired == ["ok"]
+
+
+def test_driver_fires_coroutine_callbacks():
+    async def run():
+        wheel = TimerWheel({"tick": 0.01})
+        done = asyncio.Event()
+
+        async def callback():
+            done.set()
+
+        wheel.schedule(0.03, callback)
+        try:
+            await asyncio.wait_for(done.wait(), 1.0)
+        finally:
+            wheel.close()
+
+    asyncio.run(run())
@@ -2,65 +2,106 @@
 import numpy as np
 from typing import Optional, List, Tuple
 
+from asset_store import ASSETS
+from bitboard import generate_win_lines
+from renderer import Frame, render_board
+
+_LINE_CACHE = {}
+
+def win_lines(size: int) -> np.ndarray:
+    """Winning lines of a size^3 cube as flat cell indices
+
+    Taken from the shared line_tables asset when one is published, else
+    computed once per size in this process.
+    """
+    lines = ASSETS.array("line_tables", f"win_lines_{size}")
+    if lines is not None:
+        return lines
+    lines = _LINE_CACHE.get(size)
+    if lines is None:
+        lines = _LINE_CACHE[size] = np.array(generate_win_lines(size), dtype=np.intp)
+    return lines
+
+# 49 winning lines of the 3x3x3 cube, precomputed once
+WIN_LINES = win_lines(3)
+
 class TicTacToe3D:
-    def __init__(self):
-        # 3x3x3 board
-        self.board = np.zeros((3, 3, 3), dtype=int)
+    def __init__(self, size: int = 3, gravity: bool = False):
+        # size x size x size board (3 by default, 4 for Qubic)
+        self.size = size
+        self.lines = win_lines(size)
+        self.board = np.zeros((size, size, size), dtype=int)
         self.player = 1  # 1 for player, 2 for AI
+        # With gravity pieces drop along z; heights[x, y] is the next free z
+        self.gravity = gravity
+        self.heights = np.zeros((size, size), dtype=int)
+        self.last_move: Optional[Tuple[int, int, int]] = None
+        
+    def reset(self):
+        """Clear the board in place for a new match (no reallocation)"""
+        self.board.fill(0)
+        self.heights.fill(0)
+        self.player = 1
+        self.last_move = None
         
     def make_move(self, x: int, y: int, z: int, player: int) -> bool:
-        """Make a move on the board"""
-        if self.board[x][y][z] == 0:
-            self.board[x][y][z] = player
-            return True
-        return False
+        """Make a move on the board
+
+        Under gravity z is ignored: the piece drops to the bottom of column
+        (x, y). last_move holds where it actually landed.
+        """
+        if self.gravity:
+            z = self.heights[x][y]
+            if z >= self.size:
+                return False
+            self.heights[x][y] = z + 1
+        elif self.board[x][y][z] != 0:
+            return False
+        self.board[x][y][z] = player
+        self.last_move = (x, y, int(z))
+        return True
         
     def check_win(self) -> Optional[int]:
-        """Check for win conditions"""
-        # Check each 2D plane
-        for i in range(3):
-            # Check horizontal planes
-            if np.any(np.all(self.board[i] == 1, axis=1)): return 1
-            if np.any(np.all(self.board[i] == 2, axis=1)): return 2
-            # Check vertical planes
-            if np.any(np.all(self.board[i] == 1, axis=0)): return 1
-            if np.any(np.all(self.board[i] == 2, axis=0)): return 2
-            
-        # Check diagonals in each plane
-        for i in range(3):
-            if np.all(np.diag(self.board[i]) == 1) or \
-               np.all(np.diag(np.fliplr(self.board[i])) == 1): return 1
-            if np.all(np.diag(self.board[i]) == 2) or \
-               np.all(np.diag(np.fliplr(self.board[i])) == 2): return 2
-               
-        # Check 3D diagonals
-        diag1 = [self.board[i][i][i] for i in range(3)]
-        diag2 = [self.board[i][i][2-i] for i in range(3)]
-        diag3 = [self.board[i][2-i][i] for i in range(3)]
-        diag4 = [self.board[i][2-i][2-i] for i in range(3)]
-        
-        for diag in [diag1, diag2, diag3, diag4]:
-            if all(x == 1 for x in diag): return 1
-            if all(x == 2 for x in diag): return 2
-            
+        """Check for win conditions along every line of the cube"""
+        cells = self.board.reshape(-1)[self.lines]
+        for player in (1, 2):
+            if np.any(np.all(cells == player, axis=1)):
+                return player
         return None
 
+    def has_forced_result(self) -> bool:
+        """Check whether the next move can end the game
+        
+        True when either side has a line one move from completion, or when
+        at most one empty cell is left.
+        """
+        flat = self.board.reshape(-1)
+        if np.count_nonzero(flat == 0) <= 1:
+            return True
+        cells = flat[self.lines]
+        empty = np.count_nonzero(cells == 0, axis=1) == 1
+        for player in (1, 2):
+            if np.any(empty & (np.count_nonzero(cells == player, axis=1) == self.size - 1)):
+                return True
+        return False
+
     def is_full(self) -> bool:
         """Check if board is full"""
         return np.all(self.board != 0)
         
     def get_valid_moves(self) -> List[Tuple[int, int, int]]:
         """Get all valid moves"""
-        return [(x, y, z) for x in range(3) for y in range(3) 
-                for z in range(3) if self.board[x][y][z] == 0]
+        if self.gravity:
+            # One landing cell per open column
+            return [(x, y, int(self.heights[x][y])) for x in range(self.size)
+                    for y in range(self.size) if self.heights[x][y] < self.size]
+        return [(x, y, z) for x in range(self.size) for y in range(self.size) 
+                for z in range(self.size) if self.board[x][y][z] == 0]
                 
+    def render(self) -> str:
+        """Return the board as a single printable frame"""
+        return render_board(self.board)
+        
     def print_board(self):
         """Print the current board state"""
-        symbols = {0: ".", 1: "X", 2: "O"}
-        print("\n3D Tic Tac Toe Board:")
-        for z in range(3):
-            print(f"\nLevel {z + 1}")
-            for x in range(3):
-                for y in range(3):
-                    print(symbols[self.board[x][y][z]], end=" ")
-                print()
\ No newline at end of file
+        Frame().write(self.render()).flush()
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+Search-based opponent for 3D tic-tac-toe on bitboards.
+
+Alpha-beta negamax with iterative deepening up to the difficulty's
+ai_depth. The search stops at an absolute deadline and returns the best
+move of the last completed depth. With gravity (settings["gravity"]) only
+one cell per column is playable, so the search goes gravity_extra_depth
+plies deeper for about the same node count. With mistake_probability the opponent
+occasionally plays a random move instead, and with opening_book first
+moves are answered from the shared book (asset_store). Pure Python so it
+runs cheaply in worker processes.
+"""
+
+import random
+import time
+from typing import List, Optional
+
+from asset_store import opening_move
+from bitboard import masks_for, cell_masks_for, gravity_cells, legal_cells, has_line
+from config import GAME_CONFIGS
+from pn_search import forced_win
+
+WIN_SCORE = 100_000
+_CHECK_EVERY = 512  # Nodes between deadline checks
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the deadline or node budget is spent"""
+
+
+def evaluate(me: int, opp: int, masks: List[int]) -> int:
+    """Static score from `me`'s point of view: open lines weighted by pieces held"""
+    score = 0
+    for mask in masks:
+        mine = me & mask
+        theirs = opp & mask
+        if mine and not theirs:
+            score += mine.bit_count() ** 2
+        elif theirs and not mine:
+            score -= theirs.bit_count() ** 2
+    return score
+
+
+class _Search:
+    def __init__(self, size: int, deadline: Optional[float], gravity: bool = False,
+                 max_nodes: Optional[int] = None):
+        self.size = size
+        self.gravity = gravity
+        self.masks = masks_for(size)
+        self.cell_masks = cell_masks_for(size)
+        # Cells on more lines first: better alpha-beta cutoffs
+        self.order = sorted(range(size ** 3), key=lambda c: -len(self.cell_masks[c]))
+        self.rank = {cell: index for index, cell in enumerate(self.order)}
+        self.deadline = deadline
+        self.max_nodes = max_nodes
+        self.nodes = 0
+
+    def wins(self, bits: int, cell: int) -> bool:
+        return has_line(bits, self.cell_masks[cell])
+
+    def moves(self, occupied: int) -> List[int]:
+        if self.gravity:
+            return sorted(gravity_cells(occupied, 0, self.size), key=self.rank.__getitem__)
+        return [c for c in self.order if not occupied >> c & 1]
+
+    def negamax(self, me: int, opp: int, depth: int, alpha: int, beta: int) -> int:
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % _CHECK_EVERY == 0 \
+                and time.time() > self.deadline:
+            raise SearchTimeout()
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise SearchTimeout()
+        moves = self.moves(me | opp)
+        if not moves:
+            return 0
+        if depth == 0:
+            return evaluate(me, opp, self.masks)
+
+        best = -WIN_SCORE * 2
+        for cell in moves:
+            placed = me | (1 << cell)
+            if self.wins(placed, cell):
+                return WIN_SCORE + depth
+            score = -self.negamax(opp, placed, depth - 1, -beta, -alpha)
+            if score > best:
+                best = score
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+        return best
+
+    def best_move(self, me: int, opp: int, depth: int) -> int:
+        moves = self.moves(me | opp)
+        best_cell, alpha = moves[0], -WIN_SCORE * 2
+        for cell in moves:
+            placed = me | (1 << cell)
+            if self.wins(placed, cell):
+                return cell
+            score = -self.negamax(opp, placed, depth - 1, -WIN_SCORE * 2, -alpha)
+            if score > alpha:
+                best_cell, alpha = cell, score
+        return best_cell
+
+
+def choose_move(p1: int, p2: int, player: int = 2, settings: dict = None,
+                seed=None, deadline: Optional[float] = None, size: int = 3) -> int:
+    """Pick a cell for `player`; deadline is an absolute time.time() value
+
+    Pass a seed (or rng) for reproducible play. The search itself is
+    deterministic, but a deadline makes its depth depend on machine speed:
+    for exact replays pass deadline=None and bound the work with
+    settings["max_nodes"] instead.
+    """
+    settings = settings or {}
+    # Accept a ready rng (random.Random or RandomBuffer) or a seed
+    rng = seed if hasattr(seed, "random") else random.Random(seed)
+    me, opp = (p1, p2) if player == 1 else (p2, p1)
+    gravity = settings.get("gravity", False)
+    moves = legal_cells(p1, p2, size, gravity)
+    if not moves:
+        raise ValueError("No legal moves")
+
+    search = _Search(size, deadline, gravity, settings.get("max_nodes"))
+    # Take an immediate win, then block one; no search needed
+    for bits in (me, opp):
+        for cell in moves:
+            if search.wins(bits | (1 << cell), cell):
+                return cell
+
+    if rng.random() < settings.get("mistake_probability", 0.0):
+        return rng.choice(moves)
+
+    if settings.get("opening_book"):
+        cell = opening_move(p1, p2, player, size, gravity)
+        if cell is not None:
+            return cell
+
+    # A proven forcing sequence beats anything the search would pick
+    line = forced_win(p1, p2, player, settings.get("proof_plies", 0), size, gravity)
+    if line:
+        return line[0]
+
+    max_depth = settings.get("ai_depth", 2)
+    if gravity and max_depth:
+        max_depth += GAME_CONFIGS["3D_tic_tac_toe"]["gravity_extra_depth"]
+    best = None
+    for depth in range(1, max_depth + 1):
+        try:
+            best = search.best_move(me, opp, depth)
+        except SearchTimeout:
+            break
+    if best is None:
+        # Depth 0 or no depth finished in time: greedy static evaluation
+        best = max(moves, key=lambda c: evaluate(me | (1 << c), opp, search.masks))
+    return best
+
+
+def quick_move(p1: int, p2: int, player: int = 2, size: int = 3, gravity: bool = False) -> int:
+    """Cheap local move used when a worker misses its deadline"""
+    return choose_move(p1, p2, player, {"ai_depth": 0, "gravity": gravity}, size=size)
+
+
+def engine_for(size: int, settings: dict = None) -> str:
+    """Which search engine plays a cube of this size ("alphabeta" or "mcts")"""
+    engine = (settings or {}).get("ai_engine") or GAME_CONFIGS["3D_tic_tac_toe"]["ai_engine"]
+    if engine == "auto":
+        return "mcts" if size >= 4 else "alphabeta"
+    return engine
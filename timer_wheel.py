@@ -0,0 +1,190 @@
+"""
+Hierarchical timer wheel for per-session move deadlines.
+
+Every session with a running move clock gets one Timer in a shared
+TimerWheel instead of its own asyncio task or call_later handle. Timers
+sit in slot buckets on a few wheel levels (level 0 counts single ticks,
+each higher level counts one full turn of the level below), so inserting
+and cancelling are O(1) dict operations. A single driver task advances the
+wheel once per tick; when a lower level wraps, the next slot of the level
+above is cascaded down, and the level-0 slot for the current tick fires.
+Timer callbacks may be plain functions or coroutine functions.
+"""
+
+import asyncio
+import inspect
+import logging
+import math
+from typing import Any, Callable, Dict, List, Optional
+
+from config import TIMER_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+
+class Timer:
+    """Handle for a scheduled callback"""
+
+    __slots__ = ("expires", "callback", "args", "_bucket", "_wheel")
+
+    def __init__(self, expires: int, callback: Callable, args: tuple, wheel: "TimerWheel"):
+        self.expires = expires  # Absolute tick
+        self.callback = callback
+        self.args = args
+        self._bucket: Optional[Dict["Timer", None]] = None
+        self._wheel = wheel
+
+    @property
+    def active(self) -> bool:
+        return self._bucket is not None
+
+    def cancel(self) -> bool:
+        """Remove the timer from its slot; False if it already fired or was cancelled"""
+        if self._bucket is None:
+            return False
+        del self._bucket[self]
+        self._bucket = None
+        self._wheel._count -= 1
+        self._wheel.stats["cancelled"] += 1
+        return True
+
+
+class TimerWheel:
+    """Shared hierarchical timer wheel driven by one asyncio task"""
+
+    def __init__(self, settings: dict = None):
+        settings = {**TIMER_SETTINGS, **(settings or {})}
+        self.tick = settings["tick"]
+        self.bits = int(math.log2(settings["slots_per_level"]))
+        self.slots = 1 << self.bits
+        self.mask = self.slots - 1
+        self.levels = settings["levels"]
+        self.max_ticks = (1 << self.bits * self.levels) - 1
+        self._wheel: List[List[Dict[Timer, None]]] = [
+            [{} for _ in range(self.slots)] for _ in range(self.levels)
+        ]
+        self._now = 0  # Last processed tick
+        self._count = 0
+        self._origin: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.stats = {"scheduled": 0, "cancelled": 0, "fired": 0, "cascaded": 0}
+
+    def __len__(self) -> int:
+        return self._count
+
+    # Scheduling ---------------------------------------------------------
+
+    def schedule(self, delay: float, callback: Callable, *args: Any) -> Timer:
+        """Call callback(*args) after `delay` seconds (rounded up to whole ticks)"""
+        self._ensure_driver()
+        if not self._count:
+            # Empty wheel: jump straight to the wall clock
+            self._now = self._current_tick()
+        ticks = max(1, math.ceil(delay / self.tick - 1e-9))
+        timer = Timer(self._current_tick() + ticks, callback, args, self)
+        self._place(timer)
+        self._count += 1
+        self.stats["scheduled"] += 1
+        return timer
+
+    @staticmethod
+    def cancel(timer: Optional[Timer]) -> bool:
+        return timer is not None and timer.cancel()
+
+    def _place(self, timer: Timer):
+        # delta is 0 only while cascading into the slot about to fire
+        delta = min(max(timer.expires - self._now, 0), self.max_ticks)
+        timer.expires = self._now + delta
+        level = 0
+        while delta >> self.bits * (level + 1) and level < self.levels - 1:
+            level += 1
+        bucket = self._wheel[level][timer.expires >> self.bits * level & self.mask]
+        bucket[timer] = None
+        timer._bucket = bucket
+
+    # Advancing ----------------------------------------------------------
+
+    def advance(self, ticks: int = 1) -> int:
+        """Process `ticks` ticks now; returns the number of timers fired"""
+        fired = 0
+        for _ in range(ticks):
+            self._now += 1
+            # Cascade every level whose lower level just completed a turn
+            level = 1
+            while level < self.levels and not self._now & ((1 << self.bits * level) - 1):
+                self._cascade(level)
+                level += 1
+            # Take timers out one at a time: a callback may cancel another
+            # timer of this slot, which must then neither fire nor fail
+            bucket = self._wheel[0][self._now & self.mask]
+            while bucket:
+                timer = next(iter(bucket))
+                del bucket[timer]
+                timer._bucket = None
+                self._count -= 1
+                self._fire(timer)
+                fired += 1
+        return fired
+
+    def _cascade(self, level: int):
+        bucket = self._wheel[level][self._now >> self.bits * level & self.mask]
+        if not bucket:
+            return
+        moved = list(bucket)
+        bucket.clear()
+        for timer in moved:
+            self._place(timer)
+        self.stats["cascaded"] += len(moved)
+
+    def _fire(self, timer: Timer):
+        self.stats["fired"] += 1
+        try:
+            result = timer.callback(*timer.args)
+            if inspect.isawaitable(result):
+                asyncio.ensure_future(result)
+        except Exception:
+            logger.exception("Timer callback failed")
+
+    # asyncio driver -----------------------------------------------------
+
+    def _current_tick(self) -> int:
+        """Tick the wall clock is at (the wheel may lag behind by a tick)"""
+        if self._origin is None:
+            return self._now
+        elapsed = asyncio.get_running_loop().time() - self._origin
+        return max(self._now, int(elapsed / self.tick))
+
+    def _ensure_driver(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop: the caller drives the wheel with advance()
+        if self._origin is None:
+            self._origin = loop.time() - self._now * self.tick
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            if not self._count:
+                # Idle: sleep until something is scheduled
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            await asyncio.sleep(self.tick)
+            behind = self._current_tick() - self._now
+            if behind > 0:
+                self.advance(behind)
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._origin = None
+
+
+# Shared by all sessions in the process
+TIMER_WHEEL = TimerWheel()
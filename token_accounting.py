@@ -0,0 +1,134 @@
+"""
+Token, latency and cache accounting for model calls.
+
+Every LLMAgent call is recorded with its prompt/response token counts
+(from the API's usage metadata, or a local estimate), latency and whether
+the backend served part of the prompt from its cache. Totals are kept per
+session, per agent role and per prompt key, which shows which prompts are
+worth optimizing. Each session has a token budget; once it is spent,
+agents answer with their local fallbacks instead of calling the model.
+"""
+
+from collections import defaultdict
+from typing import Dict, Optional
+
+from config import TOKEN_ACCOUNTING
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for text the API did not report usage for"""
+    return (len(text) + TOKEN_ACCOUNTING["chars_per_token"] - 1) // TOKEN_ACCOUNTING["chars_per_token"]
+
+
+def usage_from_response(response, prompt: str, text: str) -> dict:
+    """Token counts from Gemini usage metadata, estimated when missing"""
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+    response_tokens = getattr(usage, "candidates_token_count", None)
+    cached_tokens = getattr(usage, "cached_content_token_count", None) or 0
+    return {
+        "prompt_tokens": prompt_tokens if prompt_tokens is not None else estimate_tokens(prompt),
+        "response_tokens": response_tokens if response_tokens is not None else estimate_tokens(text),
+        "cached_tokens": cached_tokens,
+        "estimated": prompt_tokens is None or response_tokens is None
+    }
+
+
+class UsageTotals:
+    """Aggregated counters for one bucket (session, role or prompt key)"""
+
+    __slots__ = ("calls", "prompt_tokens", "response_tokens", "cached_tokens",
+                 "cache_hits", "fallbacks", "latency")
+
+    def __init__(self):
+        self.calls = self.prompt_tokens = self.response_tokens = 0
+        self.cached_tokens = self.cache_hits = self.fallbacks = 0
+        self.latency = 0.0
+
+    def add(self, usage: dict, latency: float, fallback: bool):
+        self.calls += 1
+        self.prompt_tokens += usage["prompt_tokens"]
+        self.response_tokens += usage["response_tokens"]
+        self.cached_tokens += usage["cached_tokens"]
+        self.cache_hits += usage["cached_tokens"] > 0
+        self.fallbacks += fallback
+        self.latency += latency
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.response_tokens
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "response_tokens": self.response_tokens,
+            "total_tokens": self.total_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cache_hits": self.cache_hits,
+            "fallbacks": self.fallbacks,
+            "avg_latency": self.latency / self.calls if self.calls else 0.0
+        }
+
+
+class SessionUsage:
+    """Usage handle bound to one session; agents record through it"""
+
+    def __init__(self, accountant: "TokenAccountant", session_id: str, budget: Optional[int]):
+        self.accountant = accountant
+        self.session_id = session_id
+        self.budget = budget
+        self.totals = UsageTotals()
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.totals.total_tokens >= self.budget
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return None if self.budget is None else max(0, self.budget - self.totals.total_tokens)
+
+    def record(self, role: str, prompt_key: Optional[str], usage: dict,
+               latency: float, fallback: bool = False):
+        self.totals.add(usage, latency, fallback)
+        self.accountant._record(role, prompt_key or "unknown", usage, latency, fallback)
+
+
+class TokenAccountant:
+    """Process-wide token accounting across sessions"""
+
+    def __init__(self, default_budget: Optional[int] = TOKEN_ACCOUNTING["session_token_budget"]):
+        self.default_budget = default_budget
+        self.sessions: Dict[str, SessionUsage] = {}
+        self.by_role: Dict[str, UsageTotals] = defaultdict(UsageTotals)
+        self.by_prompt: Dict[str, UsageTotals] = defaultdict(UsageTotals)
+
+    def session(self, session_id: str, budget: Optional[int] = None) -> SessionUsage:
+        """Get or create the usage handle for a session"""
+        usage = self.sessions.get(session_id)
+        if usage is None:
+            usage = self.sessions[session_id] = SessionUsage(
+                self, session_id, budget if budget is not None else self.default_budget
+            )
+        return usage
+
+    def end_session(self, session_id: str):
+        """Forget a finished session (role and prompt totals are kept)"""
+        self.sessions.pop(session_id, None)
+
+    def _record(self, role: str, prompt_key: str, usage: dict, latency: float, fallback: bool):
+        self.by_role[role].add(usage, latency, fallback)
+        self.by_prompt[prompt_key].add(usage, latency, fallback)
+
+    def report(self) -> dict:
+        """Totals per session, role and prompt key, most expensive prompts first"""
+        prompts = sorted(self.by_prompt.items(), key=lambda item: -item[1].total_tokens)
+        return {
+            "sessions": {sid: usage.totals.to_dict() for sid, usage in self.sessions.items()},
+            "roles": {role: totals.to_dict() for role, totals in self.by_role.items()},
+            "prompts": {key: totals.to_dict() for key, totals in prompts}
+        }
+
+
+# Shared accountant for the process
+ACCOUNTANT = TokenAccountant()